@@ -0,0 +1,71 @@
+"""
+Runs the benchmarks against the locmem backend and a local SMTP sink and prints a JSON report.
+
+python -m benchmarks [--filter NAME] [--repeat N] [--quick] [--output FILE] [--compare BASELINE_FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import django
+
+
+def _print_result(result: dict) -> None:
+    sys.stderr.write(
+        f"{result['name']:<40} {result['median'] * 1000:>10.2f} ms {result['items_per_second'] or 0:>12.1f} items/s "
+        f"(±{result['stdev'] * 1000:.2f} ms, {result['items']} items)\n"
+    )
+
+
+def _print_comparison(comparison_list: list) -> None:
+    sys.stderr.write("\nCompared to baseline (median):\n")
+    for comparison in comparison_list:
+        sys.stderr.write(f"{comparison['name']:<40} {comparison['change'] * 100:>+8.1f} %\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", help="Run only benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured rounds per benchmark (default: 5)")
+    parser.add_argument("--quick", action="store_true", help="Use small numbers of items, e.g. for smoke tests")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare the medians with")
+    parser.add_argument("--list", action="store_true", help="List the available benchmarks and exit")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+    django.setup()
+
+    from django.test.utils import setup_test_environment  # noqa: PLC0415
+
+    # Importing the cases registers the benchmarks
+    import benchmarks.cases  # noqa: PLC0415, F401
+    from benchmarks.runner import compare_reports, get_benchmarks, run_benchmarks  # noqa: PLC0415
+
+    benchmark_list = get_benchmarks(args.filter)
+    if args.list:
+        for item in benchmark_list:
+            sys.stdout.write(f"{item.name}\n")
+        return
+
+    # Switches to the locmem email backend, the SMTP benchmarks override it with the sink
+    setup_test_environment()
+    report = run_benchmarks(benchmark_list, repeat=args.repeat, quick=args.quick, progress=_print_result)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare_reports(report, json.load(f))
+        _print_comparison(report["comparison"])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
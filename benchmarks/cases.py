@@ -0,0 +1,175 @@
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.test import override_settings
+
+from benchmarks.runner import benchmark
+from django_pony_express.converters import BeautifulSoupHtmlToTextConverter, StreamingHtmlToTextConverter
+from django_pony_express.services.base import BaseEmailService, BaseEmailServiceFactory
+from django_pony_express.services.tests import EmailTestService, SMTPSinkServer
+
+SMALL_HTML = """<html><body>
+<h1>Welcome aboard</h1>
+<p>Hello rider, your <strong>pony</strong> is ready. <a href="https://example.com/pony">Track it here</a>.</p>
+<p>Kind regards<br>The Pony Express</p>
+</body></html>"""
+
+LARGE_HTML_SECTION = """<table><tr><td>
+<h2>Station {number}</h2>
+<p>The pony reached station {number} after a <em>long</em> ride through the prairie.
+<a href="https://example.com/stations/{number}">Details</a> &amp; <a href="https://example.com/map/{number}">map</a>.</p>
+<ul><li>Distance: {number} miles</li><li>Riders: 3</li><li>Mail bags: 12</li></ul>
+<style>.station-{number} {{ color: red; }}</style>
+</td></tr></table>
+"""
+
+# Roughly 500 KB of HTML, like a long newsletter
+LARGE_HTML = "<html><body>{}</body></html>".format(
+    "".join(LARGE_HTML_SECTION.format(number=number) for number in range(1500))
+)
+
+
+class BenchmarkEmailService(BaseEmailService):
+    subject = "The Pony Express"
+    template_name = "testapp/test_email.html"
+
+
+class BenchmarkEmailServiceFactory(BaseEmailServiceFactory):
+    service_class = BenchmarkEmailService
+
+    def get_context_data(self) -> dict:
+        return {"link_url": "https://example.com/pony", "my_var": "Giddy up"}
+
+
+def _get_recipient_list(items: int) -> list[str]:
+    return [f"rider.{number}@example.com" for number in range(items)]
+
+
+def _get_smtp_settings(server: SMTPSinkServer) -> override_settings:
+    return override_settings(
+        EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend", EMAIL_HOST=server.host, EMAIL_PORT=server.port
+    )
+
+
+@benchmark("service.build", items=200, quick_items=20)
+def service_build(items: int):
+    service_list = [
+        BenchmarkEmailService(recipient_email_list=[recipient], context_data={"my_var": "Giddy up"})
+        for recipient in _get_recipient_list(items)
+    ]
+
+    def run() -> None:
+        for service in service_list:
+            service._build_mail_object()
+
+    yield run
+
+
+@benchmark("service.process.locmem", items=200, quick_items=20)
+def service_process_locmem(items: int):
+    recipient_list = _get_recipient_list(items)
+
+    def run() -> None:
+        mail.outbox = []
+        for recipient in recipient_list:
+            BenchmarkEmailService(recipient_email_list=[recipient]).process()
+
+    yield run
+
+
+@benchmark("service.process.smtp", items=50, quick_items=5)
+def service_process_smtp(items: int):
+    recipient_list = _get_recipient_list(items)
+
+    def run() -> None:
+        for recipient in recipient_list:
+            BenchmarkEmailService(recipient_email_list=[recipient]).process()
+
+    with SMTPSinkServer() as server, _get_smtp_settings(server):
+        yield run
+
+
+def _get_converter_setup(converter_class: type, html_content: str):
+    def setup(items: int):
+        converter = converter_class()
+
+        def run() -> None:
+            for _item in range(items):
+                converter.convert(html_content)
+
+        yield run
+
+    return setup
+
+
+for converter_name, converter_class in (
+    ("streaming", StreamingHtmlToTextConverter),
+    ("beautifulsoup", BeautifulSoupHtmlToTextConverter),
+):
+    benchmark(f"converter.{converter_name}.small", items=500, quick_items=50)(
+        _get_converter_setup(converter_class, SMALL_HTML)
+    )
+    benchmark(f"converter.{converter_name}.large", items=5, quick_items=1)(
+        _get_converter_setup(converter_class, LARGE_HTML)
+    )
+
+
+@benchmark("factory.process.locmem.10k", items=10_000, quick_items=500)
+@benchmark("factory.process.locmem.1k", items=1_000, quick_items=100)
+def factory_process_locmem(items: int):
+    recipient_list = _get_recipient_list(items)
+
+    def run() -> None:
+        mail.outbox = []
+        BenchmarkEmailServiceFactory(recipient_email_list=recipient_list).process()
+
+    yield run
+
+
+@benchmark("factory.process.locmem.broadcast.1k", items=1_000, quick_items=100)
+def factory_process_locmem_broadcast(items: int):
+    recipient_list = _get_recipient_list(items)
+
+    def run() -> None:
+        mail.outbox = []
+        factory = BenchmarkEmailServiceFactory(recipient_email_list=recipient_list)
+        factory.broadcast = True
+        factory.process()
+
+    yield run
+
+
+@benchmark("factory.process.smtp.1k", items=1_000, quick_items=100)
+def factory_process_smtp_1k(items: int):
+    recipient_list = _get_recipient_list(items)
+
+    def run() -> None:
+        BenchmarkEmailServiceFactory(recipient_email_list=recipient_list).process()
+
+    with SMTPSinkServer() as server, _get_smtp_settings(server):
+        yield run
+
+
+def _fill_outbox(items: int) -> None:
+    mail.outbox = [
+        EmailMultiAlternatives(
+            subject=f"The Pony Express #{number % 10}",
+            body="Giddy up",
+            to=[recipient],
+            cc=["stable@example.com"],
+        )
+        for number, recipient in enumerate(_get_recipient_list(items))
+    ]
+
+
+@benchmark("outbox.filter.100k", items=100_000, quick_items=5_000)
+@benchmark("outbox.filter.10k", items=10_000, quick_items=1_000)
+def outbox_filter(items: int):
+    _fill_outbox(items)
+    last_recipient = f"rider.{items - 1}@example.com"
+
+    def run() -> None:
+        EmailTestService().filter(to=last_recipient).assert_one()
+        EmailTestService().filter(cc="stable@example.com", subject="The Pony Express #3").count()
+
+    yield run
+    mail.outbox = []
@@ -0,0 +1,121 @@
+import contextlib
+import datetime
+import platform
+import statistics
+import time
+from collections.abc import Callable
+
+import django
+
+import django_pony_express
+
+# Registered benchmarks in definition order
+_benchmark_list: list = []
+
+
+class Benchmark:
+    """
+    A named piece of work processing `items` items (e.g. emails). `setup` is a generator function taking the number of
+    items: everything before its `yield` prepares the run, the yielded callable is measured and everything after the
+    `yield` cleans up.
+    """
+
+    def __init__(self, name: str, setup: Callable, items: int, quick_items: int | None = None) -> None:
+        self.name = name
+        self.setup = contextlib.contextmanager(setup)
+        self.items = items
+        self.quick_items = quick_items or items
+
+    def run(self, repeat: int, quick: bool = False) -> dict:
+        """
+        Measures the benchmark `repeat` times after one warm-up round and returns the statistics in seconds.
+        """
+        items = self.quick_items if quick else self.items
+        timing_list = []
+        with self.setup(items) as function:
+            function()
+            for _round in range(repeat):
+                started_at = time.perf_counter()
+                function()
+                timing_list.append(time.perf_counter() - started_at)
+
+        median = statistics.median(timing_list)
+        return {
+            "name": self.name,
+            "items": items,
+            "repeat": repeat,
+            "min": min(timing_list),
+            "max": max(timing_list),
+            "mean": statistics.mean(timing_list),
+            "median": median,
+            "stdev": statistics.stdev(timing_list) if repeat > 1 else 0.0,
+            "items_per_second": items / median if median else None,
+        }
+
+
+def benchmark(name: str, items: int = 1, quick_items: int | None = None) -> Callable:
+    """
+    Decorator registering a setup generator function as benchmark.
+    """
+
+    def decorator(setup: Callable) -> Callable:
+        _benchmark_list.append(Benchmark(name=name, setup=setup, items=items, quick_items=quick_items))
+        return setup
+
+    return decorator
+
+
+def get_benchmarks(name_filter: str | None = None) -> list[Benchmark]:
+    """
+    Returns all registered benchmarks whose name contains `name_filter`.
+    """
+    return [item for item in _benchmark_list if not name_filter or name_filter in item.name]
+
+
+def run_benchmarks(
+    benchmark_list: list[Benchmark], repeat: int = 5, quick: bool = False, progress: Callable | None = None
+) -> dict:
+    """
+    Runs the given benchmarks and returns a JSON-serialisable report including the environment.
+    """
+    result_list = []
+    for item in benchmark_list:
+        result = item.run(repeat=repeat, quick=quick)
+        if progress is not None:
+            progress(result)
+        result_list.append(result)
+
+    return {
+        "created_at": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "django": django.get_version(),
+            "django_pony_express": django_pony_express.__version__,
+            "platform": platform.platform(),
+        },
+        "quick": quick,
+        "results": result_list,
+    }
+
+
+def compare_reports(report: dict, baseline: dict) -> list[dict]:
+    """
+    Compares the medians of two reports. A `change` of 0.1 means the benchmark got 10% slower than in the baseline.
+    Benchmarks missing in either report or run with a different number of items are skipped.
+    """
+    baseline_dict = {result["name"]: result for result in baseline["results"]}
+    comparison_list = []
+    for result in report["results"]:
+        baseline_result = baseline_dict.get(result["name"])
+        if baseline_result is None or baseline_result["items"] != result["items"]:
+            continue
+        comparison_list.append(
+            {
+                "name": result["name"],
+                "median": result["median"],
+                "baseline_median": baseline_result["median"],
+                "change": result["median"] / baseline_result["median"] - 1,
+            }
+        )
+    return comparison_list
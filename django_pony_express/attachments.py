@@ -0,0 +1,197 @@
+import base64
+import contextlib
+import mimetypes
+import os
+import re
+import threading
+import uuid
+from collections.abc import Callable, Iterator
+from email.message import Message
+from email.mime.base import MIMEBase
+from pathlib import Path
+from typing import BinaryIO
+
+from django.core.mail import EmailMessage
+
+# Number of raw bytes encoded to one base64 line of 76 characters
+BASE64_LINE_SIZE = 57
+
+# Set while a message is serialised for streaming, see `iter_message_chunks()`
+_streaming_state = threading.local()
+
+
+class AttachmentCache:
+    """
+    Keeps the files attached via their path in memory, so a factory run reads every file (and detects its mimetype)
+    only once. All emails attach the same content object instead of a copy of their own.
+    Files are cached until the total size of their contents would exceed `max_size` bytes, further files are read for
+    every email as usual.
+    """
+
+    def __init__(self, max_size: int = 32 * 1024 * 1024) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of all cached contents
+        """
+        return self._size
+
+    def attach_file(self, msg: EmailMessage, path: str | Path) -> None:
+        """
+        Attaches the file at `path` to `msg`, like `msg.attach_file(path)` does.
+        """
+        key = os.fspath(path)
+        with self._lock:
+            attachment = self._entries.get(key)
+            if attachment is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if attachment is not None:
+            msg.attach(*attachment)
+            return
+
+        # Let Django read the file, guess the mimetype and decode text files, then keep the result
+        msg.attach_file(path)
+        filename, content, mimetype = msg.attachments[-1]
+        size = len(content)
+        with self._lock:
+            if key not in self._entries and self._size + size <= self.max_size:
+                self._entries[key] = (filename, content, mimetype)
+                self._size += size
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets the counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+
+class StreamingAttachment(MIMEBase):
+    """
+    Attachment reading its file only when the email is serialised. Backends writing messages in chunks (like the
+    `StreamingSMTPEmailBackend`) read and base64-encode it `chunk_size` bytes at a time, so the memory required per
+    message doesn't grow with the size of the file. Other backends get the whole content encoded at once.
+    Override `open()` to read from another source than the local file system (e.g. a storage backend).
+    """
+
+    def __init__(
+        self, path: str | Path, filename: str | None = None, mimetype: str | None = None, chunk_size: int = 64 * 1024
+    ) -> None:
+        self.path = path
+        self.filename = filename or os.path.basename(path)
+        self.chunk_size = chunk_size
+        self._encoded_payload = None
+        # Used as stand-in for the content while the message is serialised for streaming
+        self.placeholder = f"pony-express-streaming-attachment-{uuid.uuid4().hex}"
+        mimetype = mimetype or mimetypes.guess_type(self.filename)[0] or "application/octet-stream"
+        super().__init__(*mimetype.split("/", 1))
+        try:
+            self.filename.encode("ascii")
+            filename = self.filename
+        except UnicodeEncodeError:
+            filename = ("utf-8", "", self.filename)
+        self.add_header("Content-Disposition", "attachment", filename=filename)
+        self["Content-Transfer-Encoding"] = "base64"
+
+    @property
+    def _payload(self) -> str | None:
+        # The content is generated on access, so serialising the message doesn't require a custom generator
+        if getattr(_streaming_state, "active", False):
+            return self.placeholder
+        # The generator accesses the payload several times per message
+        if self._encoded_payload is None:
+            self._encoded_payload = b"".join(self.iter_encoded()).decode("ascii")
+        return self._encoded_payload
+
+    @_payload.setter
+    def _payload(self, value) -> None:
+        if value is not None:
+            raise TypeError("The content of a StreamingAttachment is read from its file.")
+
+    def __getstate__(self) -> dict:
+        # Copies and pickles (e.g. in the database outbox) read the file again
+        state = self.__dict__.copy()
+        state["_encoded_payload"] = None
+        return state
+
+    def is_multipart(self) -> bool:
+        # Don't read the file just to check the type of the payload (e.g. when walking through the message)
+        return False
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the file (before encoding)
+        """
+        return os.path.getsize(self.path)
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+    def iter_encoded(self, linesep: bytes = b"\n") -> Iterator[bytes]:
+        """
+        Yields the base64-encoded content in lines of 76 characters, read `chunk_size` bytes at a time.
+        """
+        read_size = max(self.chunk_size // BASE64_LINE_SIZE, 1) * BASE64_LINE_SIZE
+        with self.open() as f:
+            while chunk := f.read(read_size):
+                # Short reads would lead to padding in the middle of the content
+                while len(chunk) < read_size and (rest := f.read(read_size - len(chunk))):
+                    chunk += rest
+                encoded = base64.b64encode(chunk)
+                yield b"".join(encoded[i : i + 76] + linesep for i in range(0, len(encoded), 76))
+
+
+@contextlib.contextmanager
+def _streaming_placeholders() -> Iterator[None]:
+    _streaming_state.active = True
+    try:
+        yield
+    finally:
+        _streaming_state.active = False
+
+
+def iter_message_chunks(mime_message: Message, serialize: Callable, linesep: bytes = b"\r\n") -> Iterator[bytes]:
+    """
+    Yields the serialised message in chunks. `serialize` returns the message as bytes (e.g. `mime_message.as_bytes`).
+    The content of streaming attachments is not part of it but read and encoded on the fly.
+    """
+    attachment_dict = {
+        part.placeholder.encode(): part for part in mime_message.walk() if isinstance(part, StreamingAttachment)
+    }
+    if not attachment_dict:
+        yield serialize()
+        return
+
+    with _streaming_placeholders():
+        data = serialize()
+    placeholder_pattern = re.compile(b"(" + b"|".join(re.escape(placeholder) for placeholder in attachment_dict) + b")")
+    for index, segment in enumerate(placeholder_pattern.split(data)):
+        if index % 2:
+            yield from attachment_dict[segment].iter_encoded(linesep=linesep)
+        elif segment:
+            yield segment
+
+
+def get_message_size(msg: EmailMessage) -> int:
+    """
+    Returns the size of the serialised message in bytes. Streaming attachments are measured chunk by chunk.
+    """
+    mime_message = msg.message()
+    return sum(len(chunk) for chunk in iter_message_chunks(mime_message, mime_message.as_bytes, linesep=b"\n"))
@@ -0,0 +1,350 @@
+import asyncio
+import base64
+import contextlib
+import email.policy
+import functools
+import re
+import smtplib
+from collections.abc import Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends import smtp
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.utils import DNS_NAME
+from django.utils.module_loading import import_string
+
+from django_pony_express.attachments import iter_message_chunks
+from django_pony_express.settings import PONY_ASYNC_EMAIL_BACKEND
+
+try:
+    from django.core.mail.message import sanitize_address
+except ImportError:  # Deprecated since Django 6.0, not required there anymore
+    sanitize_address = None
+
+CRLF = b"\r\n"
+
+# SMTP reply codes
+SMTP_SERVICE_READY = 220
+SMTP_CLOSING = 221
+SMTP_AUTH_SUCCESSFUL = 235
+SMTP_OK = 250
+SMTP_USER_NOT_LOCAL = 251
+SMTP_START_MAIL_INPUT = 354
+
+
+def _prepare_smtp_message(
+    smtp_backend: smtp.EmailBackend, email_message: EmailMessage
+) -> tuple[str, list[str], Iterator[bytes]]:
+    """
+    Returns sender, recipients and the serialised message (in chunks) the same way Django's SMTP backend does it.
+    """
+    if hasattr(smtp_backend, "prep_address"):
+        # Since Django 6.0, the backend prepares addresses itself
+        prep_address = smtp_backend.prep_address
+        mime_message = email_message.message(policy=email.policy.SMTP)
+        return (
+            prep_address(email_message.from_email),
+            [prep_address(address) for address in email_message.recipients()],
+            iter_message_chunks(mime_message, mime_message.as_bytes),
+        )
+
+    encoding = email_message.encoding or settings.DEFAULT_CHARSET
+    mime_message = email_message.message()
+    return (
+        sanitize_address(email_message.from_email, encoding),
+        [sanitize_address(address, encoding) for address in email_message.recipients()],
+        iter_message_chunks(mime_message, functools.partial(mime_message.as_bytes, linesep="\r\n")),
+    )
+
+
+def _quote_lines(data: bytes) -> bytes:
+    """
+    Normalises line endings and applies the dot-stuffing required by the DATA command.
+    """
+    data = re.sub(rb"(?:\r\n|\n|\r(?!\n))", CRLF, data)
+    return re.sub(rb"(?m)^\.", b"..", data)
+
+
+def _iter_data(chunk_iterator: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Yields the chunks of a message quoted for the DATA command, followed by the terminating line.
+    Chunks have to end at line boundaries.
+    """
+    data = b""
+    for chunk in chunk_iterator:
+        data = _quote_lines(chunk)
+        yield data
+    yield (b"" if data.endswith(CRLF) else CRLF) + b"." + CRLF
+
+
+class BaseAsyncEmailBackend:
+    """
+    Async counterpart of Django's `BaseEmailBackend`. Subclasses must implement `send_messages()` and may implement
+    `open()` and `close()` for backends keeping a session open.
+    """
+
+    def __init__(self, fail_silently: bool = False, **kwargs) -> None:
+        self.fail_silently = fail_silently
+
+    async def open(self) -> bool | None:
+        """
+        Opens a network connection. Returns `True` if a new connection was created.
+        """
+        return None
+
+    async def close(self) -> None:
+        """
+        Closes the network connection.
+        """
+        return None
+
+    async def __aenter__(self) -> "BaseAsyncEmailBackend":
+        try:
+            await self.open()
+        except Exception:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def send_messages(self, email_messages: list[EmailMessage]) -> int:
+        """
+        Sends one or more email messages and returns the number of sent messages.
+        """
+        raise NotImplementedError
+
+
+class SyncEmailBackendAdapter(BaseAsyncEmailBackend):
+    """
+    Wraps a regular (blocking) Django email backend. Every call is executed in a worker thread, so the event loop isn't
+    blocked. Used if no native async backend is configured.
+    """
+
+    def __init__(self, connection: BaseEmailBackend | None = None, fail_silently: bool = False, **kwargs) -> None:
+        super().__init__(fail_silently=fail_silently)
+        self.connection = (
+            connection if connection is not None else get_connection(fail_silently=fail_silently, **kwargs)
+        )
+
+    async def open(self) -> bool | None:
+        return await sync_to_async(self.connection.open, thread_sensitive=False)()
+
+    async def close(self) -> None:
+        await sync_to_async(self.connection.close, thread_sensitive=False)()
+
+    async def send_messages(self, email_messages: list[EmailMessage]) -> int:
+        return await sync_to_async(self.connection.send_messages, thread_sensitive=False)(email_messages)
+
+
+class SMTPAsyncEmailBackend(BaseAsyncEmailBackend):
+    """
+    Native asyncio SMTP backend. Takes the same arguments and settings as Django's SMTP backend.
+    One instance holds one SMTP session, concurrent calls of `send_messages()` are processed one after another.
+    STARTTLS requires Python 3.11 or newer.
+    """
+
+    def __init__(self, fail_silently: bool = False, **kwargs) -> None:
+        super().__init__(fail_silently=fail_silently)
+        # Re-use Django's SMTP backend for resolving the configuration (host, port, credentials, TLS...) and preparing
+        # messages
+        self._smtp_backend = smtp.EmailBackend(fail_silently=fail_silently, **kwargs)
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def timeout(self) -> float | None:
+        return self._smtp_backend.timeout
+
+    async def _read_reply(self) -> tuple[int, str]:
+        """
+        Reads a (multi-line) reply of the server and returns the status code and the message.
+        """
+        line_list = []
+        while True:
+            line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            if not line:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            line_list.append(line[4:].strip().decode(errors="replace"))
+            if line[3:4] != b"-":
+                try:
+                    return int(line[:3]), "\n".join(line_list)
+                except ValueError as e:
+                    raise smtplib.SMTPResponseException(-1, line.decode(errors="replace")) from e
+
+    async def _command(self, command: str, expected: tuple = (SMTP_OK,)) -> str:
+        if self._writer is None:
+            raise smtplib.SMTPServerDisconnected("Please run open() first")
+        self._writer.write(command.encode() + CRLF)
+        await self._writer.drain()
+        code, message = await self._read_reply()
+        if code not in expected:
+            raise smtplib.SMTPResponseException(code, message)
+        return message
+
+    async def _ehlo(self) -> None:
+        try:
+            await self._command(f"EHLO {DNS_NAME.get_fqdn()}")
+        except smtplib.SMTPResponseException:
+            await self._command(f"HELO {DNS_NAME.get_fqdn()}")
+
+    async def _abort(self) -> None:
+        """
+        Drops the connection without saying goodbye.
+        """
+        writer = self._writer
+        self._reader = self._writer = None
+        if writer is not None:
+            writer.close()
+            with contextlib.suppress(OSError, asyncio.TimeoutError):
+                await writer.wait_closed()
+
+    async def open(self) -> bool | None:
+        if self._writer is not None:
+            # Nothing to do if the connection is already open.
+            return False
+
+        backend = self._smtp_backend
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    backend.host, backend.port, ssl=backend.ssl_context if backend.use_ssl else None
+                ),
+                self.timeout,
+            )
+            code, message = await self._read_reply()
+            if code != SMTP_SERVICE_READY:
+                raise smtplib.SMTPConnectError(code, message)
+            await self._ehlo()
+            if backend.use_tls:
+                if not hasattr(self._writer, "start_tls"):
+                    raise smtplib.SMTPNotSupportedError("STARTTLS requires Python 3.11 or newer.")
+                await self._command("STARTTLS", expected=(SMTP_SERVICE_READY,))
+                await self._writer.start_tls(backend.ssl_context, server_hostname=backend.host)
+                await self._ehlo()
+            if backend.username and backend.password:
+                credentials = base64.b64encode(f"\0{backend.username}\0{backend.password}".encode()).decode()
+                await self._command(f"AUTH PLAIN {credentials}", expected=(SMTP_AUTH_SUCCESSFUL,))
+        except (OSError, smtplib.SMTPException, asyncio.TimeoutError):
+            await self._abort()
+            if not self.fail_silently:
+                raise
+            return None
+        return True
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            await self._command("QUIT", expected=(SMTP_CLOSING,))
+        except (OSError, smtplib.SMTPException, asyncio.TimeoutError):
+            if not self.fail_silently:
+                raise
+        finally:
+            await self._abort()
+
+    async def send_messages(self, email_messages: list[EmailMessage]) -> int:
+        if not email_messages:
+            return 0
+        async with self._lock:
+            new_conn_created = await self.open()
+            if self._writer is None or new_conn_created is None:
+                # We failed silently on open(). Trying to send would be pointless.
+                return 0
+            num_sent = 0
+            try:
+                for message in email_messages:
+                    if await self._send(message):
+                        num_sent += 1
+            finally:
+                if new_conn_created:
+                    await self.close()
+        return num_sent
+
+    async def _send(self, email_message: EmailMessage) -> bool:
+        if not email_message.recipients():
+            return False
+        from_email, recipient_list, chunk_iterator = _prepare_smtp_message(self._smtp_backend, email_message)
+        try:
+            await self._command(f"MAIL FROM:<{from_email}>")
+            for recipient in recipient_list:
+                await self._command(f"RCPT TO:<{recipient}>", expected=(SMTP_OK, SMTP_USER_NOT_LOCAL))
+            await self._command("DATA", expected=(SMTP_START_MAIL_INPUT,))
+            # Streaming attachments are encoded while writing, so only one chunk is held in memory at a time
+            for data in _iter_data(chunk_iterator):
+                self._writer.write(data)
+                await self._writer.drain()
+            code, message = await self._read_reply()
+            if code != SMTP_OK:
+                raise smtplib.SMTPDataError(code, message)
+        except smtplib.SMTPResponseException:
+            # Reset the session, so the next message starts from a clean state
+            with contextlib.suppress(OSError, smtplib.SMTPException, asyncio.TimeoutError):
+                await self._command("RSET")
+            if not self.fail_silently:
+                raise
+            return False
+        return True
+
+
+class StreamingSMTPEmailBackend(smtp.EmailBackend):
+    """
+    Django's SMTP backend, but writes messages with `StreamingAttachment`s in chunks. Their content is read and encoded
+    while sending instead of building the whole message in memory first.
+    """
+
+    def _start_data(self, from_email: str, recipient_list: list[str]) -> None:
+        """
+        Sends the envelope like `smtplib.SMTP.sendmail()` does and starts the DATA command.
+        """
+        connection = self.connection
+        connection.ehlo_or_helo_if_needed()
+        code, message = connection.mail(from_email)
+        if code != SMTP_OK:
+            raise smtplib.SMTPSenderRefused(code, message, from_email)
+        refused_dict = {}
+        for recipient in recipient_list:
+            code, message = connection.rcpt(recipient)
+            if code not in (SMTP_OK, SMTP_USER_NOT_LOCAL):
+                refused_dict[recipient] = (code, message)
+        if len(refused_dict) == len(recipient_list):
+            raise smtplib.SMTPRecipientsRefused(refused_dict)
+        connection.putcmd("data")
+        code, message = connection.getreply()
+        if code != SMTP_START_MAIL_INPUT:
+            raise smtplib.SMTPDataError(code, message)
+
+    def _send(self, email_message: EmailMessage) -> bool:
+        if not email_message.recipients():
+            return False
+        from_email, recipient_list, chunk_iterator = _prepare_smtp_message(self, email_message)
+        try:
+            self._start_data(from_email, recipient_list)
+            for data in _iter_data(chunk_iterator):
+                self.connection.send(data)
+            code, message = self.connection.getreply()
+            if code != SMTP_OK:
+                raise smtplib.SMTPDataError(code, message)
+        except smtplib.SMTPException:
+            # Reset the session, so the next message starts from a clean state
+            with contextlib.suppress(OSError, smtplib.SMTPException):
+                self.connection.rset()
+            if not self.fail_silently:
+                raise
+            return False
+        return True
+
+
+def get_async_connection(backend: str | None = None, fail_silently: bool = False, **kwargs) -> BaseAsyncEmailBackend:
+    """
+    Async counterpart of Django's `get_connection()`. Loads the backend configured in
+    `DJANGO_PONY_EXPRESS_ASYNC_EMAIL_BACKEND`. If none is set, the regular Django email backend is wrapped, so it
+    doesn't block the event loop.
+    """
+    backend = backend or PONY_ASYNC_EMAIL_BACKEND
+    klass = import_string(backend) if backend else SyncEmailBackendAdapter
+    return klass(fail_silently=fail_silently, **kwargs)
@@ -0,0 +1,118 @@
+import io
+from email.generator import BytesGenerator
+from email.message import Message
+from email.policy import Policy
+from email.utils import formatdate, make_msgid
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.utils import DNS_NAME
+
+try:
+    from django.core.mail.message import forbid_multi_line_headers
+except ImportError:  # Deprecated since Django 6.0, the email policy takes care of encoding the headers there
+    forbid_multi_line_headers = None
+
+
+def _serialize(mime_message: Message, policy: Policy) -> bytes:
+    fp = io.BytesIO()
+    BytesGenerator(fp, mangle_from_=False, policy=policy).flatten(mime_message)
+    return fp.getvalue()
+
+
+class PreSerializedMessage(Message):
+    """
+    MIME message consisting of its headers and a body which has already been serialised. Serialising it only writes
+    the headers.
+    """
+
+    def __init__(self, body_dict: dict, policy: Policy) -> None:
+        super().__init__(policy=policy)
+        # Serialised body per line separator, shared by all messages of a broadcast
+        self.body_dict = body_dict
+
+    def as_bytes(self, unixfrom: bool = False, linesep: str | None = None, policy: Policy | None = None) -> bytes:
+        policy = self.policy if policy is None else policy
+        if linesep is not None:
+            policy = policy.clone(linesep=linesep)
+        # Written like the generator does it, but without the (empty) payload
+        header_list = [policy.fold_binary(name, value) for name, value in self.raw_items()]
+        return b"".join(header_list) + policy.linesep.encode() + self.body_dict[policy.linesep]
+
+    def as_string(self, unixfrom: bool = False, linesep: str | None = None, policy: Policy | None = None) -> str:
+        return self.as_bytes(unixfrom=unixfrom, linesep=linesep, policy=policy).decode(errors="surrogateescape")
+
+
+class BroadcastBody:
+    """
+    Email which is sent unchanged to many recipients. The MIME message is built and serialised once (per email policy),
+    the messages of the single recipients only differ in their headers.
+    """
+
+    # Headers written per recipient, unless they are set via `extra_headers`
+    RECIPIENT_HEADER_LIST = ("To", "Date", "Message-ID")
+
+    def __init__(self, msg: EmailMultiAlternatives) -> None:
+        self.msg = msg
+        self._prepared_dict = {}
+
+    def __deepcopy__(self, memo: dict) -> "BroadcastBody":
+        # Shared and never changed, e.g. the locmem backend copies the messages of its outbox
+        return self
+
+    def _prepare(self, **kwargs) -> tuple[Message, dict]:
+        """
+        Returns the MIME message of the prototype and its serialised body per line separator.
+        """
+        key = kwargs.get("policy")
+        if key not in self._prepared_dict:
+            mime_message = self.msg.message(**kwargs)
+            body_dict = {}
+            for linesep in ("\n", "\r\n"):
+                data = _serialize(mime_message, mime_message.policy.clone(linesep=linesep))
+                separator = (linesep * 2).encode()
+                body_dict[linesep] = data[data.index(separator) + len(separator) :]
+            self._prepared_dict[key] = (mime_message, body_dict)
+        return self._prepared_dict[key]
+
+    def get_mime_message(self, to: list, **kwargs) -> PreSerializedMessage:
+        """
+        Returns the MIME message for the given recipients, sharing the serialised body of the prototype.
+        """
+        mime_message, body_dict = self._prepare(**kwargs)
+        recipient_mime_message = PreSerializedMessage(body_dict, policy=mime_message.policy)
+        for name, value in mime_message.raw_items():
+            recipient_mime_message.set_raw(name, value)
+
+        header_names = {name.lower() for name in self.msg.extra_headers}
+        value_dict = {
+            "To": ", ".join(str(address) for address in to),
+            "Date": formatdate(localtime=settings.EMAIL_USE_LOCALTIME),
+            "Message-ID": make_msgid(domain=DNS_NAME),
+        }
+        for header_name in self.RECIPIENT_HEADER_LIST:
+            if header_name.lower() in header_names or header_name not in recipient_mime_message:
+                continue
+            name, value = header_name, value_dict[header_name]
+            if forbid_multi_line_headers is not None:
+                name, value = forbid_multi_line_headers(name, value, self.msg.encoding or settings.DEFAULT_CHARSET)
+            recipient_mime_message.replace_header(name, value)
+        return recipient_mime_message
+
+
+class BroadcastEmailMessage(EmailMultiAlternatives):
+    """
+    Email of a single recipient of a broadcast. Shares subject, content and attachments with the `BroadcastBody`.
+    """
+
+    def __init__(self, broadcast_body: BroadcastBody, to: list, bcc: list | None = None) -> None:
+        # Deliberately not calling super(): all attributes are taken over from the prototype without copying
+        self.__dict__.update(broadcast_body.msg.__dict__)
+        self.to = list(to)
+        if bcc:
+            # BCC recipients don't show up in the headers, so the serialised email stays the same
+            self.bcc = [*self.bcc, *bcc]
+        self.broadcast_body = broadcast_body
+
+    def message(self, **kwargs) -> PreSerializedMessage:
+        return self.broadcast_body.get_mime_message(self.to, **kwargs)
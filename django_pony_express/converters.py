@@ -0,0 +1,254 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+
+class BaseHtmlToTextConverter:
+    """
+    Converts the HTML part of an email into its plain text counterpart.
+    Links are rendered as "[LINK NAME] ([LINK URL])", every text segment ends up on its own line.
+    """
+
+    def convert(self, html_content: str) -> str:
+        raise NotImplementedError
+
+
+class BeautifulSoupHtmlToTextConverter(BaseHtmlToTextConverter):
+    """
+    Converter building a full DOM tree with BeautifulSoup.
+    """
+
+    def convert(self, html_content: str) -> str:
+        soup = BeautifulSoup(html_content, "html.parser")
+
+        # Convert links to this pattern: "[LINK NAME] ([LINK URL])"
+        for a in soup.find_all("a"):
+            text = a.get_text()
+            href = a.get("href", "")
+            a.replace_with(f"{text} ({href})")
+
+        return soup.get_text(separator="\n", strip=True)
+
+
+class _HtmlToTextParser(HTMLParser):
+    """
+    SAX-style parser collecting the text segments of an HTML document in a single pass without building a tree.
+    """
+
+    # Text within these tags is not visible content
+    SKIPPED_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+    # Whitespace within these tags is kept as it is
+    PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+    # Elements which never have content and thus don't need to be closed
+    VOID_TAGS = frozenset(
+        {
+            "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track",
+            "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex", "keygen", "menuitem", "nextid",
+            "spacer",
+        }
+    )  # fmt: skip
+    ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.text_list = []
+        self._data = []
+        self._open_tags = []
+        self._closed_void_tags = []
+        self._skip_depth = 0
+        self._preserve_whitespace_depth = 0
+        self._link_depth = 0
+        self._link_href = ""
+        self._link_text = []
+
+    def _end_data(self) -> None:
+        """
+        Finishes the current text segment. Segments consisting of whitespace only are collapsed, like BeautifulSoup
+        does it, so that the text of links looks the same with both converters.
+        """
+        if not self._data:
+            return
+
+        data = "".join(self._data)
+        self._data = []
+
+        if not self._preserve_whitespace_depth and not data.strip(self.ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+
+        if self._link_depth:
+            self._link_text.append(data)
+        else:
+            self._append_text(data)
+
+    def _append_text(self, text: str) -> None:
+        text = text.strip()
+        if text:
+            self.text_list.append(text)
+
+    def _start_tag(self, tag: str, attrs: list) -> None:
+        self._end_data()
+        if tag in self.VOID_TAGS:
+            return
+
+        self._open_tags.append(tag)
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in self.PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace_depth += 1
+        elif tag == "a":
+            if not self._link_depth:
+                self._link_href = dict(attrs).get("href") or ""
+                self._link_text = []
+            self._link_depth += 1
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        self._start_tag(tag, attrs)
+        if tag in self.VOID_TAGS:
+            # Same as BeautifulSoup, we ignore a later (invalid) end tag of a void element like "</br>"
+            self._closed_void_tags.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        # Self-closing notation, e.g. "<br/>" or "<a href='...' />"
+        self._start_tag(tag, attrs)
+        self._end_tag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._closed_void_tags:
+            self._closed_void_tags.remove(tag)
+            return
+        self._end_tag(tag)
+
+    def _end_tag(self, tag: str) -> None:
+        self._end_data()
+        # End tags without a matching start tag are ignored, otherwise all tags opened in between are closed as well
+        if tag not in self._open_tags:
+            return
+        while self._open_tags:
+            open_tag = self._open_tags.pop()
+            self._close_tag(open_tag)
+            if open_tag == tag:
+                break
+
+    def _close_tag(self, tag: str) -> None:
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth -= 1
+        elif tag in self.PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace_depth -= 1
+        elif tag == "a":
+            self._link_depth -= 1
+            if not self._link_depth:
+                self._end_link()
+
+    def _end_link(self) -> None:
+        # Convert links to this pattern: "[LINK NAME] ([LINK URL])"
+        self._append_text(f"{''.join(self._link_text)} ({self._link_href})")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._data.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._end_data()
+
+    def handle_decl(self, decl: str) -> None:
+        self._end_data()
+
+    def handle_pi(self, data: str) -> None:
+        self._end_data()
+
+    def unknown_decl(self, data: str) -> None:
+        self._end_data()
+
+    def close(self) -> None:
+        super().close()
+        self._end_data()
+        # Unclosed elements (e.g. links) span until the end of the document
+        while self._open_tags:
+            self._close_tag(self._open_tags.pop())
+
+
+class StreamingHtmlToTextConverter(BaseHtmlToTextConverter):
+    """
+    Converter walking the HTML in one pass with a SAX-style parser. Creates the same output as the
+    `BeautifulSoupHtmlToTextConverter` without building a DOM tree.
+    """
+
+    def convert(self, html_content: str) -> str:
+        parser = _HtmlToTextParser()
+        parser.feed(html_content)
+        parser.close()
+        return "\n".join(parser.text_list)
+
+
+class HtmlToTextCache:
+    """
+    Bounded LRU cache for plain text parts, keyed by a hash of the rendered HTML. Emails with byte-identical HTML
+    content are converted only once. Limited by number of entries and total length of the cached texts.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_size: int = 16 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """
+        Total length of all cached texts
+        """
+        return self._size
+
+    def _get_key(self, html_content: str, converter_class: type) -> tuple:
+        return (
+            converter_class,
+            hashlib.blake2b(html_content.encode("utf-8", "surrogatepass"), digest_size=16).digest(),
+        )
+
+    def convert(self, html_content: str, converter_class: type[BaseHtmlToTextConverter]) -> str:
+        """
+        Returns the cached plain text for the given HTML or converts it with `converter_class` and stores the result.
+        """
+        key = self._get_key(html_content, converter_class)
+        with self._lock:
+            text_content = self._entries.get(key)
+            if text_content is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text_content
+            self.misses += 1
+
+        # Convert outside the lock, so other threads aren't blocked. Worst case, two threads convert the same HTML.
+        text_content = converter_class().convert(html_content)
+        if len(text_content) <= self.max_size:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = text_content
+                    self._size += len(text_content)
+                    self._evict()
+
+        return text_content
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or self._size > self.max_size:
+            _key, text_content = self._entries.popitem(last=False)
+            self._size -= len(text_content)
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets the counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
@@ -4,3 +4,7 @@ class EmailServiceConfigError(RuntimeError):
 
 class EmailServiceAttachmentError(RuntimeError):
     pass
+
+
+class EmailServiceQueueFullError(RuntimeError):
+    pass
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxConfig(AppConfig):
+    name = "django_pony_express.outbox"
+    label = "django_pony_express_outbox"
+    verbose_name = _("Email outbox")
+    default_auto_field = "django.db.models.BigAutoField"
@@ -0,0 +1,35 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from django_pony_express.outbox.worker import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = "Sends the emails stored in the outbox. Run multiple instances to scale the throughput."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--batch-size", type=int, default=OutboxWorker.batch_size, help="Emails claimed at once")
+        parser.add_argument(
+            "--max-attempts", type=int, default=OutboxWorker.max_attempts, help="Attempts before giving up an email"
+        )
+        parser.add_argument(
+            "--lease",
+            type=int,
+            default=int(OutboxWorker.lease.total_seconds()),
+            help="Seconds after which emails claimed by a crashed worker are released again",
+        )
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait if the outbox is empty")
+        parser.add_argument("--once", action="store_true", help="Stop as soon as the outbox is empty")
+
+    def handle(self, *args, **options) -> None:
+        worker = OutboxWorker(
+            batch_size=options["batch_size"],
+            max_attempts=options["max_attempts"],
+            lease=datetime.timedelta(seconds=options["lease"]),
+        )
+        try:
+            counter = worker.run(once=options["once"], sleep=options["sleep"])
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(f"Processed {counter} email(s).")
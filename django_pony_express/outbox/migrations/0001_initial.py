@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(blank=True, max_length=255, verbose_name='Subject')),
+                ('from_email', models.TextField(verbose_name='Sender')),
+                ('recipients', models.JSONField(default=list, verbose_name='Recipients')),
+                ('message_data', models.BinaryField(verbose_name='Message data')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('claim_token', models.UUIDField(blank=True, db_index=True, null=True, verbose_name='Claim token')),
+                ('claimed_until', models.DateTimeField(blank=True, null=True, verbose_name='Claimed until')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent at')),
+            ],
+            options={
+                'verbose_name': 'Outbox email',
+                'verbose_name_plural': 'Outbox emails',
+                'indexes': [models.Index(fields=['status', 'claimed_until'], name='pony_outbox_claimable_idx')],
+            },
+        ),
+    ]
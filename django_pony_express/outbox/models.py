@@ -0,0 +1,114 @@
+import datetime
+import email
+import email.policy
+import uuid
+from email.message import Message
+
+from django.core.mail import EmailMessage
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxEmailQuerySet(models.QuerySet):
+    def claimable(self) -> "OutboxEmailQuerySet":
+        """
+        Pending emails which aren't claimed by a worker or whose claim has expired (e.g. because the worker died)
+        """
+        return self.filter(status=OutboxEmail.Status.PENDING).filter(
+            models.Q(claimed_until__isnull=True) | models.Q(claimed_until__lt=timezone.now())
+        )
+
+
+class OutboxEmailManager(models.Manager.from_queryset(OutboxEmailQuerySet)):
+    def enqueue(self, msg: EmailMessage) -> "OutboxEmail":
+        """
+        Stores the rendered email in the outbox.
+        """
+        return self.create(
+            subject=str(msg.subject)[:255],
+            from_email=msg.from_email,
+            recipients=[str(recipient) for recipient in msg.recipients()],
+            message_data=OutboxEmail.serialize_message(msg),
+        )
+
+    def claim(self, batch_size: int, lease: datetime.timedelta) -> list["OutboxEmail"]:
+        """
+        Claims up to `batch_size` pending emails for the calling worker for the duration of `lease`.
+        On databases supporting it, the rows are selected with `FOR UPDATE SKIP LOCKED`, so concurrent workers don't
+        wait for each other. Otherwise (e.g. SQLite), the conditional update makes sure that every row is claimed by
+        one worker only.
+        """
+        claim_token = uuid.uuid4()
+        with transaction.atomic():
+            queryset = self.claimable().order_by("id")
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            id_list = list(queryset.values_list("id", flat=True)[:batch_size])
+            if not id_list:
+                return []
+            self.claimable().filter(id__in=id_list).update(
+                claim_token=claim_token, claimed_until=timezone.now() + lease
+            )
+        return list(self.filter(claim_token=claim_token).order_by("id"))
+
+
+class OutboxEmailMessage(EmailMessage):
+    """
+    Email restored from the outbox. Its MIME message is sent to the stored recipients exactly as it was serialised.
+    """
+
+    def __init__(self, message_data: bytes, from_email: str, recipient_list: list, subject: str = "") -> None:
+        # BCC recipients aren't part of the MIME message, so all recipients are stored separately
+        super().__init__(subject=subject, from_email=from_email, to=recipient_list)
+        self.message_data = message_data
+
+    def message(self, **kwargs) -> Message:
+        return email.message_from_bytes(self.message_data, policy=kwargs.get("policy", email.policy.compat32))
+
+
+class OutboxEmail(models.Model):
+    """
+    Rendered email waiting to be sent by the outbox worker (`manage.py process_email_outbox`)
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SENT = "sent", _("Sent")
+        FAILED = "failed", _("Failed")
+
+    subject = models.CharField(_("Subject"), max_length=255, blank=True)
+    from_email = models.TextField(_("Sender"))
+    recipients = models.JSONField(_("Recipients"), default=list)
+    message_data = models.BinaryField(_("Message data"))
+    status = models.CharField(_("Status"), max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(_("Attempts"), default=0)
+    claim_token = models.UUIDField(_("Claim token"), null=True, blank=True, db_index=True)
+    claimed_until = models.DateTimeField(_("Claimed until"), null=True, blank=True)
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    sent_at = models.DateTimeField(_("Sent at"), null=True, blank=True)
+
+    objects = OutboxEmailManager()
+
+    class Meta:
+        verbose_name = _("Outbox email")
+        verbose_name_plural = _("Outbox emails")
+        indexes = (models.Index(fields=("status", "claimed_until"), name="pony_outbox_claimable_idx"),)
+
+    def __str__(self) -> str:
+        return f"{self.subject} ({self.get_status_display()})"
+
+    @staticmethod
+    def serialize_message(msg: EmailMessage) -> bytes:
+        # Only data is stored (no Python objects), so rows can't execute code in the worker and survive upgrades
+        return msg.message().as_bytes()
+
+    def get_message(self) -> OutboxEmailMessage:
+        """
+        Restores the stored email
+        """
+        if not self.recipients:
+            raise ValueError(_("Outbox email has no recipients."))
+        return OutboxEmailMessage(
+            bytes(self.message_data), from_email=self.from_email, recipient_list=self.recipients, subject=self.subject
+        )
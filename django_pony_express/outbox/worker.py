@@ -0,0 +1,85 @@
+import datetime
+import logging
+import time
+
+from django.core.mail import get_connection
+from django.db import close_old_connections, models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from django_pony_express.outbox.models import OutboxEmail
+from django_pony_express.services.sender import EmailSender
+from django_pony_express.settings import PONY_LOGGER_NAME
+
+
+class OutboxWorker:
+    """
+    Sends the emails stored in the outbox. Claims them in batches of `batch_size` and sends every batch over one
+    backend connection. Any number of workers (processes) can run at the same time.
+    Emails failing `max_attempts` times are marked as failed, all others are retried in a later batch.
+    """
+
+    batch_size: int = 100
+    max_attempts: int = 3
+    lease: datetime.timedelta = datetime.timedelta(minutes=5)
+
+    def __init__(
+        self, batch_size: int | None = None, max_attempts: int | None = None, lease: datetime.timedelta | None = None
+    ) -> None:
+        self.batch_size = batch_size or self.batch_size
+        self.max_attempts = max_attempts or self.max_attempts
+        self.lease = lease or self.lease
+        self._logger = logging.getLogger(PONY_LOGGER_NAME)
+
+    def process_batch(self) -> int:
+        """
+        Claims and sends one batch. Returns the number of claimed emails, zero meaning that the outbox is empty.
+        """
+        outbox_email_list = OutboxEmail.objects.claim(batch_size=self.batch_size, lease=self.lease)
+        if not outbox_email_list:
+            return 0
+
+        sent_id_list = []
+        failed_id_list = []
+        with EmailSender(connection=get_connection()) as sender:
+            for outbox_email in outbox_email_list:
+                try:
+                    msg = outbox_email.get_message()
+                except Exception:
+                    self._logger.exception(_('Outbox email "%s" could not be restored.') % outbox_email.pk)
+                    failed_id_list.append(outbox_email.pk)
+                    continue
+                # Sending each email on its own (over the shared connection) tells us exactly which ones failed
+                if sender.send([msg]):
+                    sent_id_list.append(outbox_email.pk)
+                else:
+                    failed_id_list.append(outbox_email.pk)
+
+        OutboxEmail.objects.filter(id__in=sent_id_list).update(
+            status=OutboxEmail.Status.SENT, sent_at=timezone.now(), claim_token=None, claimed_until=None
+        )
+        OutboxEmail.objects.filter(id__in=failed_id_list).update(
+            attempts=models.F("attempts") + 1,
+            status=models.Case(
+                models.When(attempts__gte=self.max_attempts - 1, then=models.Value(OutboxEmail.Status.FAILED)),
+                default=models.Value(OutboxEmail.Status.PENDING),
+            ),
+            claim_token=None,
+            claimed_until=None,
+        )
+        return len(outbox_email_list)
+
+    def run(self, once: bool = False, sleep: float = 1.0) -> int:
+        """
+        Processes batches until the outbox is empty (`once`) or forever, waiting `sleep` seconds whenever there is
+        nothing to do. Returns the number of processed emails.
+        """
+        counter = 0
+        while True:
+            close_old_connections()
+            processed = self.process_batch()
+            counter += processed
+            if not processed:
+                if once:
+                    return counter
+                time.sleep(sleep)
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+
+from django_pony_express.backends import SyncEmailBackendAdapter
+from django_pony_express.settings import PONY_RATE_LIMITS
+
+# Key of the rate limit applying to all backends without their own configuration
+DEFAULT_RATE_LIMIT_KEY = "default"
+
+# Rate limiters per configuration key, shared process-wide
+_rate_limiter_dict: dict = {}
+_rate_limiter_lock = threading.Lock()
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket allowing `rate` messages per second on average and bursts of up to `burst` messages.
+    Thread-safe. Callers asking for more tokens than available reserve them anyway and wait until the bucket has
+    refilled, so large batches are paced instead of rejected and waiting callers are served in order.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("The rate needs to be greater than zero.")
+        self.rate = rate
+        self.burst = burst or max(int(rate), 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        Takes `tokens` from the bucket and returns the number of seconds the caller has to wait before sending.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return max(-self._tokens / self.rate, 0.0)
+
+    def acquire(self, tokens: int = 1) -> None:
+        """
+        Takes `tokens` from the bucket, blocking until the rate allows sending them.
+        """
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 1) -> None:
+        """
+        Async counterpart of `acquire()`, which doesn't block the event loop while waiting.
+        """
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def get_backend_path(backend: BaseEmailBackend | str | None = None) -> str:
+    """
+    Returns the dotted path of the given backend (instance or path). Defaults to `EMAIL_BACKEND`.
+    """
+    if backend is None:
+        return settings.EMAIL_BACKEND
+    if isinstance(backend, str):
+        return backend
+    # The async adapter shares the limit of the wrapped backend
+    if isinstance(backend, SyncEmailBackendAdapter):
+        backend = backend.connection
+    return f"{type(backend).__module__}.{type(backend).__qualname__}"
+
+
+def get_rate_limiter(backend: BaseEmailBackend | str | None = None) -> TokenBucketRateLimiter | None:
+    """
+    Returns the process-wide rate limiter of the given email backend as configured in
+    `DJANGO_PONY_EXPRESS_RATE_LIMITS`. Backends without their own configuration share the "default" limiter.
+    Returns `None` if no limit applies.
+    """
+    backend_path = get_backend_path(backend)
+    key = backend_path if backend_path in PONY_RATE_LIMITS else DEFAULT_RATE_LIMIT_KEY
+    config = PONY_RATE_LIMITS.get(key)
+    if not config:
+        return None
+
+    with _rate_limiter_lock:
+        rate_limiter = _rate_limiter_dict.get(key)
+        if rate_limiter is None:
+            rate_limiter = TokenBucketRateLimiter(rate=config["rate"], burst=config.get("burst"))
+            _rate_limiter_dict[key] = rate_limiter
+        return rate_limiter
+
+
+def clear_rate_limiters() -> None:
+    """
+    Drops all rate limiters, e.g. after changing the configuration in tests.
+    """
+    with _rate_limiter_lock:
+        _rate_limiter_dict.clear()
@@ -0,0 +1,67 @@
+import random
+import smtplib
+
+from django.utils.module_loading import import_string
+
+from django_pony_express.settings import PONY_RETRY_POLICY
+
+# Reply codes of the 4xx range signal a transient failure (RFC 5321), e.g. "421 Too many connections"
+SMTP_TRANSIENT_FAILURE_RANGE = range(400, 500)
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed send is retried. The delay grows exponentially with every attempt (starting
+    at `backoff_base` seconds, capped at `backoff_max`) and is randomised ("full jitter") if `jitter` is set, so that
+    many senders failing at the same time don't hammer the server in lockstep.
+    Exceptions in `retryable_exceptions` are retried, SMTP replies only if they signal a transient (4xx) failure.
+    """
+
+    CONFIG_ATTRIBUTES = ("max_attempts", "backoff_base", "backoff_max", "jitter", "retryable_exceptions")
+
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    jitter: bool = True
+    retryable_exceptions: tuple = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+    def __init__(self, **kwargs) -> None:
+        """
+        Takes the configuration (e.g. `max_attempts`) as keyword arguments. Retryable exceptions may be given as
+        dotted paths.
+        """
+        for key, value in kwargs.items():
+            if key not in self.CONFIG_ATTRIBUTES:
+                raise TypeError(f"{type(self).__name__}() received an invalid keyword {key!r}.")
+            setattr(self, key, value)
+        self.retryable_exceptions = tuple(
+            import_string(exception) if isinstance(exception, str) else exception
+            for exception in self.retryable_exceptions
+        )
+
+    def is_retryable(self, exception: Exception) -> bool:
+        if isinstance(exception, self.retryable_exceptions):
+            return True
+        return (
+            isinstance(exception, smtplib.SMTPResponseException) and exception.smtp_code in SMTP_TRANSIENT_FAILURE_RANGE
+        )
+
+    def should_retry(self, exception: Exception, attempt: int) -> bool:
+        """
+        Returns `True` if the send failing with `exception` in attempt number `attempt` (starting at one) is retried.
+        """
+        return attempt < self.max_attempts and self.is_retryable(exception)
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Returns the number of seconds to wait after attempt number `attempt` failed.
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+def get_default_retry_policy() -> RetryPolicy:
+    """
+    Returns the retry policy configured via `DJANGO_PONY_EXPRESS_RETRY_POLICY`.
+    """
+    return RetryPolicy(**PONY_RETRY_POLICY)
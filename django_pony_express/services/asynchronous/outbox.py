@@ -0,0 +1,23 @@
+from django_pony_express.outbox.models import OutboxEmail
+from django_pony_express.services.base import BaseEmailService
+
+
+class OutboxEmailService(BaseEmailService):
+    """
+    Service storing the rendered email in the database outbox instead of sending it. The emails are sent by the
+    `process_email_outbox` management command, so they survive a crash or restart of the process creating them.
+    Requires "django_pony_express.outbox" in `INSTALLED_APPS`.
+    """
+
+    def process(self, raise_exception: bool = True) -> bool:
+        """
+        Public method which is called to actually send an email.
+        Calls validation first and stores the email in the outbox. Returns `True` if the email was stored.
+        """
+        result = False
+        if self.is_valid(raise_exception=raise_exception):
+            msg = self._build_mail_object()
+            OutboxEmail.objects.enqueue(msg)
+            result = True
+
+        return result
@@ -0,0 +1,311 @@
+import atexit
+import heapq
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections
+from django.utils.translation import gettext_lazy as _
+
+from django_pony_express.errors import EmailServiceConfigError, EmailServiceQueueFullError
+from django_pony_express.retry import RetryPolicy
+from django_pony_express.services.base import BaseEmailService
+from django_pony_express.services.sender import EmailSender
+from django_pony_express.settings import (
+    PONY_BATCH_FLUSH_INTERVAL,
+    PONY_BATCH_SIZE,
+    PONY_LOGGER_NAME,
+    PONY_WORKER_IDLE_TIMEOUT,
+    PONY_WORKER_POOL_SIZE,
+    PONY_WORKER_QUEUE_FULL_POLICY,
+    PONY_WORKER_QUEUE_SIZE,
+)
+
+
+class EmailWorkerPool:
+    """
+    Pool of long-lived worker threads sending emails in the background. Emails are handed over via a bounded queue.
+    Every worker keeps its own backend connection open while there is work and closes it after `idle_timeout`
+    seconds without any email.
+    Emails arriving in a burst are coalesced: a worker waits up to `flush_interval` seconds for up to `batch_size`
+    emails and sends them back to back over its connection. Every email is handed to the backend on its own, so a
+    failing email (e.g. a refused recipient) doesn't affect the others of the batch.
+    If the queue is full, `full_policy` decides what happens: "block" waits for a free slot, "drop" discards the email
+    (and logs a warning) and "raise" raises an `EmailServiceQueueFullError`.
+    Failed sends are retried as defined by `retry_policy`. Instead of blocking a worker while waiting, the emails are
+    put back into the queue once the backoff delay has passed.
+    Instead of a built email, an email service can be submitted via `submit_service()`. The email is then built by the
+    worker right before sending.
+    """
+
+    FULL_POLICY_BLOCK = "block"
+    FULL_POLICY_DROP = "drop"
+    FULL_POLICY_RAISE = "raise"
+    FULL_POLICIES = (FULL_POLICY_BLOCK, FULL_POLICY_DROP, FULL_POLICY_RAISE)
+
+    CONFIG_ATTRIBUTES = (
+        "workers",
+        "queue_size",
+        "full_policy",
+        "idle_timeout",
+        "batch_size",
+        "flush_interval",
+        "retry_policy",
+    )
+
+    workers: int = PONY_WORKER_POOL_SIZE
+    queue_size: int = PONY_WORKER_QUEUE_SIZE
+    full_policy: str = PONY_WORKER_QUEUE_FULL_POLICY
+    idle_timeout: float = PONY_WORKER_IDLE_TIMEOUT
+    batch_size: int = PONY_BATCH_SIZE
+    flush_interval: float = PONY_BATCH_FLUSH_INTERVAL
+    retry_policy: RetryPolicy | None = None
+
+    _default_pool: "EmailWorkerPool" = None
+    _default_pool_lock = threading.Lock()
+
+    def __init__(self, **kwargs) -> None:
+        """
+        Takes the configuration (e.g. `workers`, `full_policy`...) as keyword arguments. Everything not passed is taken
+        from the Django settings.
+        """
+        for key, value in kwargs.items():
+            if key not in self.CONFIG_ATTRIBUTES:
+                raise TypeError(f"{type(self).__name__}() received an invalid keyword {key!r}.")
+            setattr(self, key, value)
+        if self.full_policy not in self.FULL_POLICIES:
+            raise EmailServiceConfigError(_('Unknown queue full policy "{policy}".').format(policy=self.full_policy))
+
+        self._logger = logging.getLogger(PONY_LOGGER_NAME)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._threads = []
+        self._pid = None
+        self._reset_retries()
+
+    def _reset_retries(self) -> None:
+        self._retry_condition = threading.Condition()
+        self._retry_heap = []
+        self._retry_counter = itertools.count()
+        self._retry_thread = None
+        self._pending_retries = 0
+
+    @classmethod
+    def get_default(cls) -> "EmailWorkerPool":
+        """
+        Returns the process-wide pool configured via the Django settings. It's created on first usage and drains its
+        queue when the interpreter shuts down.
+        """
+        with cls._default_pool_lock:
+            if cls._default_pool is None:
+                cls._default_pool = cls()
+                atexit.register(cls._default_pool.shutdown)
+            return cls._default_pool
+
+    def _ensure_workers(self) -> None:
+        """
+        Starts the worker threads on first usage. After a fork (e.g. in a pre-forking web server), the threads of the
+        parent process don't exist in the child, so the pool is started from scratch.
+        """
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid not in (None, os.getpid()):
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._threads = []
+                self._reset_retries()
+            if self._threads:
+                return
+            self._pid = os.getpid()
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._run_worker, name=f"pony-express-worker-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _put(self, item, subject: str) -> bool:
+        self._ensure_workers()
+        try:
+            self._queue.put((item, 1), block=self.full_policy == self.FULL_POLICY_BLOCK)
+        except queue.Full:
+            if self.full_policy == self.FULL_POLICY_RAISE:
+                raise EmailServiceQueueFullError(_("Email queue is full.")) from None
+            self._logger.warning(_('Email queue is full. Email "%s" was dropped.') % subject)
+            return False
+        return True
+
+    def submit(self, msg: EmailMessage) -> bool:
+        """
+        Puts the email into the queue. Returns `False` if it was dropped because the queue is full.
+        """
+        return self._put(msg, msg.subject)
+
+    def submit_service(self, service: BaseEmailService) -> bool:
+        """
+        Puts the (validated) email service into the queue. The worker builds the email via `_build_mail_object()`, so
+        rendering doesn't block the caller. Returns `False` if it was dropped because the queue is full.
+        """
+        return self._put(service, service.get_subject())
+
+    def join(self) -> None:
+        """
+        Blocks until every email in the queue was processed, including pending retries.
+        """
+        while True:
+            self._queue.join()
+            with self._retry_condition:
+                self._retry_condition.wait_for(lambda: not self._pending_retries)
+            if not self._queue.unfinished_tasks:
+                return
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the workers after the queued emails (and pending retries, if `wait` is set) were processed. The pool is
+        restarted on the next `submit()`.
+        The stop signal is queued right away, so a worker collecting a batch sends it without waiting for the flush
+        interval.
+        """
+        while True:
+            with self._lock:
+                thread_list = self._threads
+                self._threads = []
+                for _thread in thread_list:
+                    self._queue.put(None)
+            if not wait:
+                return
+            for thread in thread_list:
+                thread.join()
+
+            with self._retry_condition:
+                self._retry_condition.wait_for(lambda: not self._pending_retries)
+            if not self._queue.unfinished_tasks:
+                return
+            # Emails failing while the workers were stopping are sent by a fresh set of workers
+            self._ensure_workers()
+
+    def _schedule_retry(self, msg_list: list, attempt: int, delay: float) -> None:
+        """
+        Puts the emails back into the queue after `delay` seconds. The scheduler thread is started on demand and
+        stops as soon as there are no more pending retries.
+        """
+        with self._retry_condition:
+            heapq.heappush(self._retry_heap, (time.monotonic() + delay, next(self._retry_counter), msg_list, attempt))
+            self._pending_retries += len(msg_list)
+            if self._retry_thread is None:
+                self._retry_thread = threading.Thread(
+                    target=self._run_retry_scheduler, name="pony-express-retry", daemon=True
+                )
+                self._retry_thread.start()
+            self._retry_condition.notify_all()
+
+    def _run_retry_scheduler(self) -> None:
+        while True:
+            with self._retry_condition:
+                while True:
+                    if not self._retry_heap:
+                        self._retry_thread = None
+                        return
+                    remaining = self._retry_heap[0][0] - time.monotonic()
+                    if remaining <= 0:
+                        _due, _counter, msg_list, attempt = heapq.heappop(self._retry_heap)
+                        break
+                    self._retry_condition.wait(timeout=remaining)
+
+            for msg in msg_list:
+                self._queue.put((msg, attempt))
+            with self._retry_condition:
+                self._pending_retries -= len(msg_list)
+                self._retry_condition.notify_all()
+
+    def _collect_batch(self, item: tuple) -> tuple[list, bool]:
+        """
+        Collects further emails from the queue until `batch_size` is reached or `flush_interval` seconds have passed,
+        so that bursts of emails are sent over the connection in one go.
+        Returns the batch and whether the worker was told to stop in the meantime.
+        """
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _build_batch(self, batch: list) -> list:
+        """
+        Builds the emails of the services in the batch. Services which fail to build their email are logged and
+        skipped.
+        """
+        built_batch = []
+        has_services = False
+        for item, attempt in batch:
+            if isinstance(item, EmailMessage):
+                built_batch.append((item, attempt))
+                continue
+            has_services = True
+            try:
+                built_batch.append((item._build_mail_object(), attempt))
+            except Exception:
+                self._logger.exception(_('An error occurred building email "%s".') % type(item).__name__)
+        if has_services:
+            # Rendering might have used the database connection of this long-lived thread
+            close_old_connections()
+        return built_batch
+
+    def _send_batch(self, batch: list, sender: EmailSender) -> None:
+        """
+        Sends the batch via the connection of the worker, one email at a time. Emails with an explicitly set connection
+        are sent via their own connection. Emails are grouped by their attempt number, so each of them is retried as
+        often as allowed. After a transient failure, only the failed email is retried.
+        """
+        group_dict = {}
+        for msg, attempt in batch:
+            key = (None if msg.connection is None else id(msg.connection), attempt)
+            group_dict.setdefault(key, (msg.connection, attempt, []))[2].append(msg)
+
+        for connection, attempt, msg_list in group_dict.values():
+            group_sender = (
+                sender if connection is None else EmailSender(connection=connection, retry_policy=self.retry_policy)
+            )
+            group_sender.send(msg_list, attempt=attempt, retry_callback=self._schedule_retry)
+
+    def _run_worker(self) -> None:
+        """
+        Consumes the queue until it receives `None`. The connection of the worker is opened lazily and closed when the
+        worker was idle for `idle_timeout` seconds.
+        """
+        sender = EmailSender(connection=get_connection(), retry_policy=self.retry_policy)
+        is_open = False
+        stop = False
+        try:
+            while not stop:
+                try:
+                    item = self._queue.get(timeout=self.idle_timeout if is_open else None)
+                except queue.Empty:
+                    sender.close()
+                    is_open = False
+                    continue
+
+                if item is None:
+                    self._queue.task_done()
+                    break
+
+                batch, stop = self._collect_batch(item)
+                try:
+                    built_batch = self._build_batch(batch)
+                    if not is_open:
+                        # If this fails, the backend tries again with the first send, which logs the error
+                        is_open = sender._try_open()
+                    self._send_batch(built_batch, sender)
+                finally:
+                    for _item in range(len(batch) + stop):
+                        self._queue.task_done()
+        finally:
+            sender.close()
@@ -1,19 +1,37 @@
-import threading
+from django.utils import translation
 
+from django_pony_express.services.asynchronous.pool import EmailWorkerPool
 from django_pony_express.services.base import BaseEmailService
 
 
 class ThreadEmailService(BaseEmailService):
     """
-    Service to send emails using Python threads to avoid blocking the main thread while talking to an external API
+    Service to send emails using Python threads to avoid blocking the main thread while talking to an external API.
+    The emails are handed to a pool of long-lived worker threads, which re-use their backend connections.
+    If `build_in_background` is set, the worker builds the email as well and the caller only pays for the validation.
+    Don't change the service after calling `process()` then.
+    Failed sends are retried as defined by the `retry_policy` of the worker pool, the one of the service is ignored.
     """
 
+    build_in_background = False
+
+    def get_worker_pool(self) -> EmailWorkerPool:
+        """
+        Returns the pool sending the emails. Defaults to the process-wide pool configured via the Django settings.
+        """
+        return EmailWorkerPool.get_default()
+
     def process(self, raise_exception: bool = True) -> None:
         """
         Public method which is called to actually send an email.
-        Calls validation first and returns the result of "msg.send()"
+        Calls validation first and puts the email into the queue of the worker pool.
         """
         if self.is_valid(raise_exception=raise_exception):
-            msg = self._build_mail_object()
-            email_thread = threading.Thread(target=self._send_and_log_email, args=(msg,))
-            email_thread.start()
+            if self.build_in_background:
+                if not self.get_translation():
+                    # Render in the language active for the caller, without touching the translation of its thread
+                    self.language = translation.get_language()
+                self.get_worker_pool().submit_service(self)
+            else:
+                msg = self._build_mail_object()
+                self.get_worker_pool().submit(msg)
@@ -1,17 +1,77 @@
+import asyncio
+import contextlib
 import logging
-import re
+import multiprocessing
+import queue
+import threading
+from collections import ChainMap, deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import MappingProxyType
 
-from bs4 import BeautifulSoup
+import django
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.mail.backends.base import BaseEmailBackend
+from django.core.signals import setting_changed
+from django.db import connections
 from django.db.models import QuerySet
-from django.template.loader import render_to_string
+from django.dispatch import receiver
+from django.template import Context
+from django.template.backends.django import Template as DjangoTemplate
+from django.template.loader import get_template, select_template
 from django.utils import translation
+from django.utils.autoreload import file_changed
 from django.utils.translation import gettext_lazy as _
 
+from django_pony_express.attachments import AttachmentCache, StreamingAttachment
+from django_pony_express.backends import BaseAsyncEmailBackend, SyncEmailBackendAdapter, get_async_connection
+from django_pony_express.broadcast import BroadcastBody, BroadcastEmailMessage
+from django_pony_express.converters import StreamingHtmlToTextConverter
 from django_pony_express.errors import EmailServiceAttachmentError, EmailServiceConfigError
+from django_pony_express.retry import RetryPolicy, get_default_retry_policy
+from django_pony_express.services.sender import AsyncEmailSender, EmailSender
 from django_pony_express.settings import PONY_LOG_RECIPIENTS, PONY_LOGGER_NAME
+from django_pony_express.signals import (
+    PHASE_ATTACHMENTS,
+    PHASE_CONTEXT,
+    PHASE_HTML,
+    PHASE_TEXT,
+    get_phase_timer,
+)
+from django_pony_express.validators import EmailAddressValidator
+
+# Compiled templates per service class and template name
+_compiled_template_cache: dict = {}
+
+
+@receiver(file_changed, dispatch_uid="django_pony_express_file_changed")
+@receiver(setting_changed, dispatch_uid="django_pony_express_setting_changed")
+def clear_template_cache(**kwargs) -> None:
+    """
+    Empties the compiled template cache. Called by the autoreloader when a file changes and when the settings are
+    changed (e.g. in tests), so edited templates are picked up.
+    """
+    _compiled_template_cache.clear()
+
+
+def _initialize_render_process() -> None:
+    """
+    Sets up Django in a freshly spawned rendering process.
+    """
+    django.setup()
+
+
+def _render_chunk_in_process(factory_class: type, state: dict, chunk: list) -> list:
+    """
+    Entry point of the rendering processes. Restores the factory from its state and builds the emails for the chunk.
+    The returned email objects are pickled and sent back to the parent process.
+    """
+    factory = factory_class.__new__(factory_class)
+    factory.__dict__.update(state)
+    factory._shared_context_data = MappingProxyType(state["_shared_context_data"])
+    return factory._build_messages(factory.resolve_recipient_references(chunk))
 
 
 class BaseEmailServiceFactory:
@@ -20,9 +80,29 @@ class BaseEmailServiceFactory:
     """
 
     _errors = []
+    _shared_context_data = None
+    _email_validator = None
+    _seen_email_set = None
+    _attachment_cache = None
+    _broadcast_body_dict = None
 
     service_class = None
     recipient_email_list = []
+    batch_size = 100
+    max_workers = None
+    max_concurrency = 10
+    max_processes = None
+    group_by_language = False
+    process_start_method = "spawn"
+    streaming = False
+    chunk_size = 2000
+    deduplicate_recipients = False
+    broadcast = False
+    bcc_batch_size = None
+    bcc_to_email = None
+    attachment_cache_size = 32 * 1024 * 1024
+    invalid_recipient_count = 0
+    duplicate_recipient_count = 0
 
     def __init__(self, recipient_email_list: list | tuple | QuerySet = None, **kwargs) -> None:
         """
@@ -33,7 +113,8 @@ class BaseEmailServiceFactory:
         self._errors = []
 
         super().__init__()
-        if recipient_email_list:
+        # Avoid evaluating QuerySets by checking their truthiness
+        if isinstance(recipient_email_list, QuerySet) or recipient_email_list:
             self.recipient_email_list = recipient_email_list
 
     def is_valid(self, raise_exception: bool = True) -> bool:
@@ -43,8 +124,10 @@ class BaseEmailServiceFactory:
         """
         if not self.service_class:
             self._errors.append(_("Email factory requires a mail service class."))
-        if not len(self.get_recipient_list()):
+        if not self._has_recipients():
             self._errors.append(_("Email factory requires a target mail address."))
+        if self.service_class and (self.broadcast or self.bcc_batch_size) and self._has_custom_send_path():
+            self._errors.append(_("Broadcast and BCC mode require an email service which is sent by the factory."))
 
         if self._errors and raise_exception:
             raise EmailServiceConfigError(self._errors)
@@ -57,6 +140,33 @@ class BaseEmailServiceFactory:
         """
         return self.recipient_email_list
 
+    def _has_recipients(self) -> bool:
+        """
+        Checks if there is at least one recipient. In streaming mode, QuerySets are not evaluated but asked via
+        `exists()`.
+        """
+        recipient_list = self.get_recipient_list()
+        if self.streaming and isinstance(recipient_list, QuerySet):
+            return recipient_list.exists()
+        return bool(len(recipient_list))
+
+    def _iter_recipients(self):
+        """
+        Returns an iterable over all recipients. In streaming mode, QuerySets are fetched in chunks of `chunk_size`
+        without filling the result cache, so memory usage stays flat for any number of recipients.
+        """
+        recipient_list = self.get_recipient_list()
+        if self.streaming and isinstance(recipient_list, QuerySet):
+            return recipient_list.iterator(chunk_size=self.chunk_size)
+        return recipient_list
+
+    def get_language_from_recipient(self, recipient) -> str | None:
+        """
+        Returns the language of the email for the given recipient, for example `return user.language`. If `None` is
+        returned, the language is determined by `get_translation()` of the email service.
+        """
+        return None
+
     def get_email_from_recipient(self, recipient) -> str:
         """
         Fetches the email from the recipient. Sometimes a list of mail addresses is passed, so we just have to
@@ -65,12 +175,93 @@ class BaseEmailServiceFactory:
         """
         return recipient
 
+    def get_email_validator(self) -> EmailAddressValidator:
+        """
+        Returns the validator for the addresses of the recipients. It's created once per run and shared with the
+        email services, so every address is checked only once.
+        """
+        return EmailAddressValidator(pattern=self.service_class.EMAIL_STRUCTURE_PATTERN)
+
+    def _get_email_validator(self) -> EmailAddressValidator:
+        if self._email_validator is None:
+            self._email_validator = self.get_email_validator()
+        return self._email_validator
+
+    def get_deduplication_key(self, email: str) -> str:
+        """
+        Returns the key identifying duplicate recipients, based on the normalised email address. Can be overridden,
+        e.g. to treat the local part case-insensitively: `return email.lower()`
+        """
+        return email
+
+    def _accept_recipient(self, recipient) -> bool:
+        """
+        Pre-validates the email address of the recipient. Invalid recipients are counted, logged and skipped, instead
+        of failing the email service of the recipient. If `deduplicate_recipients` is set, recipients whose address
+        already occurred in this run are counted and skipped as well.
+        """
+        email = self.get_email_from_recipient(recipient)
+        cleaned_email = self._get_email_validator().clean(email)
+        if cleaned_email is None:
+            self.invalid_recipient_count += 1
+            logger = logging.getLogger(PONY_LOGGER_NAME)
+            if PONY_LOG_RECIPIENTS:
+                logger.warning(_('Skipped recipient with ill-formatted email address "%s".') % email)
+            else:
+                logger.warning(_("Skipped recipient with ill-formatted email address."))
+            return False
+
+        if self.deduplicate_recipients:
+            key = self.get_deduplication_key(cleaned_email)
+            if key in self._seen_email_set:
+                self.duplicate_recipient_count += 1
+                return False
+            self._seen_email_set.add(key)
+
+        return True
+
+    def get_attachment_cache(self) -> AttachmentCache | None:
+        """
+        Returns the cache for the files attached via their path. It's created once per run and shared with the
+        email services, so every file is read only once. Set `attachment_cache_size` to zero to disable it.
+        """
+        if not self.attachment_cache_size:
+            return None
+        return AttachmentCache(max_size=self.attachment_cache_size)
+
+    def _get_attachment_cache(self) -> AttachmentCache | None:
+        if self._attachment_cache is None:
+            self._attachment_cache = self.get_attachment_cache()
+        return self._attachment_cache
+
+    def _start_run(self) -> None:
+        """
+        Resets the state of the previous run and evaluates the shared context once per run (and before any worker
+        thread is started). The attachment cache is created here as well, so the workers don't race to create it.
+        """
+        self._shared_context_data = None
+        self._email_validator = None
+        self._attachment_cache = self.get_attachment_cache()
+        self._broadcast_body_dict = {}
+        self._seen_email_set = set()
+        self.invalid_recipient_count = 0
+        self.duplicate_recipient_count = 0
+        self._get_shared_context_data()
+
     def get_context_data(self) -> dict:
         """
-        Fetch context data required equally for every email created by the factory.
+        Fetch context data required equally for every email created by the factory. Evaluated once per run.
         """
         return {}
 
+    def _get_shared_context_data(self) -> Mapping:
+        """
+        Evaluates `get_context_data()` once per run. The result is shared read-only across all generated services.
+        """
+        if self._shared_context_data is None:
+            self._shared_context_data = MappingProxyType(self.get_context_data())
+        return self._shared_context_data
+
     def has_errors(self) -> bool:
         """
         Check if any errors are stored inside this class instance
@@ -85,21 +276,484 @@ class BaseEmailServiceFactory:
         """
         return self._errors
 
-    def process(self, raise_exception: bool = True) -> int:
+    def get_connection(self) -> BaseEmailBackend:
+        """
+        Returns the email backend connection which is shared by all emails created within one run of the factory.
+        Can be overridden to use a different backend or custom credentials.
+        """
+        return get_connection()
+
+    def get_async_connection(self) -> BaseAsyncEmailBackend:
+        """
+        Returns a connection of the async email backend used in `aprocess()`. Every concurrently sending task uses its
+        own connection.
+        """
+        return get_async_connection()
+
+    def get_recipient_context_data(self, recipient_list: list) -> dict:
+        """
+        Fetch context data for a whole chunk of recipients at once, e.g. with a single query instead of one query per
+        email. Returns a dictionary mapping recipients to their additional context, which is merged into the context of
+        their email services. For example:
+        `return {user: {"order_count": user.order_count} for user in User.objects.annotate(...).filter(...)}`
+        """
+        return {}
+
+    def _build_service(
+        self, recipient, connection: BaseEmailBackend | None = None, recipient_context_data: dict | None = None
+    ) -> "BaseEmailService":
+        """
+        Creates the email service instance for a single recipient. The recipient-specific context is layered on top of
+        the shared context data, so the shared part is not copied for every email.
+        """
+        email = self.get_email_from_recipient(recipient)
+        email_validator = self._get_email_validator()
+        email_object = self.service_class(
+            recipient_email_list=[email_validator.clean(email) or email],
+            context_data=ChainMap(
+                {**(recipient_context_data or {}), "recipient": recipient}, self._get_shared_context_data()
+            ),
+            connection=connection,
+        )
+        email_object.email_validator = email_validator
+        email_object.attachment_cache = self._get_attachment_cache()
+        language = self.get_language_from_recipient(recipient)
+        if language:
+            email_object.language = language
+        return email_object
+
+    def _get_recipient_chunk_size(self) -> int:
+        """
+        Returns the number of recipients whose emails are sent with one backend call.
+        """
+        if self.bcc_batch_size:
+            return self.batch_size * self.bcc_batch_size
+        return self.batch_size
+
+    def _iter_recipient_chunks(self):
+        """
+        Yields the recipients in lists of at most `batch_size` elements (times `bcc_batch_size` in BCC mode).
+        Recipients with an invalid email address (and duplicates, if `deduplicate_recipients` is set) are skipped.
+        """
+        chunk = []
+        chunk_size = self._get_recipient_chunk_size()
+        for recipient in self._iter_recipients():
+            if not self._accept_recipient(recipient):
+                continue
+            chunk.append(recipient)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _get_recipient_context(context_dict: dict, recipient) -> dict | None:
+        # Recipients don't need to be hashable as long as no recipient context is provided
+        return context_dict.get(recipient) if context_dict else None
+
+    def _build_services(self, chunk: list, connection: BaseEmailBackend | None = None) -> list:
+        """
+        Creates the email services for a chunk of recipients, including the context fetched for the whole chunk.
+        """
+        context_dict = self.get_recipient_context_data(chunk)
+        return [
+            self._build_service(
+                recipient,
+                connection=connection,
+                recipient_context_data=self._get_recipient_context(context_dict, recipient),
+            )
+            for recipient in chunk
+        ]
+
+    def _build_messages(self, chunk: list, connection: BaseEmailBackend | None = None) -> list:
+        """
+        Builds the emails for a chunk of recipients. Recipients with an ill-formatted address were already skipped,
+        an email service failing its validation otherwise raises an `EmailServiceConfigError`, aborting the run
+        before any email of the chunk is sent.
+        """
+        if self.bcc_batch_size:
+            return self._build_bcc_messages(chunk, connection=connection)
+        if self.broadcast:
+            return self._build_broadcast_messages(chunk, connection=connection)
+        if self.group_by_language:
+            return self._build_messages_grouped_by_language(chunk, connection=connection)
+
+        return [
+            email_object._build_mail_object()
+            for email_object in self._build_services(chunk, connection=connection)
+            if email_object.is_valid()
+        ]
+
+    def _build_messages_grouped_by_language(self, chunk: list, connection: BaseEmailBackend | None = None) -> list:
+        """
+        Buckets the email services of a chunk by their language. Every language is activated once and all emails of
+        this language are rendered back to back, instead of switching the translation for every single email.
+        """
+        language_dict = {}
+        for email_object in self._build_services(chunk, connection=connection):
+            if email_object.is_valid():
+                language_dict.setdefault(email_object.get_translation(), []).append(email_object)
+
+        msg_list = []
+        for language, email_object_list in language_dict.items():
+            if language:
+                translation.activate(language)
+            try:
+                msg_list.extend(
+                    email_object._build_mail_object(activate_translation=False) for email_object in email_object_list
+                )
+            finally:
+                translation.deactivate()
+
+        return msg_list
+
+    def _get_broadcast_body(self, recipient, connection: BaseEmailBackend | None = None) -> BroadcastBody | None:
+        """
+        Builds the email shared by all recipients of the same language once per run.
+        """
+        language = self.get_language_from_recipient(recipient)
+        broadcast_body = self._broadcast_body_dict.get(language)
+        if broadcast_body is None:
+            email_object = self._build_service(recipient, connection=connection)
+            # The content is sent to every recipient, so it must not depend on this one. The service may still extend
+            # its context data, so it gets a writable layer on top of the read-only shared context data
+            email_object.context_data = ChainMap({}, self._get_shared_context_data())
+            if not email_object.is_valid():
+                return None
+            broadcast_body = BroadcastBody(email_object._build_mail_object())
+            self._broadcast_body_dict[language] = broadcast_body
+        return broadcast_body
+
+    def _build_broadcast_messages(self, chunk: list, connection: BaseEmailBackend | None = None) -> list:
+        """
+        Creates the emails of a chunk in broadcast mode. The email is rendered and serialised only once (per language),
+        the email of every recipient just gets its own "To" header.
+        """
+        email_validator = self._get_email_validator()
+        msg_list = []
+        for recipient in chunk:
+            broadcast_body = self._get_broadcast_body(recipient, connection=connection)
+            if broadcast_body is None:
+                continue
+            email = self.get_email_from_recipient(recipient)
+            msg = BroadcastEmailMessage(broadcast_body, to=[email_validator.clean(email) or email])
+            msg.connection = connection
+            msg_list.append(msg)
+
+        return msg_list
+
+    def get_bcc_to_email(self, broadcast_body: BroadcastBody) -> str:
+        """
+        Returns the visible recipient of the emails in BCC mode. Defaults to `bcc_to_email` or the sender of the email.
+        """
+        return self.bcc_to_email or broadcast_body.msg.from_email
+
+    def _build_bcc_messages(self, chunk: list, connection: BaseEmailBackend | None = None) -> list:
+        """
+        Creates the emails of a chunk in BCC mode. The email is rendered once (per language) like in broadcast mode and
+        sent to groups of `bcc_batch_size` recipients via BCC, so every email reaches a whole group.
+        """
+        language_dict = {}
+        for recipient in chunk:
+            language_dict.setdefault(self.get_language_from_recipient(recipient), []).append(recipient)
+
+        email_validator = self._get_email_validator()
+        msg_list = []
+        for recipient_list in language_dict.values():
+            broadcast_body = self._get_broadcast_body(recipient_list[0], connection=connection)
+            if broadcast_body is None:
+                continue
+            email_list = [
+                email_validator.clean(email) or email
+                for email in (self.get_email_from_recipient(recipient) for recipient in recipient_list)
+            ]
+            to = [self.get_bcc_to_email(broadcast_body)]
+            for index in range(0, len(email_list), self.bcc_batch_size):
+                msg = BroadcastEmailMessage(broadcast_body, to=to, bcc=email_list[index : index + self.bcc_batch_size])
+                msg.connection = connection
+                msg_list.append(msg)
+
+        return msg_list
+
+    def _has_custom_send_path(self) -> bool:
+        """
+        Checks if the email service takes care of sending itself, e.g. `ThreadEmailService` or `OutboxEmailService`.
+        """
+        return (
+            self.service_class.process is not BaseEmailService.process
+            or self.service_class._send_and_log_email is not BaseEmailService._send_and_log_email
+        )
+
+    def _get_sender(self) -> EmailSender | contextlib.nullcontext:
+        """
+        Returns the sender wrapping the connection of a run. Services with a custom send path don't need one.
+        """
+        if self._has_custom_send_path():
+            return contextlib.nullcontext()
+        return EmailSender(connection=self.get_connection(), retry_policy=self.service_class.retry_policy)
+
+    def _process_services(self, chunk: list) -> int:
+        """
+        Hands the emails of a chunk of recipients to the `process()` method of their email service, for services which
+        take care of sending themselves.
+        Returns the number of processed emails.
+        """
+        counter = 0
+        for email_object in self._build_services(chunk):
+            email_object.process()
+            counter += 1
+        return counter
+
+    def _process_chunk(self, chunk: list, sender: EmailSender | None) -> int:
+        """
+        Builds the emails for a chunk of recipients and sends them over the connection of the sender.
+        Returns the number of sent emails.
+        """
+        if sender is None:
+            return self._process_services(chunk)
+        return sender.send(self._build_messages(chunk, connection=sender.connection))
+
+    def _run_worker(self, chunk_queue: queue.Queue, abort: threading.Event) -> int:
+        """
+        Worker for the parallel mode. Every worker uses its own backend connection and consumes recipient chunks until
+        it receives `None`. If something goes wrong, the other workers are told to stop and the queue is drained
+        anyway, so that the producer never blocks.
+        Returns the number of emails sent by this worker.
+        """
+        counter = 0
+        finished = False
+        try:
+            with self._get_sender() as sender:
+                while (chunk := chunk_queue.get()) is not None:
+                    if not abort.is_set():
+                        counter += self._process_chunk(chunk, sender)
+                finished = True
+        except Exception:
+            abort.set()
+            while not finished:
+                finished = chunk_queue.get() is None
+            raise
+        finally:
+            # Database connections are thread-bound, so we need to clean up after ourselves
+            connections.close_all()
+
+        return counter
+
+    def get_recipient_reference(self, recipient):
+        """
+        Returns a picklable reference of the recipient, which is passed to the rendering processes. Can be overridden
+        to pass e.g. primary keys instead of complete model instances.
+        """
+        return recipient
+
+    def resolve_recipient_references(self, reference_list: list) -> list:
+        """
+        Counterpart of `get_recipient_reference()`, called within a rendering process for every chunk.
+        For example: `return list(User.objects.filter(pk__in=reference_list))`
+        """
+        return reference_list
+
+    def _get_process_state(self) -> dict:
+        """
+        Returns the state of the factory handed to the rendering processes. The recipients are sent chunk by chunk
+        and the shared context is evaluated only once, in the parent process.
+        """
+        state = self.__dict__.copy()
+        state["recipient_email_list"] = []
+        state["_shared_context_data"] = dict(self._get_shared_context_data())
+        # The rendering processes use a validator of their own instead of copying the memoised results with every chunk
+        state["_email_validator"] = None
+        state["_seen_email_set"] = None
+        state["_attachment_cache"] = None
+        state["_broadcast_body_dict"] = {}
+        return state
+
+    def _process_multiprocess(self, processes: int) -> int:
+        """
+        Renders the recipient chunks in a pool of `processes` processes, so rendering isn't limited by the GIL. The
+        emails are sent by the parent process over one backend connection while the next chunks are rendered.
+        Returns the number of sent emails.
+        """
+        counter = 0
+        state = self._get_process_state()
+        pending = deque()
+
+        with (
+            ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context(self.process_start_method),
+                initializer=_initialize_render_process,
+            ) as executor,
+            EmailSender(connection=self.get_connection(), retry_policy=self.service_class.retry_policy) as sender,
+        ):
+            try:
+                for chunk in self._iter_recipient_chunks():
+                    reference_list = [self.get_recipient_reference(recipient) for recipient in chunk]
+                    pending.append(executor.submit(_render_chunk_in_process, type(self), state, reference_list))
+                    # Keep the number of rendered but unsent chunks (and thus the memory usage) bounded
+                    if len(pending) >= processes * 2:
+                        counter += sender.send(pending.popleft().result())
+                while pending:
+                    counter += sender.send(pending.popleft().result())
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        return counter
+
+    def _process_parallel(self, workers: int) -> int:
+        """
+        Distributes the recipient chunks across a pool of `workers` threads.
+        Returns the number of sent emails.
+        """
+        chunk_queue = queue.Queue(maxsize=workers * 2)
+        abort = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pony-express-factory") as executor:
+            futures = [executor.submit(self._run_worker, chunk_queue, abort) for _ in range(workers)]
+            try:
+                for chunk in self._iter_recipient_chunks():
+                    if abort.is_set():
+                        break
+                    chunk_queue.put(chunk)
+            finally:
+                for _ in range(workers):
+                    chunk_queue.put(None)
+            # Raises the exception of the first failed worker (if any)
+            return sum(future.result() for future in futures)
+
+    def process(self, raise_exception: bool = True, workers: int | None = None, processes: int | None = None) -> int:
         """
         Create an email of `self.service_class` for every recipient. Per-email logic like setting the salutation
         is handled within each email class.
+        All emails are sent over one backend connection in batches of `batch_size`. If `workers` (or the class
+        attribute `max_workers`) is greater than one, the recipients are spread across a thread pool of this size,
+        each thread using its own backend connection. If `processes` (or the class attribute `max_processes`) is
+        greater than one, the emails are rendered in a process pool of this size instead.
+        Email services with a custom send path (overriding `process()` or `_send_and_log_email()`, like
+        `ThreadEmailService`) are handed to their own `process()` method one by one instead.
         Returns the number of sent emails.
         """
         counter = 0
         if self.is_valid(raise_exception=raise_exception):
-            for recipient in self.get_recipient_list():
-                email_object = self.service_class(
-                    recipient_email_list=[self.get_email_from_recipient(recipient)],
-                    context_data={"recipient": recipient, **self.get_context_data()},
-                )
-                email_object.process()
-                counter += 1
+            self._start_run()
+
+            processes = processes or self.max_processes
+            if processes and processes > 1:
+                if self._has_custom_send_path():
+                    raise EmailServiceConfigError(
+                        _("Rendering in multiple processes requires an email service which is sent by the factory.")
+                    )
+                return self._process_multiprocess(processes=processes)
+
+            workers = workers or self.max_workers
+            if workers and workers > 1:
+                return self._process_parallel(workers=workers)
+
+            with self._get_sender() as sender:
+                for chunk in self._iter_recipient_chunks():
+                    counter += self._process_chunk(chunk, sender)
+
+        return counter
+
+    async def _aiter_recipients(self):
+        """
+        Async counterpart of `_iter_recipients()`. QuerySets are fetched without blocking the event loop.
+        """
+        recipient_list = await sync_to_async(self.get_recipient_list)()
+        if isinstance(recipient_list, QuerySet):
+            if self.streaming:
+                recipient_list = recipient_list.aiterator(chunk_size=self.chunk_size)
+            async for recipient in recipient_list:
+                yield recipient
+        else:
+            for recipient in recipient_list:
+                yield recipient
+
+    async def _aiter_recipient_chunks(self):
+        """
+        Async counterpart of `_iter_recipient_chunks()`.
+        """
+        chunk = []
+        chunk_size = self._get_recipient_chunk_size()
+        async for recipient in self._aiter_recipients():
+            if not self._accept_recipient(recipient):
+                continue
+            chunk.append(recipient)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def _aprocess_chunk(self, chunk: list, idle_senders: list, sender_list: list) -> int:
+        """
+        Builds the emails for a chunk of recipients and sends them via an idle connection. A new connection is only
+        opened if all existing ones are busy.
+        Returns the number of sent emails.
+        """
+        if self._has_custom_send_path():
+            return await sync_to_async(self._process_services)(chunk)
+
+        if idle_senders:
+            sender = idle_senders.pop()
+        else:
+            sender = AsyncEmailSender(
+                connection=self.get_async_connection(), retry_policy=self.service_class.retry_policy
+            )
+            sender_list.append(sender)
+            await sender._try_open()
+
+        try:
+            # Rendering is synchronous (templates, database access) and happens outside the event loop
+            msg_list = await sync_to_async(self._build_messages)(chunk)
+            return await sender.send(msg_list)
+        finally:
+            idle_senders.append(sender)
+
+    async def aprocess(self, raise_exception: bool = True, concurrency: int | None = None) -> int:
+        """
+        Async counterpart of `process()`. Emails are built in batches of `batch_size` and up to `concurrency` (or the
+        class attribute `max_concurrency`) batches are sent at the same time, each over its own connection of the
+        async email backend.
+        Returns the number of sent emails.
+        """
+        counter = 0
+        if not await sync_to_async(self.is_valid)(raise_exception=raise_exception):
+            return counter
+
+        await sync_to_async(self._start_run)()
+
+        semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+        idle_senders = []
+        sender_list = []
+        pending = set()
+
+        async def run(chunk: list) -> int:
+            try:
+                return await self._aprocess_chunk(chunk, idle_senders, sender_list)
+            finally:
+                semaphore.release()
+
+        try:
+            async for chunk in self._aiter_recipient_chunks():
+                await semaphore.acquire()
+                # Collect finished tasks, so a failure stops the run early and memory usage doesn't grow
+                for task in [task for task in pending if task.done()]:
+                    pending.discard(task)
+                    counter += task.result()
+                pending.add(asyncio.ensure_future(run(chunk)))
+            for count in await asyncio.gather(*pending):
+                counter += count
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+        finally:
+            for sender in sender_list:
+                await sender.close()
 
         return counter
 
@@ -113,7 +767,7 @@ class BaseEmailService:
     SUBJECT_DELIMITER = " - "
     FROM_EMAIL = None
     REPLY_TO_ADDRESS = []
-    EMAIL_STRUCTURE_PATTERN = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+    EMAIL_STRUCTURE_PATTERN = EmailAddressValidator.EMAIL_STRUCTURE_PATTERN
 
     _errors = []
     _logger: logging.Logger = None
@@ -121,6 +775,12 @@ class BaseEmailService:
     subject = None
     template_name = None
     template_txt_name = None
+    text_converter_class = StreamingHtmlToTextConverter
+    text_content_cache = None
+    language = None
+    retry_policy = None
+    email_validator = None
+    attachment_cache = None
     recipient_email_list = []
     cc_email_list = []
     bcc_email_list = []
@@ -200,8 +860,11 @@ class BaseEmailService:
 
     def get_translation(self) -> str | None:
         """
-        Tries to fetch the current translation from the django settings.
+        Returns the language set in `language` or tries to fetch the current translation from the django settings.
         """
+        if self.language:
+            return self.language
+
         language_str_length = 2
         try:
             return (
@@ -220,56 +883,93 @@ class BaseEmailService:
 
     def _add_attachments(self, msg: EmailMultiAlternatives):
         """
-        Method to encapsulate logic of adding attachments to an email object.
+        Method to encapsulate logic of adding attachments to an email object. Files attached via their path are
+        read via the `attachment_cache` (if set).
         """
         for attachment in self.get_attachments():
-            if isinstance(attachment, dict):
+            if isinstance(attachment, StreamingAttachment):
+                msg.attach(attachment)
+            elif isinstance(attachment, dict):
                 try:
                     msg.attach(attachment["filename"], attachment["file"], attachment.get("mimetype", None))
                 except KeyError as e:
                     raise EmailServiceAttachmentError(
                         _("Missing or mislabeled data provided for email attachment.")
                     ) from e
+            elif self.attachment_cache is not None:
+                self.attachment_cache.attach_file(msg, attachment)
             else:
                 msg.attach_file(attachment)
 
         return msg
 
-    def _generate_html_content(self, mail_attributes: dict) -> str:
-        return render_to_string(self.template_name, mail_attributes)
+    @classmethod
+    def _get_template(cls, template_name: str | list | tuple):
+        """
+        Returns the compiled template. Template lookup and parsing happens only once per service class and template.
+        """
+        key = (cls, template_name if isinstance(template_name, str) else tuple(template_name))
+        template = _compiled_template_cache.get(key)
+        if template is None:
+            template = get_template(template_name) if isinstance(template_name, str) else select_template(template_name)
+            _compiled_template_cache[key] = template
+        return template
 
-    def _generate_text_content(self, mail_attributes: dict, html_content: str) -> str:
-        # Render TXT body part if a template is explicitly set, otherwise convert HTML template to plain text
-        if not self.template_txt_name:
-            soup = BeautifulSoup(html_content, "html.parser")
+    @staticmethod
+    def _render_template(template, mail_attributes: Mapping) -> str:
+        """
+        Renders the template with the given context data. Django templates only accept a dict, so layered context data
+        (e.g. the shared context of a factory) is pushed onto the context layer by layer instead of being copied for
+        every email. Other template engines get a flattened copy.
+        """
+        if isinstance(mail_attributes, dict):
+            return template.render(mail_attributes)
+        if not isinstance(template, DjangoTemplate):
+            return template.render(dict(mail_attributes))
+
+        layer_list = mail_attributes.maps if isinstance(mail_attributes, ChainMap) else [mail_attributes]
+        context = Context(autoescape=template.backend.engine.autoescape)
+        # Variables are looked up from the last to the first layer
+        context.dicts.extend(reversed(layer_list))
+        # Variables set while rendering end up in a layer of their own
+        with context.push():
+            return template.template.render(context)
 
-            # Convert links to this pattern: "[LINK NAME] ([LINK URL])"
-            for a in soup.find_all("a"):
-                text = a.get_text()
-                href = a.get("href", "")
-                a.replace_with(f"{text} ({href})")
+    def _generate_html_content(self, mail_attributes: Mapping) -> str:
+        return self._render_template(self._get_template(self.template_name), mail_attributes)
 
-            return soup.get_text(separator="\n", strip=True)
+    def _generate_text_content(self, mail_attributes: Mapping, html_content: str) -> str:
+        # Render TXT body part if a template is explicitly set, otherwise convert HTML template to plain text
+        if not self.template_txt_name:
+            if self.text_content_cache is not None:
+                return self.text_content_cache.convert(html_content, self.text_converter_class)
+            return self.text_converter_class().convert(html_content)
         else:
-            return render_to_string(self.template_txt_name, mail_attributes)
+            return self._render_template(self._get_template(self.template_txt_name), mail_attributes)
 
-    def _build_mail_object(self) -> EmailMultiAlternatives:
+    def _build_mail_object(self, activate_translation: bool = True) -> EmailMultiAlternatives:
         """
         This method creates a mail object. It collects the required variables, sets the subject and makes sure that
         a "reply_to" is set for maximum convenience during the runtime.
         The plaintext part of the email is generated from the html to avoid maintaining duplicate templates.
+        If `activate_translation` is false, the caller takes care of (de-)activating the language.
         """
+        timer = get_phase_timer(self)
+
         # Optionally set translation language for date formatting etc.
-        language = self.get_translation()
+        language = self.get_translation() if activate_translation else None
         if language:
             translation.activate(language)
 
         # Gather variables
         mail_attributes = self.get_context_data()
+        timer.finish(PHASE_CONTEXT)
 
         # Render HTML body content
         html_content = self._generate_html_content(mail_attributes)
+        timer.finish(PHASE_HTML, size=len(html_content))
         text_content = self._generate_text_content(mail_attributes, html_content)
+        timer.finish(PHASE_TEXT, size=len(text_content))
 
         # Build mail object
         msg = EmailMultiAlternatives(
@@ -285,19 +985,51 @@ class BaseEmailService:
         msg.attach_alternative(html_content, "text/html")
 
         # Add attachments (if available)
+        timer.restart()
         msg = self._add_attachments(msg)
+        timer.finish(PHASE_ATTACHMENTS, size=self._get_attachments_size(msg) if timer else None)
+        # `EmailSender` reports the send phase with the timer of the message (e.g. in the worker pool)
+        if timer:
+            msg.phase_timer = timer
 
         # Deactivate translation
-        translation.deactivate()
+        if activate_translation:
+            translation.deactivate()
 
         # Return mail object
         return msg
 
+    @staticmethod
+    def _get_attachments_size(msg: EmailMultiAlternatives) -> int:
+        """
+        Returns the total size of the attachment contents (before encoding).
+        """
+        size = 0
+        for attachment in msg.attachments:
+            if isinstance(attachment, StreamingAttachment):
+                # Don't read the whole file just for measuring
+                size += attachment.size
+                continue
+            # Attachments are either (filename, content, mimetype) tuples or MIME objects
+            content = attachment[1] if isinstance(attachment, tuple) else attachment.get_payload(decode=True)
+            size += len(content or b"")
+        return size
+
+    def get_email_validator(self) -> EmailAddressValidator:
+        """
+        Returns the validator for all addresses of the email. Services created by a factory share the validator of
+        the factory run.
+        """
+        if self.email_validator is None:
+            self.email_validator = EmailAddressValidator(pattern=self.EMAIL_STRUCTURE_PATTERN)
+        return self.email_validator
+
     def _check_email_structure_validity(self, email: str) -> bool:
         """
-        Checks the structure of the given "email" for compliance.
+        Checks the structure of the given "email" for compliance. Can be overridden to customise the validation of
+        all addresses of the email.
         """
-        return bool(self.EMAIL_STRUCTURE_PATTERN.match(email))
+        return self.get_email_validator().is_valid(email)
 
     def is_valid(self, raise_exception: bool = True) -> bool:
         """
@@ -310,7 +1042,13 @@ class BaseEmailService:
             self._errors.append(_("Email service requires a template."))
         if not len(self.recipient_email_list):
             self._errors.append(_("Email service requires a target mail address."))
-        for email in self.recipient_email_list:
+        # Recipients, CC, BCC and reply-to addresses are checked in one pass
+        for email in [
+            *self.recipient_email_list,
+            *self.get_cc_emails(),
+            *self.get_bcc_emails(),
+            *self.get_reply_to_emails(),
+        ]:
             if not self._check_email_structure_validity(email=email):
                 self._errors.append(
                     _('Email service received ill-formatted email address "{email}"').format(email=email)
@@ -335,29 +1073,36 @@ class BaseEmailService:
         """
         return self._errors
 
+    def get_retry_policy(self) -> RetryPolicy:
+        """
+        Returns the policy for retrying failed sends. Defaults to the policy configured in the Django settings.
+        """
+        return self.retry_policy if self.retry_policy is not None else get_default_retry_policy()
+
     def _send_and_log_email(self, msg: EmailMultiAlternatives) -> bool:
         """
         Method to be called by the thread. Enables logging since we won't have any sync return values.
+        Transient failures are retried as defined by the retry policy, see `EmailSender`.
         """
-        result = False
-        recipients_as_string = " ".join(self.recipient_email_list)
-        try:
-            # msg.send() returns an int: 0 if no recipients exist, 1 if the message sending was successful
-            # Since we want to return a boolean, we check for "== 1" here
-            result = msg.send() == 1
-            if PONY_LOG_RECIPIENTS:
-                self._logger.info(_('Email "%s" successfully sent to %s.') % (msg.subject, recipients_as_string))
-            else:
-                self._logger.info(_('Email "%s" successfully sent.') % msg.subject)
-        except Exception:
-            if PONY_LOG_RECIPIENTS:
-                self._logger.exception(
-                    _('An error occurred sending email "%s" to "%s".') % (msg.subject, recipients_as_string)
-                )
-            else:
-                self._logger.exception(_('An error occurred sending email "%s".') % msg.subject)
+        sender = EmailSender(connection=msg.connection, retry_policy=self.get_retry_policy())
+        sender._logger = self._logger
+        if msg.connection is not None:
+            # The connection is managed by the caller, so it isn't closed here
+            return sender.send([msg]) == 1
+        with sender:
+            return sender.send([msg]) == 1
 
-        return result
+    async def _asend_and_log_email(self, msg: EmailMultiAlternatives) -> bool:
+        """
+        Async counterpart of `_send_and_log_email()`. A regular email backend set as `connection` is wrapped, so it
+        doesn't block the event loop.
+        """
+        connection = self.connection
+        if connection is not None and not isinstance(connection, BaseAsyncEmailBackend):
+            connection = SyncEmailBackendAdapter(connection=connection)
+
+        async with AsyncEmailSender(connection=connection, retry_policy=self.get_retry_policy()) as sender:
+            return await sender.send([msg]) == 1
 
     def process(self, raise_exception: bool = True) -> bool:
         """
@@ -367,6 +1112,20 @@ class BaseEmailService:
         result = False
         if self.is_valid(raise_exception=raise_exception):
             msg = self._build_mail_object()
+            # The send phase is reported by `EmailSender`
             result = self._send_and_log_email(msg=msg)
 
         return result
+
+    async def aprocess(self, raise_exception: bool = True) -> bool:
+        """
+        Async counterpart of `process()`. Validation and rendering run in a worker thread, the email is sent via the
+        async email backend.
+        """
+        result = False
+        if await sync_to_async(self.is_valid)(raise_exception=raise_exception):
+            msg = await sync_to_async(self._build_mail_object)()
+            # The send phase is reported by `AsyncEmailSender`
+            result = await self._asend_and_log_email(msg=msg)
+
+        return result
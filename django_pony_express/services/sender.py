@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import smtplib
+import time
+from collections.abc import Callable
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils.translation import gettext_lazy as _
+
+from django_pony_express.attachments import get_message_size
+from django_pony_express.backends import BaseAsyncEmailBackend, get_async_connection
+from django_pony_express.ratelimit import TokenBucketRateLimiter, get_rate_limiter
+from django_pony_express.retry import RetryPolicy, get_default_retry_policy
+from django_pony_express.settings import PONY_LOG_RECIPIENTS, PONY_LOGGER_NAME
+from django_pony_express.signals import NULL_PHASE_TIMER, PHASE_SEND
+
+
+def _is_connection_error(exception: Exception) -> bool:
+    """
+    Returns `True` if `exception` leaves the session in an unusable state, e.g. the server dropped it. SMTP replies
+    (like a refused recipient) are sent over a working session.
+    """
+    return isinstance(exception, OSError) and not isinstance(
+        exception, smtplib.SMTPResponseException | smtplib.SMTPRecipientsRefused
+    )
+
+
+class EmailSender:
+    """
+    Wrapper around a single email backend connection which is kept open over multiple sends.
+    Messages are handed to the backend one by one, so a failing message (e.g. a refused recipient) doesn't affect the
+    others. If sending fails with a transient error (e.g. the server dropped the session), the connection is re-opened
+    and the messages which weren't sent yet are sent again as defined by the retry policy. A session failing for good
+    is re-opened as well, so it doesn't affect the following messages.
+    Sending is paced by the rate limiter configured for the backend (if any).
+    If the connection can't be opened (e.g. the server is unreachable), the error is logged and the backend tries again
+    with the first send, so the messages fail (and are retried) one by one instead of aborting the whole run.
+    Messages built by an email service report the `send` phase to `email_phase_finished` once they are sent or failed
+    permanently.
+    """
+
+    connection: BaseEmailBackend = None
+    rate_limiter: TokenBucketRateLimiter | None = None
+    retry_policy: RetryPolicy = None
+    _logger: logging.Logger = None
+
+    def __init__(self, connection: BaseEmailBackend | None = None, retry_policy: RetryPolicy | None = None) -> None:
+        self.connection = connection if connection is not None else get_connection()
+        self.rate_limiter = get_rate_limiter(self.connection)
+        self.retry_policy = retry_policy if retry_policy is not None else get_default_retry_policy()
+        self._logger = logging.getLogger(PONY_LOGGER_NAME)
+
+    def __enter__(self) -> "EmailSender":
+        self._try_open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """
+        Opens the underlying backend connection. Backends without a network session (locmem, console) ignore this.
+        """
+        self.connection.open()
+
+    def close(self) -> None:
+        """
+        Closes the underlying backend connection. A failure while saying goodbye to the server is not worth an error.
+        """
+        try:
+            self.connection.close()
+        except Exception:
+            self._logger.warning(_("Closing the email connection failed."), exc_info=True)
+
+    def _try_open(self) -> bool:
+        """
+        Opens the connection, logging instead of raising a failure. If the server can't be reached, the next send will
+        try again.
+        Returns whether the connection was opened.
+        """
+        try:
+            self.open()
+        except Exception:
+            self._logger.warning(_("Opening the email connection failed."), exc_info=True)
+            return False
+        return True
+
+    def reconnect(self) -> None:
+        """
+        Drops the current session and opens a fresh one. If the server can't be reached, the next send will try again.
+        """
+        self.close()
+        self._try_open()
+
+    def _get_recipients_as_string(self, message: EmailMessage) -> str:
+        # BCC recipients are included, since a factory in BCC mode addresses whole groups of recipients via BCC
+        return " ".join(str(recipient) for recipient in [*message.to, *message.bcc])
+
+    def _get_retry_message(self, message: EmailMessage, attempt: int, delay: float) -> str:
+        return _(
+            'Sending email "%(subject)s" failed in attempt %(attempt)d of %(max_attempts)d. Retrying in %(delay).1fs.'
+        ) % {
+            "subject": message.subject,
+            "attempt": attempt,
+            "max_attempts": self.retry_policy.max_attempts,
+            "delay": delay,
+        }
+
+    def _log_success(self, message: EmailMessage) -> None:
+        if PONY_LOG_RECIPIENTS:
+            self._logger.info(
+                _('Email "%s" successfully sent to %s.') % (message.subject, self._get_recipients_as_string(message))
+            )
+        else:
+            self._logger.info(_('Email "%s" successfully sent.') % message.subject)
+
+    def _log_failure(self, message: EmailMessage) -> None:
+        # Called within the exception handler of `_send_message()`, so the traceback is logged as well
+        if PONY_LOG_RECIPIENTS:
+            self._logger.exception(  # noqa: LOG004
+                _('An error occurred sending email "%s" to "%s".')
+                % (message.subject, self._get_recipients_as_string(message))
+            )
+        else:
+            self._logger.exception(_('An error occurred sending email "%s".') % message.subject)  # noqa: LOG004
+
+    def _finish_send_phase(self, message: EmailMessage) -> None:
+        timer = getattr(message, "phase_timer", NULL_PHASE_TIMER)
+        timer.finish(PHASE_SEND, size=get_message_size(message) if timer else None)
+
+    def _send_message(
+        self, message: EmailMessage, attempt: int, retry_callback: Callable[[list, int, float], None] | None
+    ) -> int:
+        getattr(message, "phase_timer", NULL_PHASE_TIMER).restart()
+        while True:
+            # Tokens are taken per email, so a batch never exceeds the burst of the rate limit
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                result = self.connection.send_messages([message])
+            except Exception as e:
+                if not self.retry_policy.should_retry(e, attempt):
+                    self._log_failure(message)
+                    self._finish_send_phase(message)
+                    # Otherwise, the following messages would fail on the same dead session
+                    if _is_connection_error(e):
+                        self.reconnect()
+                    return 0
+
+                delay = self.retry_policy.get_delay(attempt)
+                self._logger.warning(self._get_retry_message(message, attempt, delay), exc_info=True)
+                if retry_callback is not None:
+                    self.reconnect()
+                    retry_callback([message], attempt + 1, delay)
+                    return 0
+                time.sleep(delay)
+                self.reconnect()
+                attempt += 1
+                continue
+
+            self._log_success(message)
+            self._finish_send_phase(message)
+            return result or 0
+
+    def send(
+        self,
+        messages: list[EmailMessage],
+        attempt: int = 1,
+        retry_callback: Callable[[list, int, float], None] | None = None,
+    ) -> int:
+        """
+        Sends the given messages one by one over the connection and returns the number of sent messages. Messages
+        failing permanently are logged and skipped.
+        A message failing with a transient error is retried after a backoff delay, starting at attempt number
+        `attempt`. Only the failed message is sent again, the others are neither repeated nor count as retried. If a
+        `retry_callback` is given, the sender doesn't wait but hands the failed message (as list), the next attempt
+        number and the delay to the callback and goes on with the next message, so the caller can schedule the retry
+        without blocking.
+        Errors are logged and not raised, similar to `BaseEmailService._send_and_log_email()`.
+        """
+        return sum(self._send_message(message, attempt=attempt, retry_callback=retry_callback) for message in messages)
+
+
+class AsyncEmailSender(EmailSender):
+    """
+    Async counterpart of `EmailSender`, wrapping a connection of an async email backend.
+    """
+
+    connection: BaseAsyncEmailBackend = None
+
+    def __init__(
+        self, connection: BaseAsyncEmailBackend | None = None, retry_policy: RetryPolicy | None = None
+    ) -> None:
+        super().__init__(
+            connection=connection if connection is not None else get_async_connection(), retry_policy=retry_policy
+        )
+
+    def __enter__(self) -> "AsyncEmailSender":
+        # The inherited sync context manager would block while opening the connection
+        raise TypeError(f"{type(self).__name__} opens its connection asynchronously, use 'async with' instead.")
+
+    async def __aenter__(self) -> "AsyncEmailSender":
+        await self._try_open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        await self.connection.open()
+
+    async def close(self) -> None:
+        try:
+            await self.connection.close()
+        except Exception:
+            self._logger.warning(_("Closing the email connection failed."), exc_info=True)
+
+    async def _try_open(self) -> bool:
+        try:
+            await self.open()
+        except Exception:
+            self._logger.warning(_("Opening the email connection failed."), exc_info=True)
+            return False
+        return True
+
+    async def reconnect(self) -> None:
+        await self.close()
+        await self._try_open()
+
+    async def _send_message(self, message: EmailMessage, attempt: int) -> int:
+        getattr(message, "phase_timer", NULL_PHASE_TIMER).restart()
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire()
+
+            try:
+                result = await self.connection.send_messages([message])
+            except Exception as e:
+                if not self.retry_policy.should_retry(e, attempt):
+                    self._log_failure(message)
+                    self._finish_send_phase(message)
+                    if _is_connection_error(e):
+                        await self.reconnect()
+                    return 0
+
+                delay = self.retry_policy.get_delay(attempt)
+                self._logger.warning(self._get_retry_message(message, attempt, delay), exc_info=True)
+                await asyncio.sleep(delay)
+                await self.reconnect()
+                attempt += 1
+                continue
+
+            self._log_success(message)
+            self._finish_send_phase(message)
+            return result or 0
+
+    async def send(self, messages: list[EmailMessage], attempt: int = 1) -> int:
+        """
+        Async counterpart of `EmailSender.send()`. Waiting for a retry doesn't block other tasks.
+        """
+        counter = 0
+        for message in messages:
+            counter += await self._send_message(message, attempt=attempt)
+        return counter
@@ -1,4 +1,6 @@
+import asyncio
 import re
+import threading
 import warnings
 
 from django.core import mail
@@ -280,3 +282,141 @@ class EmailTestServiceQuerySet(TestCase):
 
     def __len__(self) -> int:
         return self._match_list.__len__()
+
+
+class SMTPSinkServer:
+    """
+    Minimal SMTP server for tests and benchmarks. Accepts every email and stores it in `messages` as a dict with the
+    keys "from", "to" and "data" (the raw message). Runs its own event loop in a background thread.
+    Recipients in `rejected_recipients` are refused by the server.
+
+    with SMTPSinkServer() as server:
+        with self.settings(EMAIL_HOST=server.host, EMAIL_PORT=server.port):
+            ...
+    """
+
+    SIMPLE_REPLIES = {
+        "EHLO": b"250-localhost\r\n250 AUTH PLAIN\r\n",
+        "HELO": b"250 OK\r\n",
+        "NOOP": b"250 OK\r\n",
+        "AUTH": b"235 Authentication successful\r\n",
+    }
+    # Seconds to wait for the server to listen
+    START_TIMEOUT = 10
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self.messages = []
+        self.rejected_recipients = set()
+        self.connection_count = 0
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+        self._start_error = None
+
+    def __enter__(self) -> "SMTPSinkServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Starts the server. If no port was given, a free one is picked and stored in `port`. An error while starting
+        (e.g. the port is in use) is raised here.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="pony-express-smtp-sink", daemon=True)
+        self._thread.start()
+        if not self._started.wait(timeout=self.START_TIMEOUT):
+            raise TimeoutError(f"SMTP sink server didn't start within {self.START_TIMEOUT} seconds.")
+        if self._start_error is not None:
+            self._thread.join()
+            raise self._start_error
+
+    def stop(self) -> None:
+        """
+        Stops the server and drops all open connections.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            server = self._loop.run_until_complete(asyncio.start_server(self._handle_client, self.host, self.port))
+        except OSError as e:
+            # Handed to `start()`, which would wait forever otherwise
+            self._start_error = e
+            self._loop.close()
+            self._started.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    @staticmethod
+    def _get_address(argument: str) -> str:
+        match = re.search(r"<(.*?)>", argument)
+        return match.group(1) if match else argument.partition(":")[2].strip()
+
+    def _handle_command(self, command: str, argument: str, envelope: dict) -> bytes:
+        """
+        Processes a single SMTP command (except DATA and QUIT) and returns the reply.
+        """
+        if command in self.SIMPLE_REPLIES:
+            return self.SIMPLE_REPLIES[command]
+        if command in ("MAIL", "RSET"):
+            envelope["from"] = self._get_address(argument) if command == "MAIL" else None
+            envelope["to"] = []
+            return b"250 OK\r\n"
+        if command == "RCPT":
+            recipient = self._get_address(argument)
+            if recipient in self.rejected_recipients:
+                return b"550 Mailbox unavailable\r\n"
+            envelope["to"].append(recipient)
+            return b"250 OK\r\n"
+        return b"502 Command not implemented\r\n"
+
+    async def _read_data(self, reader: asyncio.StreamReader) -> bytes:
+        line_list = []
+        while (line := await reader.readline()) not in (b".\r\n", b""):
+            # Undo the dot-stuffing
+            line_list.append(line[1:] if line.startswith(b"..") else line)
+        return b"".join(line_list)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connection_count += 1
+        envelope = {"from": None, "to": []}
+        writer.write(b"220 localhost Pony Express SMTP sink\r\n")
+        try:
+            while line := await reader.readline():
+                command, _, argument = line.decode().strip().partition(" ")
+                command = command.upper()
+                if command == "QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    await writer.drain()
+                    break
+                if command == "DATA":
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    await writer.drain()
+                    self.messages.append({**envelope, "data": await self._read_data(reader)})
+                    envelope = {"from": None, "to": []}
+                    writer.write(b"250 OK\r\n")
+                else:
+                    writer.write(self._handle_command(command, argument, envelope))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -1,4 +1,13 @@
 from django.conf import settings
 
 PONY_LOGGER_NAME: str = getattr(settings, "DJANGO_PONY_EXPRESS_LOGGER_NAME", "django_pony_express")
+PONY_BATCH_FLUSH_INTERVAL: float = getattr(settings, "DJANGO_PONY_EXPRESS_BATCH_FLUSH_INTERVAL", 0.05)
+PONY_BATCH_SIZE: int = getattr(settings, "DJANGO_PONY_EXPRESS_BATCH_SIZE", 50)
 PONY_LOG_RECIPIENTS: bool = getattr(settings, "DJANGO_PONY_EXPRESS_LOG_RECIPIENTS", False)
+PONY_ASYNC_EMAIL_BACKEND: str | None = getattr(settings, "DJANGO_PONY_EXPRESS_ASYNC_EMAIL_BACKEND", None)
+PONY_WORKER_POOL_SIZE: int = getattr(settings, "DJANGO_PONY_EXPRESS_WORKER_POOL_SIZE", 4)
+PONY_WORKER_QUEUE_SIZE: int = getattr(settings, "DJANGO_PONY_EXPRESS_WORKER_QUEUE_SIZE", 1000)
+PONY_WORKER_QUEUE_FULL_POLICY: str = getattr(settings, "DJANGO_PONY_EXPRESS_WORKER_QUEUE_FULL_POLICY", "block")
+PONY_WORKER_IDLE_TIMEOUT: float = getattr(settings, "DJANGO_PONY_EXPRESS_WORKER_IDLE_TIMEOUT", 30.0)
+PONY_RATE_LIMITS: dict = getattr(settings, "DJANGO_PONY_EXPRESS_RATE_LIMITS", {})
+PONY_RETRY_POLICY: dict = getattr(settings, "DJANGO_PONY_EXPRESS_RETRY_POLICY", {})
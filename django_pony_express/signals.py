@@ -0,0 +1,72 @@
+import time
+
+from django.dispatch import Signal
+
+# Phases of processing an email
+PHASE_CONTEXT = "context"
+PHASE_HTML = "html"
+PHASE_TEXT = "text"
+PHASE_ATTACHMENTS = "attachments"
+PHASE_SEND = "send"
+
+# Sent after every phase of processing an email. The sender is the service class, the arguments are "service",
+# "phase", "duration" (in seconds), "template_name" and "size" (size of the phase's output or `None`).
+# Receivers are cached per sender, so checking for listeners is a dictionary lookup.
+email_phase_finished = Signal(use_caching=True)
+
+
+class PhaseTimer:
+    """
+    Measures consecutive phases of processing an email and sends `email_phase_finished` after each of them. The time
+    spent in the receivers isn't added to the next phase.
+    """
+
+    def __init__(self, service) -> None:
+        self.service = service
+        self._started_at = time.perf_counter()
+
+    def restart(self) -> None:
+        self._started_at = time.perf_counter()
+
+    def finish(self, phase: str, size: int | None = None) -> None:
+        duration = time.perf_counter() - self._started_at
+        email_phase_finished.send(
+            sender=type(self.service),
+            service=self.service,
+            phase=phase,
+            duration=duration,
+            template_name=self.service.template_name,
+            size=size,
+        )
+        self.restart()
+
+    def __reduce__(self) -> tuple:
+        # The service might not be picklable, so emails rendered in another process don't report the send phase
+        return NullPhaseTimer, ()
+
+
+class NullPhaseTimer:
+    """
+    Stand-in for `PhaseTimer` if nobody listens. It's falsy, so callers can skip computing sizes.
+    """
+
+    def __bool__(self) -> bool:
+        return False
+
+    def restart(self) -> None:
+        pass
+
+    def finish(self, phase: str, size: int | None = None) -> None:
+        pass
+
+
+NULL_PHASE_TIMER = NullPhaseTimer()
+
+
+def get_phase_timer(service) -> PhaseTimer | NullPhaseTimer:
+    """
+    Returns a running timer for the given service or a no-op timer if there are no receivers for its class.
+    """
+    if email_phase_finished.has_listeners(type(service)):
+        return PhaseTimer(service)
+    return NULL_PHASE_TIMER
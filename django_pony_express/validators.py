@@ -0,0 +1,74 @@
+import re
+from email.utils import parseaddr
+
+
+class EmailAddressValidator:
+    """
+    Checks email addresses against `pattern`. Addresses are normalised before: surrounding whitespace is stripped and
+    the domain is lower-cased (the local part is case-sensitive by definition). Addresses with a display name
+    ("Name <address>") are checked by their address part and kept as they are.
+    Results are memoised per given address, so checking the same address again (e.g. the recipients of a factory run
+    in both the factory and the services) is a dictionary lookup. The memo is emptied once it reaches `max_entries`.
+    """
+
+    EMAIL_STRUCTURE_PATTERN = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+
+    def __init__(self, pattern: re.Pattern | None = None, max_entries: int = 100_000) -> None:
+        self.pattern = pattern or self.EMAIL_STRUCTURE_PATTERN
+        self.max_entries = max_entries
+        self._cache = {}
+
+    def normalize(self, email: str) -> str:
+        """
+        Returns the address without surrounding whitespace and with a lower-cased domain.
+        """
+        email = email.strip()
+        local_part, separator, domain = email.rpartition("@")
+        if not separator or "<" in email:
+            return email
+        return f"{local_part}@{domain.lower()}"
+
+    def _clean(self, email: str) -> str | None:
+        if not isinstance(email, str):
+            return None
+        normalized_email = self.normalize(email)
+        address = parseaddr(normalized_email)[1] if "<" in normalized_email else normalized_email
+        return normalized_email if self.pattern.match(address) else None
+
+    def clean(self, email: str) -> str | None:
+        """
+        Returns the normalised address or `None` if it's invalid.
+        """
+        try:
+            return self._cache[email]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable, so it can't be an address anyway
+            return None
+
+        cleaned_email = self._clean(email)
+        if len(self._cache) >= self.max_entries:
+            self._cache.clear()
+        self._cache[email] = cleaned_email
+        return cleaned_email
+
+    def is_valid(self, email: str) -> bool:
+        return self.clean(email) is not None
+
+    def validate(self, email_list: list | tuple) -> tuple[list, list]:
+        """
+        Checks all addresses in one pass. Returns the normalised valid addresses and the invalid ones as given.
+        """
+        valid_list = []
+        invalid_list = []
+        for email in email_list:
+            cleaned_email = self.clean(email)
+            if cleaned_email is None:
+                invalid_list.append(email)
+            else:
+                valid_list.append(cleaned_email)
+        return valid_list, invalid_list
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -9,6 +9,7 @@ INSTALLED_APPS = (
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django_pony_express.outbox",
     "testapp",
 )
 
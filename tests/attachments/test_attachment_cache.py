@@ -0,0 +1,72 @@
+from os.path import basename
+from unittest import mock
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.test import TestCase
+
+from django_pony_express.attachments import AttachmentCache
+
+
+class AttachmentCacheTest(TestCase):
+    file_path = settings.BASE_PATH / "tests/files/testfile.txt"
+
+    def test_attach_file_regular(self):
+        msg = EmailMultiAlternatives()
+        AttachmentCache().attach_file(msg, self.file_path)
+
+        expected_msg = EmailMultiAlternatives()
+        expected_msg.attach_file(self.file_path)
+        self.assertEqual(msg.attachments, expected_msg.attachments)
+        self.assertEqual(msg.attachments[0][0], basename(self.file_path))
+
+    def test_attach_file_reads_file_once(self):
+        cache = AttachmentCache()
+        msg_list = [EmailMultiAlternatives() for _ in range(3)]
+
+        with mock.patch.object(
+            EmailMultiAlternatives, "attach_file", autospec=True, side_effect=EmailMultiAlternatives.attach_file
+        ) as mocked_attach_file:
+            for msg in msg_list:
+                cache.attach_file(msg, self.file_path)
+
+        mocked_attach_file.assert_called_once()
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(len(cache), 1)
+        # The content is shared by reference
+        self.assertIs(msg_list[0].attachments[0][1], msg_list[2].attachments[0][1])
+
+    def test_attach_file_str_and_path_share_entry(self):
+        cache = AttachmentCache()
+        cache.attach_file(EmailMultiAlternatives(), self.file_path)
+        cache.attach_file(EmailMultiAlternatives(), str(self.file_path))
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_attach_file_exceeding_budget_is_not_cached(self):
+        cache = AttachmentCache(max_size=1)
+        msg_list = [EmailMultiAlternatives() for _ in range(2)]
+        for msg in msg_list:
+            cache.attach_file(msg, self.file_path)
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(msg_list[1].attachments, msg_list[0].attachments)
+
+    def test_size(self):
+        cache = AttachmentCache()
+        cache.attach_file(EmailMultiAlternatives(), self.file_path)
+
+        self.assertEqual(cache.size, len(self.file_path.read_text()))
+
+    def test_clear(self):
+        cache = AttachmentCache()
+        cache.attach_file(EmailMultiAlternatives(), self.file_path)
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(cache.misses, 0)
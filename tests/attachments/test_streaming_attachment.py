@@ -0,0 +1,129 @@
+import base64
+import copy
+import email
+import functools
+import io
+import pickle
+import tempfile
+from pathlib import Path
+
+from django.core.mail import EmailMessage
+from django.test import TestCase
+
+from django_pony_express.attachments import StreamingAttachment, iter_message_chunks
+
+
+class StreamingAttachmentTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.content = bytes(range(256)) * 40 + b"pony"
+        self.file_path = Path(temp_dir.name) / "report.pdf"
+        self.file_path.write_bytes(self.content)
+
+    def _get_message(self, *attachments) -> EmailMessage:
+        msg = EmailMessage("Pony", "Body", from_email="sender@example.com", to=["rider@example.com"])
+        for attachment in attachments:
+            msg.attach(attachment)
+        return msg
+
+    def test_init_headers(self):
+        attachment = StreamingAttachment(self.file_path)
+
+        self.assertEqual(attachment.filename, "report.pdf")
+        self.assertEqual(attachment.get_content_type(), "application/pdf")
+        self.assertEqual(attachment.get_filename(), "report.pdf")
+        self.assertEqual(attachment["Content-Transfer-Encoding"], "base64")
+
+    def test_init_filename_and_mimetype(self):
+        attachment = StreamingAttachment(self.file_path, filename="Übersicht.bin", mimetype="text/csv")
+
+        self.assertEqual(attachment.get_content_type(), "text/csv")
+        self.assertEqual(attachment.get_filename(), "Übersicht.bin")
+
+    def test_init_unknown_mimetype(self):
+        self.assertEqual(
+            StreamingAttachment(self.file_path, filename="report.pony").get_content_type(), "application/octet-stream"
+        )
+
+    def test_size(self):
+        self.assertEqual(StreamingAttachment(self.file_path).size, len(self.content))
+
+    def test_iter_encoded_regular(self):
+        chunk_list = list(StreamingAttachment(self.file_path, chunk_size=1000).iter_encoded())
+
+        self.assertEqual(b"".join(chunk_list), base64.encodebytes(self.content))
+        # 1000 bytes are rounded down to a multiple of 57 bytes per line
+        self.assertEqual(len(chunk_list), len(self.content) // 969 + 1)
+
+    def test_iter_encoded_linesep(self):
+        encoded = b"".join(StreamingAttachment(self.file_path, chunk_size=100).iter_encoded(linesep=b"\r\n"))
+
+        self.assertEqual(encoded, base64.encodebytes(self.content).replace(b"\n", b"\r\n"))
+
+    def test_iter_encoded_short_reads(self):
+        class ShortReadAttachment(StreamingAttachment):
+            def open(self):
+                file = io.BytesIO(self.path.read_bytes())
+                # Returns at most 10 bytes per call like a slow stream
+                file.read = functools.partial(lambda read, size=-1: read(min(size, 10)), file.read)
+                return file
+
+        encoded = b"".join(ShortReadAttachment(self.file_path, chunk_size=200).iter_encoded())
+
+        self.assertEqual(encoded, base64.encodebytes(self.content))
+
+    def test_payload_is_read_from_file(self):
+        attachment = StreamingAttachment(self.file_path)
+
+        self.assertEqual(attachment.get_payload(decode=True), self.content)
+
+    def test_payload_cannot_be_set(self):
+        with self.assertRaises(TypeError):
+            StreamingAttachment(self.file_path).set_payload("pony")
+
+    def test_message_regular(self):
+        msg = self._get_message(StreamingAttachment(self.file_path))
+
+        parsed_msg = email.message_from_bytes(msg.message().as_bytes())
+        part = next(part for part in parsed_msg.walk() if part.get_filename())
+        self.assertEqual(part.get_filename(), "report.pdf")
+        self.assertEqual(part.get_payload(decode=True), self.content)
+
+    def test_pickle_and_copy(self):
+        attachment = StreamingAttachment(self.file_path)
+        attachment.get_payload()
+
+        self.assertIsNone(pickle.loads(pickle.dumps(attachment))._encoded_payload)
+        self.assertIsNone(copy.deepcopy(attachment)._encoded_payload)
+        self.assertEqual(pickle.loads(pickle.dumps(attachment)).get_payload(decode=True), self.content)
+
+
+class IterMessageChunksTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.file_path = Path(temp_dir.name) / "report.pdf"
+        self.file_path.write_bytes(bytes(range(256)) * 100)
+
+    def test_without_streaming_attachments(self):
+        mime_message = EmailMessage("Pony", "Body", to=["rider@example.com"]).message()
+
+        self.assertEqual(list(iter_message_chunks(mime_message, mime_message.as_bytes)), [mime_message.as_bytes()])
+
+    def test_equals_serialised_message(self):
+        msg = EmailMessage("Pony", "Body", to=["rider@example.com"])
+        msg.attach(StreamingAttachment(self.file_path, chunk_size=1000))
+        msg.attach("notes.txt", "Giddy up", "text/plain")
+        msg.attach(StreamingAttachment(self.file_path, filename="copy.pdf", chunk_size=1000))
+        mime_message = msg.message()
+        serialize = functools.partial(mime_message.as_bytes, linesep="\r\n")
+
+        chunk_list = list(iter_message_chunks(mime_message, serialize))
+
+        self.assertEqual(b"".join(chunk_list), serialize())
+        # The attachments are read in chunks of 969 bytes (17 lines of 76 characters plus line breaks)
+        self.assertGreater(len(chunk_list), 50)
+        self.assertEqual(max(len(chunk) for chunk in chunk_list[1:-1]), 1326)
@@ -0,0 +1,265 @@
+import email
+import smtplib
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.test import TestCase, override_settings
+
+from django_pony_express.attachments import StreamingAttachment
+from django_pony_express.backends import (
+    SMTPAsyncEmailBackend,
+    StreamingSMTPEmailBackend,
+    SyncEmailBackendAdapter,
+    _iter_data,
+    get_async_connection,
+)
+from django_pony_express.services.tests import SMTPSinkServer
+
+
+class SyncEmailBackendAdapterTest(TestCase):
+    def test_init_uses_default_connection(self):
+        backend = SyncEmailBackendAdapter()
+        self.assertIsInstance(backend.connection, LocmemEmailBackend)
+
+    def test_init_uses_given_connection(self):
+        connection = LocmemEmailBackend()
+        backend = SyncEmailBackendAdapter(connection=connection)
+        self.assertIs(backend.connection, connection)
+
+    async def test_send_messages_regular(self):
+        backend = SyncEmailBackendAdapter()
+        result = await backend.send_messages([EmailMessage("Pony", "Body", to=["rider@example.com"])])
+
+        self.assertEqual(result, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    async def test_open_and_close_are_delegated(self):
+        connection = LocmemEmailBackend()
+        with (
+            mock.patch.object(connection, "open") as mocked_open,
+            mock.patch.object(connection, "close") as mocked_close,
+        ):
+            async with SyncEmailBackendAdapter(connection=connection):
+                pass
+
+        mocked_open.assert_called_once_with()
+        mocked_close.assert_called_once_with()
+
+
+class SMTPAsyncEmailBackendTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = SMTPSinkServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def _get_backend(self, **kwargs) -> SMTPAsyncEmailBackend:
+        return SMTPAsyncEmailBackend(host=self.server.host, port=self.server.port, **kwargs)
+
+    def test_iter_data_dot_stuffing(self):
+        self.assertEqual(
+            list(_iter_data(iter((b"Line 1\n.Line 2\r\n..Line 3",)))),
+            [b"Line 1\r\n..Line 2\r\n...Line 3", b"\r\n.\r\n"],
+        )
+
+    def test_iter_data_quotes_every_chunk(self):
+        self.assertEqual(
+            list(_iter_data(iter((b"Line 1\n", b".Line 2\n")))),
+            [b"Line 1\r\n", b"..Line 2\r\n", b".\r\n"],
+        )
+
+    def test_iter_data_empty(self):
+        self.assertEqual(list(_iter_data(iter(()))), [b"\r\n.\r\n"])
+
+    async def test_send_messages_regular(self):
+        message = EmailMessage(
+            "Pony",
+            "Body\n.with a dot",
+            from_email="sender@example.com",
+            to=["rider@example.com"],
+            cc=["cc@example.com"],
+        )
+        result = await self._get_backend().send_messages([message])
+
+        self.assertEqual(result, 1)
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual(self.server.messages[0]["from"], "sender@example.com")
+        self.assertEqual(self.server.messages[0]["to"], ["rider@example.com", "cc@example.com"])
+        self.assertIn(b"Subject: Pony", self.server.messages[0]["data"])
+        self.assertIn(b"\r\n.with a dot", self.server.messages[0]["data"])
+
+    async def test_send_messages_empty_list(self):
+        self.assertEqual(await self._get_backend().send_messages([]), 0)
+        self.assertEqual(self.server.connection_count, 0)
+
+    async def test_send_messages_keeps_open_connection(self):
+        messages = [EmailMessage("Pony", "Body", to=[f"rider.{i}@example.com"]) for i in range(3)]
+        async with self._get_backend() as backend:
+            for message in messages:
+                await backend.send_messages([message])
+
+        self.assertEqual(len(self.server.messages), 3)
+        self.assertEqual(self.server.connection_count, 1)
+
+    async def test_send_messages_opens_connection_per_call(self):
+        backend = self._get_backend()
+        await backend.send_messages([EmailMessage("Pony", "Body", to=["rider@example.com"])])
+        await backend.send_messages([EmailMessage("Pony", "Body", to=["rider@example.com"])])
+
+        self.assertEqual(self.server.connection_count, 2)
+
+    async def test_send_messages_skips_message_without_recipients(self):
+        result = await self._get_backend().send_messages([EmailMessage("Pony", "Body")])
+
+        self.assertEqual(result, 0)
+        self.assertEqual(len(self.server.messages), 0)
+
+    async def test_send_messages_rejected_recipient_raises(self):
+        self.server.rejected_recipients.add("rider@example.com")
+
+        with self.assertRaises(smtplib.SMTPResponseException):
+            await self._get_backend().send_messages([EmailMessage("Pony", "Body", to=["rider@example.com"])])
+
+    async def test_send_messages_rejected_recipient_fail_silently(self):
+        self.server.rejected_recipients.add("rider@example.com")
+        messages = [
+            EmailMessage("Pony", "Body", to=["rider@example.com"]),
+            EmailMessage("Pony", "Body", to=["other.rider@example.com"]),
+        ]
+        result = await self._get_backend(fail_silently=True).send_messages(messages)
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.server.messages[0]["to"], ["other.rider@example.com"])
+
+    async def test_open_connection_refused_raises(self):
+        backend = SMTPAsyncEmailBackend(host="127.0.0.1", port=1)
+
+        with self.assertRaises(OSError):
+            await backend.open()
+
+    async def test_open_connection_refused_fail_silently(self):
+        backend = SMTPAsyncEmailBackend(host="127.0.0.1", port=1, fail_silently=True)
+
+        self.assertIsNone(await backend.open())
+        self.assertEqual(await backend.send_messages([EmailMessage("Pony", "Body", to=["rider@example.com"])]), 0)
+
+    async def test_open_with_credentials(self):
+        async with self._get_backend(username="pony", password="express") as backend:
+            self.assertIsNotNone(backend._writer)
+
+    async def test_open_twice_returns_false(self):
+        async with self._get_backend() as backend:
+            self.assertFalse(await backend.open())
+
+    async def test_close_without_connection(self):
+        await self._get_backend().close()
+
+
+class GetAsyncConnectionTest(TestCase):
+    def test_default_backend(self):
+        self.assertIsInstance(get_async_connection(), SyncEmailBackendAdapter)
+
+    def test_backend_argument(self):
+        self.assertIsInstance(
+            get_async_connection("django_pony_express.backends.SMTPAsyncEmailBackend"), SMTPAsyncEmailBackend
+        )
+
+    @override_settings(EMAIL_HOST="mail.example.com")
+    def test_kwargs_are_passed(self):
+        connection = get_async_connection(
+            "django_pony_express.backends.SMTPAsyncEmailBackend", fail_silently=True, port=2525
+        )
+        self.assertTrue(connection.fail_silently)
+        self.assertEqual(connection._smtp_backend.host, "mail.example.com")
+        self.assertEqual(connection._smtp_backend.port, 2525)
+
+    @mock.patch(
+        "django_pony_express.backends.PONY_ASYNC_EMAIL_BACKEND", "django_pony_express.backends.SMTPAsyncEmailBackend"
+    )
+    def test_backend_from_settings(self):
+        self.assertIsInstance(get_async_connection(), SMTPAsyncEmailBackend)
+
+
+class StreamingSMTPEmailBackendTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = SMTPSinkServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.content = bytes(range(256)) * 100
+        self.file_path = Path(temp_dir.name) / "report.pdf"
+        self.file_path.write_bytes(self.content)
+
+    def _get_backend(self, **kwargs) -> StreamingSMTPEmailBackend:
+        return StreamingSMTPEmailBackend(host=self.server.host, port=self.server.port, **kwargs)
+
+    def _get_message(self, to: list | None = None) -> EmailMessage:
+        message = EmailMessage(
+            "Pony", "Body\n.with a dot", from_email="sender@example.com", to=to or ["rider@example.com"]
+        )
+        message.attach(StreamingAttachment(self.file_path, chunk_size=1000))
+        return message
+
+    def _get_attachment_content(self, data: bytes) -> bytes:
+        part = next(part for part in email.message_from_bytes(data).walk() if part.get_filename())
+        return part.get_payload(decode=True)
+
+    def test_send_messages_regular(self):
+        result = self._get_backend().send_messages([self._get_message()])
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.server.messages[0]["from"], "sender@example.com")
+        self.assertEqual(self.server.messages[0]["to"], ["rider@example.com"])
+        self.assertIn(b"\r\n.with a dot", self.server.messages[0]["data"])
+        self.assertEqual(self._get_attachment_content(self.server.messages[0]["data"]), self.content)
+
+    def test_send_messages_reads_attachment_in_chunks(self):
+        with mock.patch.object(
+            StreamingAttachment, "iter_encoded", autospec=True, side_effect=StreamingAttachment.iter_encoded
+        ) as mocked_iter_encoded:
+            self._get_backend().send_messages([self._get_message()])
+
+        mocked_iter_encoded.assert_called_once()
+        self.assertEqual(self._get_attachment_content(self.server.messages[0]["data"]), self.content)
+
+    def test_send_messages_without_streaming_attachment(self):
+        result = self._get_backend().send_messages([EmailMessage("Pony", "Body", to=["rider@example.com"])])
+
+        self.assertEqual(result, 1)
+        self.assertIn(b"Subject: Pony", self.server.messages[0]["data"])
+
+    def test_send_messages_rejected_recipient_raises(self):
+        self.server.rejected_recipients.add("rider@example.com")
+
+        with self.assertRaises(smtplib.SMTPRecipientsRefused):
+            self._get_backend().send_messages([self._get_message()])
+
+    def test_send_messages_rejected_recipient_fail_silently(self):
+        self.server.rejected_recipients.add("rider@example.com")
+        messages = [self._get_message(), self._get_message(to=["other.rider@example.com"])]
+
+        result = self._get_backend(fail_silently=True).send_messages(messages)
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.server.messages[0]["to"], ["other.rider@example.com"])
+
+    def test_send_messages_partially_rejected_recipients(self):
+        self.server.rejected_recipients.add("rider@example.com")
+
+        result = self._get_backend().send_messages([self._get_message(to=["rider@example.com", "other@example.com"])])
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.server.messages[0]["to"], ["other@example.com"])
+
+    async def test_async_backend_streams_attachment(self):
+        backend = SMTPAsyncEmailBackend(host=self.server.host, port=self.server.port)
+
+        self.assertEqual(await backend.send_messages([self._get_message()]), 1)
+        self.assertIn(b"\r\n.with a dot", self.server.messages[0]["data"])
+        self.assertEqual(self._get_attachment_content(self.server.messages[0]["data"]), self.content)
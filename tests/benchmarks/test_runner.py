@@ -0,0 +1,69 @@
+import json
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+
+import benchmarks.cases  # noqa: F401
+from benchmarks.runner import Benchmark, compare_reports, get_benchmarks, run_benchmarks
+
+
+class BenchmarkRunnerTest(TestCase):
+    def _get_benchmark(self, call_list: list, **kwargs) -> Benchmark:
+        def setup(items: int):
+            call_list.append("setup")
+            yield lambda: call_list.append(items)
+            call_list.append("teardown")
+
+        return Benchmark(name="pony.ride", setup=setup, **{"items": 10, **kwargs})
+
+    def test_run_warms_up_and_repeats(self):
+        call_list = []
+        result = self._get_benchmark(call_list).run(repeat=3)
+
+        self.assertEqual(call_list, ["setup", 10, 10, 10, 10, "teardown"])
+        self.assertEqual(result["name"], "pony.ride")
+        self.assertEqual(result["items"], 10)
+        self.assertEqual(result["repeat"], 3)
+        self.assertLessEqual(result["min"], result["median"])
+        self.assertLessEqual(result["median"], result["max"])
+
+    def test_run_quick_uses_quick_items(self):
+        call_list = []
+        result = self._get_benchmark(call_list, quick_items=2).run(repeat=1, quick=True)
+
+        self.assertEqual(result["items"], 2)
+        self.assertEqual(result["stdev"], 0)
+        self.assertIn(2, call_list)
+
+    def test_get_benchmarks_filter(self):
+        name_list = [item.name for item in get_benchmarks("outbox")]
+        self.assertEqual(name_list, ["outbox.filter.10k", "outbox.filter.100k"])
+
+    def test_get_benchmarks_cover_all_areas(self):
+        name_list = [item.name for item in get_benchmarks()]
+        for prefix in ("service.build", "converter.streaming.large", "factory.process.locmem.10k", "outbox.filter"):
+            self.assertTrue(any(name.startswith(prefix) for name in name_list), prefix)
+
+    @mock.patch("benchmarks.runner.time.perf_counter", side_effect=[0, 2, 2, 6])
+    def test_run_benchmarks_report_is_json_serialisable(self, *args):
+        report = run_benchmarks([self._get_benchmark([])], repeat=2)
+
+        result = json.loads(json.dumps(report))["results"][0]
+        self.assertEqual(result["median"], 3)
+        self.assertEqual(result["items_per_second"], 10 / 3)
+        self.assertIn("django", report["environment"])
+
+    def test_run_benchmarks_quick_smoke(self):
+        report = run_benchmarks(get_benchmarks("outbox.filter.10k"), repeat=1, quick=True)
+
+        self.assertEqual(report["results"][0]["items"], 1_000)
+        self.assertEqual(mail.outbox, [])
+
+    def test_compare_reports(self):
+        report = {"results": [{"name": "a", "items": 1, "median": 1.5}, {"name": "b", "items": 1, "median": 1}]}
+        baseline = {"results": [{"name": "a", "items": 1, "median": 1}, {"name": "b", "items": 2, "median": 1}]}
+
+        self.assertEqual(
+            compare_reports(report, baseline), [{"name": "a", "median": 1.5, "baseline_median": 1, "change": 0.5}]
+        )
@@ -0,0 +1,122 @@
+import copy
+import email
+import pickle
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.test import TestCase
+
+from django_pony_express.broadcast import BroadcastBody, BroadcastEmailMessage, PreSerializedMessage
+
+
+class BroadcastTest(TestCase):
+    def _get_prototype(self, **kwargs) -> EmailMultiAlternatives:
+        msg = EmailMultiAlternatives(
+            "Announcement",
+            "Giddy up\n.with a dot",
+            from_email="sender@example.com",
+            to=["first.rider@example.com"],
+            cc=["stable@example.com"],
+            **kwargs,
+        )
+        msg.attach_alternative("<p>Giddy up</p>", "text/html")
+        msg.attach("notes.txt", "Bring water", "text/plain")
+        return msg
+
+    def test_message_regular(self):
+        prototype = self._get_prototype()
+        msg = BroadcastEmailMessage(BroadcastBody(prototype), to=["rider@example.com"])
+
+        mime_message = msg.message()
+
+        self.assertIsInstance(mime_message, PreSerializedMessage)
+        parsed_message = email.message_from_bytes(mime_message.as_bytes())
+        self.assertEqual(parsed_message["To"], "rider@example.com")
+        self.assertEqual(parsed_message["Cc"], "stable@example.com")
+        self.assertEqual(parsed_message["Subject"], "Announcement")
+        self.assertEqual(
+            [part.get_content_type() for part in parsed_message.walk()],
+            ["multipart/mixed", "multipart/alternative", "text/plain", "text/html", "text/plain"],
+        )
+
+    def test_message_equals_prototype_except_recipient_headers(self):
+        prototype = self._get_prototype()
+        broadcast_body = BroadcastBody(prototype)
+        msg = BroadcastEmailMessage(broadcast_body, to=["rider@example.com"])
+
+        data = msg.message().as_bytes(linesep="\r\n")
+        prototype_data = broadcast_body._prepare()[0].as_bytes(linesep="\r\n")
+
+        header_data, body = data.split(b"\r\n\r\n", 1)
+        prototype_header_data, prototype_body = prototype_data.split(b"\r\n\r\n", 1)
+        self.assertEqual(body, prototype_body)
+        self.assertNotEqual(header_data, prototype_header_data)
+        self.assertEqual(
+            [line for line in header_data.split(b"\r\n") if not line.startswith((b"To:", b"Date:", b"Message-ID:"))],
+            [
+                line
+                for line in prototype_header_data.split(b"\r\n")
+                if not line.startswith((b"To:", b"Date:", b"Message-ID:"))
+            ],
+        )
+
+    def test_message_serialises_prototype_once(self):
+        prototype = self._get_prototype()
+        broadcast_body = BroadcastBody(prototype)
+        msg_list = [BroadcastEmailMessage(broadcast_body, to=[f"rider.{i}@example.com"]) for i in range(3)]
+
+        data_list = [msg.message().as_bytes() for msg in msg_list]
+
+        self.assertEqual(len(broadcast_body._prepared_dict), 1)
+        self.assertEqual(len({data.split(b"\n\n", 1)[1] for data in data_list}), 1)
+        self.assertEqual(len({email.message_from_bytes(data)["Message-ID"] for data in data_list}), 3)
+
+    def test_message_non_ascii_recipient(self):
+        msg = BroadcastEmailMessage(BroadcastBody(self._get_prototype()), to=["Jürgen <rider@example.com>"])
+
+        data = msg.message().as_bytes()
+
+        self.assertIn(b"To: =?utf-8?q?J=C3=BCrgen?= <rider@example.com>", data)
+
+    def test_message_keeps_extra_headers(self):
+        prototype = self._get_prototype(headers={"Message-ID": "<announcement@example.com>"})
+        msg = BroadcastEmailMessage(BroadcastBody(prototype), to=["rider@example.com"])
+
+        self.assertEqual(msg.message()["Message-ID"], "<announcement@example.com>")
+
+    def test_as_string(self):
+        msg = BroadcastEmailMessage(BroadcastBody(self._get_prototype()), to=["rider@example.com"])
+
+        self.assertIn("To: rider@example.com\n", msg.message().as_string())
+
+    def test_attributes_are_taken_from_prototype(self):
+        prototype = self._get_prototype()
+        msg = BroadcastEmailMessage(BroadcastBody(prototype), to=["rider@example.com"])
+
+        self.assertEqual(msg.subject, "Announcement")
+        self.assertEqual(msg.recipients(), ["rider@example.com", "stable@example.com"])
+        self.assertIs(msg.alternatives, prototype.alternatives)
+        self.assertEqual(prototype.to, ["first.rider@example.com"])
+
+    def test_bcc_is_added_to_prototype_bcc(self):
+        prototype = self._get_prototype(bcc=["archive@example.com"])
+        broadcast_body = BroadcastBody(prototype)
+        msg = BroadcastEmailMessage(broadcast_body, to=["stable@example.com"], bcc=["rider@example.com"])
+
+        self.assertEqual(msg.bcc, ["archive@example.com", "rider@example.com"])
+        self.assertEqual(prototype.bcc, ["archive@example.com"])
+        self.assertNotIn(b"rider@example.com", msg.message().as_bytes())
+
+    def test_copy_and_pickle(self):
+        broadcast_body = BroadcastBody(self._get_prototype())
+        msg = BroadcastEmailMessage(broadcast_body, to=["rider@example.com"])
+
+        self.assertIs(copy.deepcopy(msg).broadcast_body, broadcast_body)
+        self.assertIn(b"To: rider@example.com", pickle.loads(pickle.dumps(msg)).message().as_bytes())
+
+    def test_send_locmem(self):
+        broadcast_body = BroadcastBody(self._get_prototype())
+        msg_list = [BroadcastEmailMessage(broadcast_body, to=[f"rider.{i}@example.com"]) for i in range(2)]
+
+        self.assertEqual(mail.get_connection().send_messages(msg_list), 2)
+        self.assertEqual([msg.to for msg in mail.outbox], [["rider.0@example.com"], ["rider.1@example.com"]])
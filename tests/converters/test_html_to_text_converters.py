@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from django_pony_express.converters import (
+    BaseHtmlToTextConverter,
+    BeautifulSoupHtmlToTextConverter,
+    HtmlToTextCache,
+    StreamingHtmlToTextConverter,
+)
+
+
+class HtmlToTextConverterTest(SimpleTestCase):
+    HTML_SAMPLES = (
+        "<html><body><div>  Hello <b>World</b>  </div><a href='x'>I am a link</a></body></html>",
+        "<!DOCTYPE html><html><head><style>p {}</style><script>let x = 1;</script></head>"
+        "<body><p>A &amp; B&nbsp;C</p><!-- comment --><p>D</p></body></html>",
+        "<a href='https://example.com'><b>Foo</b>   <b>Bar</b></a>",
+        "<a href='https://example.com'>\n  <span>Foo</span>\n</a> tail",
+        "<a>no href</a><a href=''></a><a href='https://example.com' />",
+        "x <a href='o'>outer <a href='i'>inner</a> rest</a> y",
+        "<pre>  keep   \n  this </pre><textarea> </textarea>",
+        "<p>unclosed <a href='q'>link and more <b>bold",
+        "</a>stray<br>line<br/>two<img src='x'>three</br>four",
+        "<span><a href='h'>closed by parent</span> outside",
+        "<ruby>Kan<rt>kan</rt><rp>(</rp></ruby><template><p>hidden</p></template>",
+        "<table><tr><td>1</td><td> 2 </td></tr></table>\n\n",
+        "",
+    )
+
+    def test_base_converter_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            BaseHtmlToTextConverter().convert("<p>Pony</p>")
+
+    def test_beautifulsoup_converter_regular(self):
+        text = BeautifulSoupHtmlToTextConverter().convert(
+            "<div>26. June 2025</div><div><a href='https://example.com'>I am a link</a></div>"
+        )
+        self.assertEqual(text, "26. June 2025\nI am a link (https://example.com)")
+
+    def test_streaming_converter_regular(self):
+        text = StreamingHtmlToTextConverter().convert(
+            "<div>26. June 2025</div><div><a href='https://example.com'>I am a link</a></div>"
+        )
+        self.assertEqual(text, "26. June 2025\nI am a link (https://example.com)")
+
+    def test_streaming_converter_skips_invisible_content(self):
+        text = StreamingHtmlToTextConverter().convert(
+            "<style>p {}</style><script>alert('pony');</script><!-- secret --><p>Visible</p>"
+        )
+        self.assertEqual(text, "Visible")
+
+    def test_streaming_converter_decodes_entities(self):
+        self.assertEqual(StreamingHtmlToTextConverter().convert("<p>Pony &amp; Horse</p>"), "Pony & Horse")
+
+    def test_streaming_converter_matches_beautifulsoup_converter(self):
+        for html_content in self.HTML_SAMPLES:
+            with self.subTest(html_content=html_content):
+                self.assertEqual(
+                    StreamingHtmlToTextConverter().convert(html_content),
+                    BeautifulSoupHtmlToTextConverter().convert(html_content),
+                )
+
+
+class HtmlToTextCacheTest(SimpleTestCase):
+    def test_convert_miss_and_hit(self):
+        cache = HtmlToTextCache()
+        with mock.patch.object(StreamingHtmlToTextConverter, "convert", return_value="Pony") as mocked_convert:
+            self.assertEqual(cache.convert("<p>Pony</p>", StreamingHtmlToTextConverter), "Pony")
+            self.assertEqual(cache.convert("<p>Pony</p>", StreamingHtmlToTextConverter), "Pony")
+
+        mocked_convert.assert_called_once_with("<p>Pony</p>")
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, 4)
+
+    def test_convert_key_contains_converter_class(self):
+        cache = HtmlToTextCache()
+        cache.convert("<p>Pony</p>", StreamingHtmlToTextConverter)
+        cache.convert("<p>Pony</p>", BeautifulSoupHtmlToTextConverter)
+
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(cache), 2)
+
+    def test_convert_evicts_least_recently_used_entry(self):
+        cache = HtmlToTextCache(max_entries=2)
+        cache.convert("<p>A</p>", StreamingHtmlToTextConverter)
+        cache.convert("<p>B</p>", StreamingHtmlToTextConverter)
+        # Mark "A" as recently used
+        cache.convert("<p>A</p>", StreamingHtmlToTextConverter)
+        cache.convert("<p>C</p>", StreamingHtmlToTextConverter)
+
+        self.assertEqual(len(cache), 2)
+        cache.convert("<p>A</p>", StreamingHtmlToTextConverter)
+        self.assertEqual(cache.hits, 2)
+        cache.convert("<p>B</p>", StreamingHtmlToTextConverter)
+        self.assertEqual(cache.misses, 4)
+
+    def test_convert_respects_max_size(self):
+        cache = HtmlToTextCache(max_size=5)
+        cache.convert("<p>Pony</p>", StreamingHtmlToTextConverter)
+        cache.convert("<p>Horse</p>", StreamingHtmlToTextConverter)
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, 5)
+
+    def test_convert_too_large_text_is_not_cached(self):
+        cache = HtmlToTextCache(max_size=2)
+        self.assertEqual(cache.convert("<p>Pony</p>", StreamingHtmlToTextConverter), "Pony")
+        self.assertEqual(len(cache), 0)
+
+    def test_clear_regular(self):
+        cache = HtmlToTextCache()
+        cache.convert("<p>Pony</p>", StreamingHtmlToTextConverter)
+        cache.convert("<p>Pony</p>", StreamingHtmlToTextConverter)
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
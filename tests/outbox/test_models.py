@@ -0,0 +1,103 @@
+import datetime
+from unittest import mock
+
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from django_pony_express.outbox.models import OutboxEmail
+
+
+class OutboxEmailTest(TestCase):
+    def _get_message(self, number: int = 0) -> EmailMultiAlternatives:
+        msg = EmailMultiAlternatives(subject="The Pony Express", body="Body", to=[f"rider.{number}@example.com"])
+        msg.attach_alternative("<p>Body</p>", "text/html")
+        return msg
+
+    def test_str(self):
+        outbox_email = OutboxEmail(subject="The Pony Express")
+        self.assertEqual(str(outbox_email), "The Pony Express (Pending)")
+
+    def test_enqueue_stores_message(self):
+        msg = self._get_message()
+        msg.connection = mock.Mock()
+
+        outbox_email = OutboxEmail.objects.enqueue(msg)
+        outbox_email.refresh_from_db()
+
+        restored_msg = outbox_email.get_message()
+        self.assertEqual(outbox_email.subject, "The Pony Express")
+        self.assertEqual(outbox_email.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(restored_msg.subject, "The Pony Express")
+        self.assertEqual(restored_msg.from_email, "webmaster@localhost")
+        self.assertEqual(restored_msg.recipients(), ["rider.0@example.com"])
+        self.assertIsNone(restored_msg.connection)
+        self.assertEqual(restored_msg.message().as_bytes(), bytes(outbox_email.message_data))
+        self.assertIn(b"<p>Body</p>", bytes(outbox_email.message_data))
+
+    def test_enqueue_stores_data_only(self):
+        msg = self._get_message()
+        msg.bcc = ["stable@example.com"]
+
+        outbox_email = OutboxEmail.objects.enqueue(msg)
+        outbox_email.refresh_from_db()
+
+        self.assertEqual(outbox_email.from_email, "webmaster@localhost")
+        self.assertEqual(outbox_email.recipients, ["rider.0@example.com", "stable@example.com"])
+        self.assertTrue(bytes(outbox_email.message_data).startswith(b"Content-Type: multipart/alternative;"))
+        self.assertNotIn(b"stable@example.com", bytes(outbox_email.message_data))
+
+    def test_get_message_without_recipients(self):
+        outbox_email = OutboxEmail(subject="The Pony Express", message_data=b"")
+
+        with self.assertRaises(ValueError):
+            outbox_email.get_message()
+
+    def test_claim_batch(self):
+        for number in range(5):
+            OutboxEmail.objects.enqueue(self._get_message(number))
+
+        claimed_list = OutboxEmail.objects.claim(batch_size=3, lease=datetime.timedelta(minutes=1))
+
+        self.assertEqual(len(claimed_list), 3)
+        self.assertEqual(len({outbox_email.claim_token for outbox_email in claimed_list}), 1)
+        self.assertEqual(OutboxEmail.objects.claimable().count(), 2)
+
+    def test_claim_does_not_return_claimed_emails_twice(self):
+        for number in range(4):
+            OutboxEmail.objects.enqueue(self._get_message(number))
+
+        first_list = OutboxEmail.objects.claim(batch_size=2, lease=datetime.timedelta(minutes=1))
+        second_list = OutboxEmail.objects.claim(batch_size=2, lease=datetime.timedelta(minutes=1))
+
+        self.assertFalse({email.pk for email in first_list} & {email.pk for email in second_list})
+        self.assertEqual(OutboxEmail.objects.claim(batch_size=2, lease=datetime.timedelta(minutes=1)), [])
+
+    def test_claim_expired_lease_is_claimed_again(self):
+        OutboxEmail.objects.enqueue(self._get_message())
+        OutboxEmail.objects.update(claimed_until=timezone.now() - datetime.timedelta(seconds=1))
+
+        self.assertEqual(len(OutboxEmail.objects.claim(batch_size=1, lease=datetime.timedelta(minutes=1))), 1)
+
+    def test_claim_ignores_sent_and_failed_emails(self):
+        OutboxEmail.objects.enqueue(self._get_message(0))
+        OutboxEmail.objects.enqueue(self._get_message(1))
+        OutboxEmail.objects.update(status=OutboxEmail.Status.SENT)
+        OutboxEmail.objects.filter(pk=OutboxEmail.objects.first().pk).update(status=OutboxEmail.Status.FAILED)
+
+        self.assertEqual(OutboxEmail.objects.claim(batch_size=10, lease=datetime.timedelta(minutes=1)), [])
+
+    def test_claim_uses_skip_locked_if_supported(self):
+        OutboxEmail.objects.enqueue(self._get_message())
+
+        with (
+            mock.patch.object(connection.features, "has_select_for_update_skip_locked", True),
+            mock.patch.object(
+                OutboxEmail.objects.get_queryset().__class__, "select_for_update", autospec=True
+            ) as mocked_select_for_update,
+        ):
+            mocked_select_for_update.side_effect = lambda queryset, **kwargs: queryset
+            OutboxEmail.objects.claim(batch_size=1, lease=datetime.timedelta(minutes=1))
+
+        mocked_select_for_update.assert_called_once_with(mock.ANY, skip_locked=True)
@@ -0,0 +1,121 @@
+import datetime
+import io
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.management import call_command
+from django.test import TestCase
+
+from django_pony_express.outbox.models import OutboxEmail
+from django_pony_express.outbox.worker import OutboxWorker
+from django_pony_express.services.sender import EmailSender
+
+
+class OutboxWorkerTest(TestCase):
+    def _enqueue(self, number: int) -> None:
+        for i in range(number):
+            OutboxEmail.objects.enqueue(
+                EmailMultiAlternatives(subject="The Pony Express", to=[f"rider.{i}@example.com"])
+            )
+
+    def test_init_defaults(self):
+        worker = OutboxWorker()
+        self.assertEqual(worker.batch_size, 100)
+        self.assertEqual(worker.max_attempts, 3)
+        self.assertEqual(worker.lease, datetime.timedelta(minutes=5))
+
+    def test_process_batch_sends_emails(self):
+        self._enqueue(3)
+
+        self.assertEqual(OutboxWorker(batch_size=2).process_batch(), 2)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.Status.SENT, sent_at__isnull=False).count(), 2)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.Status.PENDING).count(), 1)
+
+    def test_process_batch_uses_one_connection(self):
+        self._enqueue(3)
+
+        with mock.patch.object(EmailSender, "open") as mocked_open:
+            OutboxWorker().process_batch()
+
+        mocked_open.assert_called_once()
+
+    def test_process_batch_empty_outbox(self):
+        self.assertEqual(OutboxWorker().process_batch(), 0)
+
+    def test_process_batch_failure_is_retried(self):
+        self._enqueue(1)
+
+        with mock.patch.object(EmailSender, "send", return_value=0):
+            OutboxWorker().process_batch()
+
+        outbox_email = OutboxEmail.objects.get()
+        self.assertEqual(outbox_email.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(outbox_email.attempts, 1)
+        self.assertIsNone(outbox_email.claimed_until)
+
+    @mock.patch("django_pony_express.services.sender.time.sleep")
+    def test_process_batch_unreachable_server(self, *args):
+        self._enqueue(2)
+
+        with (
+            mock.patch.object(EmailSender, "open", side_effect=ConnectionRefusedError("Nobody home")),
+            mock.patch(
+                "django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=ConnectionRefusedError
+            ),
+        ):
+            self.assertEqual(OutboxWorker().process_batch(), 2)
+
+        self.assertEqual(
+            list(OutboxEmail.objects.values_list("status", "attempts", "claimed_until")),
+            [(OutboxEmail.Status.PENDING, 1, None)] * 2,
+        )
+
+    def test_process_batch_failure_max_attempts(self):
+        self._enqueue(1)
+        OutboxEmail.objects.update(attempts=2)
+
+        with mock.patch.object(EmailSender, "send", return_value=0):
+            OutboxWorker(max_attempts=3).process_batch()
+
+        outbox_email = OutboxEmail.objects.get()
+        self.assertEqual(outbox_email.status, OutboxEmail.Status.FAILED)
+        self.assertEqual(outbox_email.attempts, 3)
+
+    def test_process_batch_corrupt_message_data(self):
+        self._enqueue(1)
+        OutboxEmail.objects.update(recipients=[])
+
+        OutboxWorker(max_attempts=1).process_batch()
+
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.Status.FAILED)
+
+    def test_run_once(self):
+        self._enqueue(5)
+
+        self.assertEqual(OutboxWorker(batch_size=2).run(once=True), 5)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @mock.patch("django_pony_express.outbox.worker.time.sleep", side_effect=KeyboardInterrupt)
+    def test_run_sleeps_if_outbox_is_empty(self, mocked_sleep):
+        with self.assertRaises(KeyboardInterrupt):
+            OutboxWorker().run(sleep=3)
+
+        mocked_sleep.assert_called_once_with(3)
+
+    def test_command_once(self):
+        self._enqueue(3)
+        out = io.StringIO()
+
+        call_command("process_email_outbox", "--once", "--batch-size=2", stdout=out)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn("Processed 3 email(s).", out.getvalue())
+
+    @mock.patch.object(OutboxWorker, "run", side_effect=KeyboardInterrupt)
+    def test_command_stops_on_keyboard_interrupt(self, mocked_run):
+        call_command("process_email_outbox", "--lease=60", stdout=io.StringIO())
+
+        mocked_run.assert_called_once_with(once=False, sleep=1.0)
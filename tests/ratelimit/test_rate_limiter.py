@@ -0,0 +1,153 @@
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.core.mail.backends.smtp import EmailBackend as SMTPEmailBackend
+from django.test import TestCase
+
+from django_pony_express import ratelimit
+from django_pony_express.backends import SyncEmailBackendAdapter
+from django_pony_express.ratelimit import (
+    TokenBucketRateLimiter,
+    clear_rate_limiters,
+    get_backend_path,
+    get_rate_limiter,
+)
+from django_pony_express.services.base import BaseEmailService
+from django_pony_express.services.sender import AsyncEmailSender, EmailSender
+
+RATE_LIMITS = {
+    "default": {"rate": 10, "burst": 20},
+    "django.core.mail.backends.smtp.EmailBackend": {"rate": 2},
+}
+
+
+@mock.patch("django_pony_express.ratelimit.time.monotonic", return_value=100.0)
+class TokenBucketRateLimiterTest(TestCase):
+    def test_init_invalid_rate(self, *args):
+        with self.assertRaises(ValueError):
+            TokenBucketRateLimiter(rate=0)
+
+    def test_init_default_burst(self, *args):
+        self.assertEqual(TokenBucketRateLimiter(rate=5).burst, 5)
+        self.assertEqual(TokenBucketRateLimiter(rate=0.5).burst, 1)
+
+    def test_reserve_within_burst_does_not_wait(self, *args):
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=20)
+        self.assertEqual(rate_limiter.reserve(20), 0)
+
+    def test_reserve_beyond_burst_waits(self, *args):
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=20)
+        rate_limiter.reserve(20)
+
+        self.assertEqual(rate_limiter.reserve(5), 0.5)
+        # Following callers queue up behind
+        self.assertEqual(rate_limiter.reserve(5), 1.0)
+
+    def test_reserve_refills_over_time(self, mocked_monotonic):
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=20)
+        rate_limiter.reserve(20)
+        mocked_monotonic.return_value = 101.0
+
+        self.assertEqual(rate_limiter.reserve(10), 0)
+        self.assertEqual(rate_limiter.reserve(1), 0.1)
+
+    def test_refill_is_capped_at_burst(self, mocked_monotonic):
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=20)
+        mocked_monotonic.return_value = 1000.0
+
+        self.assertEqual(rate_limiter.reserve(20), 0)
+        self.assertEqual(rate_limiter.reserve(1), 0.1)
+
+    @mock.patch("django_pony_express.ratelimit.time.sleep")
+    def test_acquire_sleeps(self, mocked_sleep, *args):
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=1)
+        rate_limiter.acquire()
+        mocked_sleep.assert_not_called()
+
+        rate_limiter.acquire(2)
+        mocked_sleep.assert_called_once_with(0.2)
+
+    @mock.patch("django_pony_express.ratelimit.asyncio.sleep")
+    async def test_aacquire_sleeps(self, mocked_sleep, *args):
+        rate_limiter = TokenBucketRateLimiter(rate=10, burst=1)
+        await rate_limiter.aacquire(2)
+
+        mocked_sleep.assert_awaited_once_with(0.1)
+
+
+@mock.patch("django_pony_express.ratelimit.PONY_RATE_LIMITS", RATE_LIMITS)
+class GetRateLimiterTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        clear_rate_limiters()
+        self.addCleanup(clear_rate_limiters)
+
+    def test_get_backend_path(self):
+        self.assertEqual(get_backend_path(), "django.core.mail.backends.locmem.EmailBackend")
+        self.assertEqual(get_backend_path("my.Backend"), "my.Backend")
+        self.assertEqual(get_backend_path(SMTPEmailBackend()), "django.core.mail.backends.smtp.EmailBackend")
+        self.assertEqual(
+            get_backend_path(SyncEmailBackendAdapter(connection=LocmemEmailBackend())),
+            "django.core.mail.backends.locmem.EmailBackend",
+        )
+
+    def test_backend_specific_limit(self):
+        rate_limiter = get_rate_limiter(SMTPEmailBackend())
+        self.assertEqual(rate_limiter.rate, 2)
+        self.assertIs(rate_limiter, get_rate_limiter("django.core.mail.backends.smtp.EmailBackend"))
+
+    def test_default_limit_is_shared(self):
+        rate_limiter = get_rate_limiter(LocmemEmailBackend())
+        self.assertEqual(rate_limiter.rate, 10)
+        self.assertEqual(rate_limiter.burst, 20)
+        self.assertIs(rate_limiter, get_rate_limiter("my.Backend"))
+
+    def test_no_limit_configured(self):
+        with mock.patch("django_pony_express.ratelimit.PONY_RATE_LIMITS", {}):
+            self.assertIsNone(get_rate_limiter())
+
+    def test_email_sender_acquires_tokens_per_message(self):
+        sender = EmailSender()
+        self.assertIs(sender.rate_limiter, get_rate_limiter())
+
+        with mock.patch.object(TokenBucketRateLimiter, "acquire") as mocked_acquire:
+            sender.send([EmailMultiAlternatives(subject="Pony", to=[f"rider.{i}@example.com"]) for i in range(3)])
+
+        self.assertEqual(mocked_acquire.call_args_list, [mock.call()] * 3)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @mock.patch("django_pony_express.ratelimit.time.sleep")
+    @mock.patch("django_pony_express.ratelimit.time.monotonic", return_value=100.0)
+    def test_email_sender_batch_does_not_exceed_burst(self, mocked_monotonic, mocked_sleep):
+        sender = EmailSender()
+        sender.rate_limiter = TokenBucketRateLimiter(rate=10, burst=5)
+
+        sender.send([EmailMultiAlternatives(subject="Pony", to=[f"rider.{i}@example.com"]) for i in range(20)])
+
+        # The first five emails are sent at once, every further one waits for its own token
+        self.assertEqual(mocked_sleep.call_count, 15)
+        for number, call in enumerate(mocked_sleep.call_args_list, start=1):
+            self.assertAlmostEqual(call.args[0], number / 10)
+
+    async def test_async_email_sender_shares_rate_limiter(self):
+        sender = AsyncEmailSender()
+        self.assertIs(sender.rate_limiter, get_rate_limiter())
+
+        with mock.patch.object(TokenBucketRateLimiter, "aacquire") as mocked_aacquire:
+            await sender.send([EmailMultiAlternatives(subject="Pony", to=["rider@example.com"])])
+
+        mocked_aacquire.assert_awaited_once_with()
+
+    def test_send_and_log_email_acquires_token(self):
+        service = BaseEmailService(recipient_email_list=["rider@example.com"])
+        with mock.patch.object(TokenBucketRateLimiter, "acquire") as mocked_acquire:
+            service._send_and_log_email(EmailMultiAlternatives(subject="Pony", to=["rider@example.com"]))
+
+        mocked_acquire.assert_called_once_with()
+
+    def test_clear_rate_limiters(self):
+        get_rate_limiter()
+        clear_rate_limiters()
+        self.assertEqual(ratelimit._rate_limiter_dict, {})
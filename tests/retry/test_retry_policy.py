@@ -0,0 +1,55 @@
+import smtplib
+from unittest import mock
+
+from django.test import TestCase
+
+from django_pony_express.retry import RetryPolicy, get_default_retry_policy
+
+
+class RetryPolicyTest(TestCase):
+    def test_init_defaults(self):
+        policy = RetryPolicy()
+        self.assertEqual(policy.max_attempts, 3)
+        self.assertTrue(policy.jitter)
+
+    def test_init_invalid_keyword(self):
+        with self.assertRaises(TypeError):
+            RetryPolicy(max_retries=3)
+
+    def test_init_resolves_dotted_exception_paths(self):
+        policy = RetryPolicy(retryable_exceptions=["smtplib.SMTPServerDisconnected", KeyError])
+        self.assertEqual(policy.retryable_exceptions, (smtplib.SMTPServerDisconnected, KeyError))
+
+    def test_is_retryable_connection_errors(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable(smtplib.SMTPServerDisconnected("Gone")))
+        self.assertTrue(policy.is_retryable(ConnectionResetError()))
+        self.assertTrue(policy.is_retryable(TimeoutError()))
+
+    def test_is_retryable_transient_smtp_reply(self):
+        self.assertTrue(RetryPolicy().is_retryable(smtplib.SMTPDataError(421, "Too many connections")))
+
+    def test_is_retryable_permanent_smtp_reply(self):
+        self.assertFalse(RetryPolicy().is_retryable(smtplib.SMTPDataError(550, "Mailbox unavailable")))
+
+    def test_is_retryable_other_exception(self):
+        self.assertFalse(RetryPolicy().is_retryable(ValueError("Broken pony")))
+
+    def test_should_retry_respects_max_attempts(self):
+        policy = RetryPolicy(max_attempts=2)
+        self.assertTrue(policy.should_retry(TimeoutError(), attempt=1))
+        self.assertFalse(policy.should_retry(TimeoutError(), attempt=2))
+
+    def test_get_delay_grows_exponentially(self):
+        policy = RetryPolicy(backoff_base=1, backoff_max=5, jitter=False)
+        self.assertEqual([policy.get_delay(attempt) for attempt in range(1, 5)], [1, 2, 4, 5])
+
+    @mock.patch("django_pony_express.retry.random.uniform", return_value=0.3)
+    def test_get_delay_with_jitter(self, mocked_uniform):
+        policy = RetryPolicy(backoff_base=1, backoff_max=5)
+        self.assertEqual(policy.get_delay(3), 0.3)
+        mocked_uniform.assert_called_once_with(0, 4)
+
+    @mock.patch("django_pony_express.retry.PONY_RETRY_POLICY", {"max_attempts": 5})
+    def test_get_default_retry_policy_uses_settings(self):
+        self.assertEqual(get_default_retry_policy().max_attempts, 5)
@@ -0,0 +1,339 @@
+import queue
+import smtplib
+import threading
+import time
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+
+from django_pony_express.errors import EmailServiceConfigError, EmailServiceQueueFullError
+from django_pony_express.retry import RetryPolicy
+from django_pony_express.services.asynchronous.pool import EmailWorkerPool
+from django_pony_express.services.base import BaseEmailService
+from django_pony_express.services.sender import EmailSender
+
+
+class EmailWorkerPoolTest(TestCase):
+    def _get_pool(self, **kwargs) -> EmailWorkerPool:
+        pool = EmailWorkerPool(**kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def _get_message(self, number: int = 0) -> EmailMultiAlternatives:
+        return EmailMultiAlternatives(subject="The Pony Express", to=[f"rider.{number}@example.com"])
+
+    def test_init_defaults_from_settings(self):
+        pool = EmailWorkerPool()
+        self.assertEqual(pool.workers, 4)
+        self.assertEqual(pool.queue_size, 1000)
+        self.assertEqual(pool.full_policy, EmailWorkerPool.FULL_POLICY_BLOCK)
+
+    def test_init_unknown_policy(self):
+        with self.assertRaises(EmailServiceConfigError):
+            EmailWorkerPool(full_policy="panic")
+
+    def test_init_unknown_keyword(self):
+        with self.assertRaises(TypeError):
+            EmailWorkerPool(submit=None)
+
+    def test_get_default_is_singleton(self):
+        self.assertIs(EmailWorkerPool.get_default(), EmailWorkerPool.get_default())
+
+    def test_workers_are_started_lazily(self):
+        pool = self._get_pool(workers=3)
+        self.assertEqual(len(pool._threads), 0)
+
+        pool.submit(self._get_message())
+        pool.join()
+
+        self.assertEqual(len(pool._threads), 3)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_submit_sends_messages(self):
+        pool = self._get_pool(workers=2)
+        for number in range(10):
+            self.assertTrue(pool.submit(self._get_message(number)))
+        pool.join()
+
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox), sorted(f"rider.{i}@example.com" for i in range(10))
+        )
+
+    def test_worker_reuses_its_connection(self):
+        pool = self._get_pool(workers=1)
+        with (
+            mock.patch.object(EmailBackend, "open") as mocked_open,
+            mock.patch.object(EmailBackend, "close") as mocked_close,
+        ):
+            for number in range(5):
+                pool.submit(self._get_message(number))
+            pool.join()
+
+            mocked_open.assert_called_once()
+            mocked_close.assert_not_called()
+
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_worker_closes_idle_connection(self):
+        pool = self._get_pool(workers=1, idle_timeout=0.01)
+        closed = threading.Event()
+        with mock.patch.object(EmailSender, "close", side_effect=closed.set):
+            pool.submit(self._get_message())
+            self.assertTrue(closed.wait(timeout=5))
+
+    def test_worker_survives_failing_open(self):
+        pool = self._get_pool(workers=1)
+        with mock.patch.object(EmailBackend, "open", side_effect=[smtplib.SMTPException("Down"), None, None]):
+            pool.submit(self._get_message(0))
+            pool.submit(self._get_message(1))
+            pool.join()
+
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_message_with_own_connection(self):
+        pool = self._get_pool(workers=1)
+        connection = mail.get_connection()
+        msg = self._get_message()
+        msg.connection = connection
+        with mock.patch.object(connection, "send_messages", return_value=1) as mocked_send_messages:
+            pool.submit(msg)
+            pool.join()
+
+        mocked_send_messages.assert_called_once_with([msg])
+
+    def test_submit_full_queue_drop(self):
+        pool = self._get_pool(workers=1, queue_size=1, full_policy=EmailWorkerPool.FULL_POLICY_DROP)
+        with mock.patch.object(pool._queue, "put", side_effect=queue.Full):
+            self.assertFalse(pool.submit(self._get_message()))
+
+    def test_submit_full_queue_raise(self):
+        pool = self._get_pool(workers=1, queue_size=1, full_policy=EmailWorkerPool.FULL_POLICY_RAISE)
+        with (
+            mock.patch.object(pool._queue, "put", side_effect=queue.Full),
+            self.assertRaises(EmailServiceQueueFullError),
+        ):
+            pool.submit(self._get_message())
+
+    def test_submit_full_queue_block(self):
+        pool = self._get_pool(workers=1, queue_size=1)
+        with mock.patch.object(pool._queue, "put") as mocked_put:
+            pool.submit(self._get_message())
+
+        mocked_put.assert_called_once_with(mock.ANY, block=True)
+
+    def test_shutdown_processes_queue_and_stops_workers(self):
+        pool = EmailWorkerPool(workers=2)
+        for number in range(4):
+            pool.submit(self._get_message(number))
+        thread_list = list(pool._threads)
+        pool.shutdown()
+
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertFalse(any(thread.is_alive() for thread in thread_list))
+
+    def test_submit_restarts_workers_after_fork(self):
+        pool = self._get_pool(workers=1)
+        pool.submit(self._get_message())
+        pool.join()
+
+        with mock.patch("django_pony_express.services.asynchronous.pool.os.getpid", return_value=-1):
+            pool.submit(self._get_message())
+            pool.join()
+
+        self.assertEqual(pool._pid, -1)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_burst_is_coalesced_into_batches(self):
+        pool = self._get_pool(workers=1, batch_size=3, flush_interval=1)
+        with mock.patch.object(
+            EmailSender, "send", side_effect=lambda msg_list, **kwargs: len(msg_list)
+        ) as mocked_send:
+            for number in range(5):
+                pool.submit(self._get_message(number))
+            pool.join()
+
+        self.assertEqual([len(call.args[0]) for call in mocked_send.call_args_list], [3, 2])
+
+    def test_batch_without_flush_interval(self):
+        pool = self._get_pool(workers=1, flush_interval=0)
+        with mock.patch.object(
+            EmailSender, "send", side_effect=lambda msg_list, **kwargs: len(msg_list)
+        ) as mocked_send:
+            pool.submit(self._get_message())
+            pool.join()
+
+        mocked_send.assert_called_once()
+
+    def test_batch_groups_messages_with_own_connection(self):
+        pool = self._get_pool(workers=1, flush_interval=1, batch_size=3)
+        connection = mail.get_connection()
+        msg_list = [self._get_message(number) for number in range(3)]
+        msg_list[1].connection = connection
+        with mock.patch.object(connection, "send_messages", return_value=1) as mocked_send_messages:
+            for msg in msg_list:
+                pool.submit(msg)
+            pool.join()
+
+        mocked_send_messages.assert_called_once_with([msg_list[1]])
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_batch_with_refused_recipient_sends_other_emails(self):
+        pool = self._get_pool(workers=1, flush_interval=1, batch_size=6)
+        original_send_messages = EmailBackend.send_messages
+
+        def send_messages(backend, messages):
+            if messages[0].to == ["rider.3@example.com"]:
+                raise smtplib.SMTPRecipientsRefused({"rider.3@example.com": (550, b"No such user")})
+            return original_send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", new=send_messages):
+            for number in range(6):
+                pool.submit(self._get_message(number))
+            pool.join()
+
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in (0, 1, 2, 4, 5)])
+
+    def test_batch_failing_partway_is_not_sent_twice(self):
+        pool = self._get_pool(workers=1, flush_interval=1, batch_size=6, retry_policy=RetryPolicy(backoff_base=0))
+        original_send_messages = EmailBackend.send_messages
+        failed = threading.Event()
+
+        def send_messages(backend, messages):
+            if messages[0].to == ["rider.3@example.com"] and not failed.is_set():
+                failed.set()
+                raise smtplib.SMTPServerDisconnected("Gone")
+            return original_send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", new=send_messages):
+            for number in range(6):
+                pool.submit(self._get_message(number))
+            pool.join()
+
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), [f"rider.{i}@example.com" for i in range(6)])
+
+    def test_shutdown_while_collecting_batch(self):
+        pool = EmailWorkerPool(workers=1, flush_interval=10)
+        pool.submit(self._get_message(0))
+        pool.submit(self._get_message(1))
+        started_at = time.monotonic()
+        pool.shutdown()
+
+        # The stop signal interrupts collecting the batch instead of waiting for the flush interval
+        self.assertLess(time.monotonic() - started_at, 5)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_shutdown_sends_retries_of_stopping_workers(self):
+        pool = EmailWorkerPool(workers=1, flush_interval=10, retry_policy=RetryPolicy(backoff_base=0.1, jitter=False))
+        original_send_messages = EmailBackend.send_messages
+        failed = threading.Event()
+
+        def send_messages(backend, messages):
+            if not failed.is_set():
+                failed.set()
+                raise smtplib.SMTPServerDisconnected("Gone")
+            return original_send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", new=send_messages):
+            pool.submit(self._get_message(0))
+            pool.submit(self._get_message(1))
+            pool.shutdown()
+
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), ["rider.0@example.com", "rider.1@example.com"])
+        self.assertEqual(pool._threads, [])
+
+    def test_failed_send_is_retried_without_blocking_worker(self):
+        pool = self._get_pool(workers=1, flush_interval=0, retry_policy=RetryPolicy(backoff_base=0.5, jitter=False))
+        first_call = threading.Event()
+        original_send_messages = EmailBackend.send_messages
+
+        def send_messages(backend, messages):
+            if not first_call.is_set():
+                first_call.set()
+                raise smtplib.SMTPServerDisconnected("Gone")
+            return original_send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", new=send_messages):
+            pool.submit(self._get_message(0))
+            first_call.wait(timeout=5)
+            pool.submit(self._get_message(1))
+            pool.join()
+
+        # The second email didn't have to wait for the backoff delay of the first one
+        self.assertEqual([email.to[0] for email in mail.outbox], ["rider.1@example.com", "rider.0@example.com"])
+        self.assertEqual(pool._pending_retries, 0)
+
+    def test_failed_send_gives_up_after_max_attempts(self):
+        pool = self._get_pool(workers=1, flush_interval=0, retry_policy=RetryPolicy(max_attempts=3, backoff_base=0))
+        with mock.patch.object(
+            EmailBackend, "send_messages", side_effect=smtplib.SMTPServerDisconnected("Gone")
+        ) as mocked_send_messages:
+            pool.submit(self._get_message())
+            pool.join()
+
+        self.assertEqual(mocked_send_messages.call_count, 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_batch_groups_messages_by_attempt(self):
+        pool = self._get_pool()
+        sender = EmailSender()
+        msg_list = [self._get_message(number) for number in range(3)]
+        with mock.patch.object(sender, "send") as mocked_send:
+            pool._send_batch([(msg_list[0], 1), (msg_list[1], 2), (msg_list[2], 1)], sender)
+
+        self.assertEqual(
+            [(call.args[0], call.kwargs["attempt"]) for call in mocked_send.call_args_list],
+            [([msg_list[0], msg_list[2]], 1), ([msg_list[1]], 2)],
+        )
+
+    def _get_service(self, number: int = 0) -> BaseEmailService:
+        service = BaseEmailService(recipient_email_list=[f"rider.{number}@example.com"])
+        service.subject = "The Pony Express"
+        service.template_name = "testapp/test_email.html"
+        return service
+
+    def test_submit_service_builds_email_in_worker(self):
+        pool = self._get_pool(workers=1)
+        service = self._get_service()
+        thread_list = []
+        original_build_mail_object = BaseEmailService._build_mail_object
+
+        def build_mail_object(service_self, *args, **kwargs):
+            thread_list.append(threading.current_thread())
+            return original_build_mail_object(service_self, *args, **kwargs)
+
+        with mock.patch.object(BaseEmailService, "_build_mail_object", autospec=True, side_effect=build_mail_object):
+            self.assertTrue(pool.submit_service(service))
+            pool.join()
+
+        self.assertEqual([thread.name for thread in thread_list], ["pony-express-worker-0"])
+        self.assertEqual(mail.outbox[0].to, ["rider.0@example.com"])
+        self.assertEqual(mail.outbox[0].subject, "The Pony Express")
+
+    def test_submit_service_failing_build_is_logged(self):
+        pool = self._get_pool(workers=1, flush_interval=0.05)
+        with (
+            mock.patch.object(
+                BaseEmailService, "_build_mail_object", autospec=True, side_effect=[ValueError("Broken"), mock.DEFAULT]
+            ) as mocked_build,
+            mock.patch.object(pool._logger, "exception") as mocked_exception,
+        ):
+            mocked_build.return_value = self._get_message(1)
+            pool.submit_service(self._get_service(0))
+            pool.submit_service(self._get_service(1))
+            pool.join()
+
+        mocked_exception.assert_called_once_with('An error occurred building email "BaseEmailService".')
+        self.assertEqual([email.to for email in mail.outbox], [["rider.1@example.com"]])
+
+    def test_submit_service_full_queue_drop(self):
+        pool = self._get_pool(workers=1, queue_size=1, full_policy=EmailWorkerPool.FULL_POLICY_DROP)
+        with (
+            mock.patch.object(pool._queue, "put", side_effect=queue.Full),
+            mock.patch.object(pool._logger, "warning") as mocked_warning,
+        ):
+            self.assertFalse(pool.submit_service(self._get_service()))
+
+        mocked_warning.assert_called_once_with('Email queue is full. Email "The Pony Express" was dropped.')
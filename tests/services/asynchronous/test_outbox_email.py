@@ -0,0 +1,29 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+
+from django_pony_express.outbox.models import OutboxEmail
+from django_pony_express.services.asynchronous.outbox import OutboxEmailService
+
+
+class OutboxEmailServiceTest(TestCase):
+    def test_process_regular(self):
+        email = "albertus.magnus@example.com"
+        service = OutboxEmailService(recipient_email_list=[email])
+        service.subject = "Test email"
+        service.template_name = "testapp/test_email.html"
+
+        self.assertTrue(service.process())
+
+        self.assertEqual(len(mail.outbox), 0)
+        outbox_email = OutboxEmail.objects.get()
+        self.assertEqual(outbox_email.subject, "Test email")
+        self.assertEqual(outbox_email.get_message().to, [email])
+
+    @mock.patch.object(OutboxEmailService, "is_valid", return_value=False)
+    def test_process_invalid(self, *args):
+        service = OutboxEmailService(recipient_email_list=["albertus.magnus@example.com"])
+
+        self.assertFalse(service.process())
+        self.assertFalse(OutboxEmail.objects.exists())
@@ -1,14 +1,16 @@
-from threading import Thread
 from unittest import mock
 
+from django.core import mail
 from django.test import TestCase
+from django.utils import translation
 
+from django_pony_express.services.asynchronous.pool import EmailWorkerPool
 from django_pony_express.services.asynchronous.thread import ThreadEmailService
 
 
 class ThreadEmailServiceTest(TestCase):
-    @mock.patch.object(Thread, "start")
-    def test_process_regular(self, mocked_start):
+    @mock.patch.object(EmailWorkerPool, "submit")
+    def test_process_regular(self, mocked_submit):
         email = "albertus.magnus@example.com"
         subject = "Test email"
         service = ThreadEmailService(recipient_email_list=[email])
@@ -16,11 +18,12 @@ class ThreadEmailServiceTest(TestCase):
         service.template_name = "testapp/test_email.html"
 
         self.assertIsNone(service.process())
-        mocked_start.assert_called_once()
+        mocked_submit.assert_called_once()
+        self.assertEqual(mocked_submit.call_args.args[0].to, [email])
 
-    @mock.patch.object(Thread, "start")
+    @mock.patch.object(EmailWorkerPool, "submit")
     @mock.patch.object(ThreadEmailService, "is_valid", return_value=False)
-    def test_process_invalid(self, mocked_service, mocked_start):
+    def test_process_invalid(self, mocked_service, mocked_submit):
         email = "albertus.magnus@example.com"
         subject = "Test email"
         service = ThreadEmailService(recipient_email_list=[email])
@@ -28,4 +31,87 @@ class ThreadEmailServiceTest(TestCase):
         service.template_name = "testapp/test_email.html"
 
         self.assertIsNone(service.process())
-        mocked_start.assert_not_called()
+        mocked_submit.assert_not_called()
+
+    def test_get_worker_pool_default(self):
+        self.assertIs(ThreadEmailService().get_worker_pool(), EmailWorkerPool.get_default())
+
+    def test_process_sends_via_worker_pool(self):
+        pool = EmailWorkerPool(workers=1)
+        self.addCleanup(pool.shutdown)
+        service = ThreadEmailService(recipient_email_list=["albertus.magnus@example.com"])
+        service.subject = "Test email"
+        service.template_name = "testapp/test_email.html"
+
+        with mock.patch.object(ThreadEmailService, "get_worker_pool", return_value=pool):
+            service.process()
+        pool.join()
+
+        self.assertEqual(pool._queue.qsize(), 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["albertus.magnus@example.com"])
+        self.assertEqual(mail.outbox[0].subject, "Test email")
+
+    def _get_background_service(self) -> ThreadEmailService:
+        service = ThreadEmailService(recipient_email_list=["albertus.magnus@example.com"])
+        service.subject = "Test email"
+        service.template_name = "testapp/test_email.html"
+        service.build_in_background = True
+        return service
+
+    @mock.patch.object(EmailWorkerPool, "submit_service")
+    def test_process_build_in_background_submits_service(self, mocked_submit_service):
+        service = self._get_background_service()
+
+        with mock.patch.object(ThreadEmailService, "_build_mail_object") as mocked_build:
+            self.assertIsNone(service.process())
+
+        mocked_build.assert_not_called()
+        mocked_submit_service.assert_called_once_with(service)
+
+    @mock.patch.object(EmailWorkerPool, "submit_service")
+    @mock.patch.object(ThreadEmailService, "is_valid", return_value=False)
+    def test_process_build_in_background_invalid(self, mocked_is_valid, mocked_submit_service):
+        self._get_background_service().process()
+
+        mocked_submit_service.assert_not_called()
+
+    @mock.patch.object(EmailWorkerPool, "submit_service")
+    def test_process_build_in_background_keeps_caller_translation(self, mocked_submit_service):
+        service = self._get_background_service()
+
+        with translation.override("de"):
+            service.process()
+            self.assertEqual(translation.get_language(), "de")
+
+    @mock.patch.object(EmailWorkerPool, "submit_service")
+    @mock.patch.object(ThreadEmailService, "get_translation", return_value=None)
+    def test_process_build_in_background_uses_caller_language(self, mocked_get_translation, mocked_submit_service):
+        service = self._get_background_service()
+
+        with translation.override("de"):
+            service.process()
+
+        self.assertEqual(service.language, "de")
+
+    @mock.patch.object(EmailWorkerPool, "submit_service")
+    def test_process_build_in_background_keeps_service_language(self, mocked_submit_service):
+        service = self._get_background_service()
+        service.language = "fr"
+
+        with translation.override("de"):
+            service.process()
+
+        self.assertEqual(service.language, "fr")
+
+    def test_process_build_in_background_sends_via_worker_pool(self):
+        pool = EmailWorkerPool(workers=1)
+        self.addCleanup(pool.shutdown)
+        service = self._get_background_service()
+
+        with mock.patch.object(ThreadEmailService, "get_worker_pool", return_value=pool):
+            service.process()
+        pool.join()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["albertus.magnus@example.com"])
@@ -1,9 +1,29 @@
+import datetime
+import smtplib
+import socket
 from unittest import mock
 
+import time_machine
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.template.base import Template
 from django.test import TestCase
+from django.utils import translation
 
+from django_pony_express.backends import SyncEmailBackendAdapter
+from django_pony_express.broadcast import BroadcastEmailMessage
 from django_pony_express.errors import EmailServiceConfigError
-from django_pony_express.services.base import BaseEmailService, BaseEmailServiceFactory
+from django_pony_express.outbox.models import OutboxEmail
+from django_pony_express.retry import RetryPolicy
+from django_pony_express.services.asynchronous.outbox import OutboxEmailService
+from django_pony_express.services.asynchronous.thread import ThreadEmailService
+from django_pony_express.services.base import BaseEmailService, BaseEmailServiceFactory, _render_chunk_in_process
+from django_pony_express.services.sender import EmailSender
+from django_pony_express.validators import EmailAddressValidator
 
 
 class BaseEmailServiceFactoryTest(TestCase):
@@ -11,10 +31,28 @@ class BaseEmailServiceFactoryTest(TestCase):
         subject = "My subject"
         template_name = "testapp/test_email.html"
 
+    class FailingMailService(TestMailService):
+        def get_subject(self) -> str | None:
+            # Leads to a validation error for this recipient
+            return None if self.recipient_email_list == ["broken.pony@example.com"] else super().get_subject()
+
+    class ContextMailService(TestMailService):
+        def get_context_data(self) -> dict:
+            data = super().get_context_data()
+            data["greeting"] = "Hello"
+            return data
+
+    class UserMailFactory(BaseEmailServiceFactory):
+        def get_email_from_recipient(self, recipient) -> str:
+            return recipient.email
+
     @classmethod
     def setUpTestData(cls):
         super().setUpTestData()
 
+    def _create_users(self, number: int) -> None:
+        User.objects.bulk_create([User(username=f"rider.{i}", email=f"rider.{i}@example.com") for i in range(number)])
+
     def test_init_recipient_list_is_set(self):
         email = "albertus.magnus@example.com"
         factory = BaseEmailServiceFactory([email])
@@ -88,3 +126,1008 @@ class BaseEmailServiceFactoryTest(TestCase):
         factory = BaseEmailServiceFactory()
         factory.service_class = self.TestMailService
         self.assertEqual(factory.process(), 0)
+
+    def test_get_connection_regular(self):
+        factory = BaseEmailServiceFactory()
+        self.assertIsNotNone(factory.get_connection())
+
+    def test_process_reuses_one_connection(self):
+        connection = mail.get_connection()
+        factory = BaseEmailServiceFactory(
+            recipient_email_list=["albertus.magnus@example.com", "thomas.von.aquin@example.com"]
+        )
+        factory.service_class = self.TestMailService
+
+        with (
+            mock.patch.object(BaseEmailServiceFactory, "get_connection", return_value=connection) as mocked_get,
+            mock.patch.object(connection, "send_messages", wraps=connection.send_messages) as mocked_send_messages,
+        ):
+            self.assertEqual(factory.process(), 2)
+
+        mocked_get.assert_called_once()
+        self.assertEqual(mocked_send_messages.call_count, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_process_refused_recipient_only_drops_its_email(self):
+        original_send_messages = EmailBackend.send_messages
+
+        def send_messages(backend, messages):
+            if messages[0].to == ["rider.3@example.com"]:
+                raise smtplib.SMTPRecipientsRefused({"rider.3@example.com": (550, b"No such user")})
+            return original_send_messages(backend, messages)
+
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(6)])
+        factory.service_class = self.TestMailService
+
+        with mock.patch.object(EmailBackend, "send_messages", new=send_messages):
+            self.assertEqual(factory.process(), 5)
+
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in (0, 1, 2, 4, 5)])
+
+    def test_process_refused_connection_is_logged(self):
+        # Bind and release a port, so nobody is listening on it
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        class RefusedConnectionFactory(BaseEmailServiceFactory):
+            def get_connection(self):
+                return get_connection("django.core.mail.backends.smtp.EmailBackend", host="127.0.0.1", port=port)
+
+        factory = RefusedConnectionFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = self.TestMailService
+
+        with (
+            mock.patch("django_pony_express.services.sender.time.sleep"),
+            self.assertLogs("django_pony_express", level="WARNING") as logs,
+        ):
+            self.assertEqual(factory.process(), 0)
+
+        self.assertIn("Opening the email connection failed.", logs.output[0])
+        self.assertEqual(
+            [record.getMessage() for record in logs.records if record.levelname == "ERROR"],
+            ['An error occurred sending email "My subject".'] * 2,
+        )
+
+    def test_process_uses_retry_policy_of_service(self):
+        class NoRetryMailService(self.TestMailService):
+            retry_policy = RetryPolicy(max_attempts=1)
+
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com"])
+        factory.service_class = NoRetryMailService
+
+        with mock.patch.object(
+            EmailBackend, "send_messages", side_effect=smtplib.SMTPServerDisconnected("Gone")
+        ) as mocked_send_messages:
+            self.assertEqual(factory.process(), 0)
+
+        mocked_send_messages.assert_called_once()
+
+    async def test_aprocess_uses_retry_policy_of_service(self):
+        class NoRetryMailService(self.TestMailService):
+            retry_policy = RetryPolicy(max_attempts=1)
+
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com"])
+        factory.service_class = NoRetryMailService
+
+        with mock.patch.object(
+            EmailBackend, "send_messages", side_effect=smtplib.SMTPServerDisconnected("Gone")
+        ) as mocked_send_messages:
+            self.assertEqual(await factory.aprocess(), 0)
+
+        mocked_send_messages.assert_called_once()
+
+    def test_process_sends_in_batches(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(5)])
+        factory.service_class = self.TestMailService
+        factory.batch_size = 2
+
+        with mock.patch.object(EmailSender, "send", side_effect=len) as mocked_send:
+            self.assertEqual(factory.process(), 5)
+
+        self.assertEqual([len(call.args[0]) for call in mocked_send.call_args_list], [2, 2, 1])
+
+    def test_process_service_with_custom_send_is_processed_by_service(self):
+        class LoggingMailService(self.TestMailService):
+            def _send_and_log_email(self, msg: EmailMultiAlternatives) -> bool:
+                return super()._send_and_log_email(msg)
+
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = LoggingMailService
+
+        with (
+            mock.patch.object(
+                LoggingMailService, "_send_and_log_email", autospec=True, return_value=True
+            ) as mocked_send_and_log,
+            mock.patch.object(EmailSender, "send") as mocked_send,
+        ):
+            self.assertEqual(factory.process(), 2)
+
+        self.assertEqual(
+            [call.args[0].recipient_email_list for call in mocked_send_and_log.call_args_list],
+            [["rider.0@example.com"], ["rider.1@example.com"]],
+        )
+        mocked_send.assert_not_called()
+
+    def test_process_outbox_service_stores_emails(self):
+        class OutboxMailService(OutboxEmailService):
+            subject = "My subject"
+            template_name = "testapp/test_email.html"
+
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = OutboxMailService
+
+        self.assertEqual(factory.process(), 2)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_process_thread_service_is_handed_to_worker_pool(self):
+        class ThreadMailService(ThreadEmailService):
+            subject = "My subject"
+            template_name = "testapp/test_email.html"
+
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = ThreadMailService
+        pool = mock.Mock()
+
+        with mock.patch.object(ThreadMailService, "get_worker_pool", return_value=pool):
+            self.assertEqual(factory.process(), 2)
+
+        self.assertEqual(
+            [call.args[0].to for call in pool.submit.call_args_list], [["rider.0@example.com"], ["rider.1@example.com"]]
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    async def test_aprocess_service_with_custom_send_is_processed_by_service(self):
+        class OutboxMailService(OutboxEmailService):
+            subject = "My subject"
+            template_name = "testapp/test_email.html"
+
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = OutboxMailService
+
+        self.assertEqual(await factory.aprocess(), 2)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(await OutboxEmail.objects.acount(), 2)
+
+    def test_process_service_with_custom_send_in_processes_raises(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com"])
+        factory.service_class = OutboxEmailService
+
+        with self.assertRaises(EmailServiceConfigError):
+            factory.process(processes=2)
+
+    def test_is_valid_broadcast_with_custom_send_service(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com"])
+        factory.service_class = OutboxEmailService
+        factory.broadcast = True
+
+        self.assertFalse(factory.is_valid(raise_exception=False))
+        self.assertEqual(
+            factory.errors, ["Broadcast and BCC mode require an email service which is sent by the factory."]
+        )
+
+    def test_process_invalid_service_raises(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["broken.pony@example.com"])
+        factory.service_class = self.FailingMailService
+        with self.assertRaises(EmailServiceConfigError):
+            factory.process()
+
+    def test_process_invalid_service_aborts_its_batch(self):
+        factory = BaseEmailServiceFactory(
+            recipient_email_list=["rider.0@example.com", "broken.pony@example.com", "rider.1@example.com"]
+        )
+        factory.service_class = self.FailingMailService
+
+        with self.assertRaises(EmailServiceConfigError):
+            factory.process()
+
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_process_invalid_recipient_is_skipped(self):
+        factory = BaseEmailServiceFactory(
+            recipient_email_list=["rider.0@example.com", "no-at-example.com", "rider.1@example.com"]
+        )
+        factory.service_class = self.TestMailService
+        with self.assertLogs("django_pony_express", level="WARNING") as logs:
+            self.assertEqual(factory.process(), 2)
+
+        self.assertEqual(factory.invalid_recipient_count, 1)
+        self.assertEqual([email.to for email in mail.outbox], [["rider.0@example.com"], ["rider.1@example.com"]])
+        self.assertEqual(
+            logs.output, ["WARNING:django_pony_express:Skipped recipient with ill-formatted email address."]
+        )
+
+    @mock.patch("django_pony_express.services.base.PONY_LOG_RECIPIENTS", True)
+    def test_process_invalid_recipient_is_logged_privacy_inactive(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["no-at-example.com"])
+        factory.service_class = self.TestMailService
+        with self.assertLogs("django_pony_express", level="WARNING") as logs:
+            self.assertEqual(factory.process(), 0)
+
+        self.assertIn('"no-at-example.com"', logs.output[0])
+
+    def test_process_normalizes_recipients(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[" Rider.0@EXAMPLE.com "])
+        factory.service_class = self.TestMailService
+        self.assertEqual(factory.process(), 1)
+
+        self.assertEqual(mail.outbox[0].to, ["Rider.0@example.com"])
+
+    def test_process_validates_every_address_once(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(3)])
+        factory.service_class = self.TestMailService
+        with mock.patch.object(
+            EmailAddressValidator, "_clean", autospec=True, side_effect=EmailAddressValidator._clean
+        ) as mocked_clean:
+            factory.process()
+
+        # The services re-use the results of the factory's pre-validation
+        self.assertEqual(mocked_clean.call_count, 3)
+
+    def test_process_resets_invalid_recipient_count(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["no-at-example.com"])
+        factory.service_class = self.TestMailService
+        factory.process()
+        factory.process()
+
+        self.assertEqual(factory.invalid_recipient_count, 1)
+
+    def test_process_duplicates_are_sent_by_default(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.0@example.com"])
+        factory.service_class = self.TestMailService
+
+        self.assertEqual(factory.process(), 2)
+        self.assertEqual(factory.duplicate_recipient_count, 0)
+
+    def test_process_deduplicate_recipients(self):
+        factory = BaseEmailServiceFactory(
+            recipient_email_list=[
+                "rider.0@example.com",
+                " rider.0@EXAMPLE.com",
+                "rider.1@example.com",
+                "Rider.0@example.com",
+            ]
+        )
+        factory.service_class = self.TestMailService
+        factory.deduplicate_recipients = True
+
+        with mock.patch.object(
+            self.TestMailService,
+            "_build_mail_object",
+            autospec=True,
+            side_effect=self.TestMailService._build_mail_object,
+        ) as mocked_build:
+            self.assertEqual(factory.process(), 3)
+
+        self.assertEqual(mocked_build.call_count, 3)
+        self.assertEqual(factory.duplicate_recipient_count, 1)
+        self.assertEqual(
+            [email.to[0] for email in mail.outbox],
+            ["rider.0@example.com", "rider.1@example.com", "Rider.0@example.com"],
+        )
+
+    def test_process_deduplicate_recipients_custom_key(self):
+        class CaseInsensitiveFactory(BaseEmailServiceFactory):
+            deduplicate_recipients = True
+
+            def get_deduplication_key(self, email: str) -> str:
+                return email.lower()
+
+        factory = CaseInsensitiveFactory(recipient_email_list=["rider.0@example.com", "Rider.0@example.com"])
+        factory.service_class = self.TestMailService
+
+        self.assertEqual(factory.process(), 1)
+        self.assertEqual(factory.duplicate_recipient_count, 1)
+
+    def test_process_deduplicate_recipients_is_reset_per_run(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.0@example.com"])
+        factory.service_class = self.TestMailService
+        factory.deduplicate_recipients = True
+
+        self.assertEqual(factory.process(), 1)
+        self.assertEqual(factory.process(), 1)
+        self.assertEqual(factory.duplicate_recipient_count, 1)
+
+    def test_process_deduplicate_streaming_queryset(self):
+        self._create_users(3)
+        User.objects.create(username="rider.0.again", email="rider.0@example.com")
+        factory = self.UserMailFactory(recipient_email_list=User.objects.order_by("id"))
+        factory.service_class = self.TestMailService
+        factory.streaming = True
+        factory.chunk_size = 2
+        factory.deduplicate_recipients = True
+
+        self.assertEqual(factory.process(), 3)
+        self.assertEqual(factory.duplicate_recipient_count, 1)
+
+    def test_process_parallel_deduplicate_recipients(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i % 5}@example.com" for i in range(20)])
+        factory.service_class = self.TestMailService
+        factory.deduplicate_recipients = True
+        factory.batch_size = 2
+
+        self.assertEqual(factory.process(workers=3), 5)
+        self.assertEqual(factory.duplicate_recipient_count, 15)
+
+    async def test_aprocess_deduplicate_recipients(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.0@example.com"])
+        factory.service_class = self.TestMailService
+        factory.deduplicate_recipients = True
+
+        self.assertEqual(await factory.aprocess(), 1)
+        self.assertEqual(factory.duplicate_recipient_count, 1)
+
+    async def test_aprocess_invalid_recipient_is_skipped(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "no-at-example.com"])
+        factory.service_class = self.TestMailService
+
+        self.assertEqual(await factory.aprocess(), 1)
+        self.assertEqual(factory.invalid_recipient_count, 1)
+
+    def test_process_does_not_copy_shared_context_data(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = self.TestMailService
+
+        with (
+            mock.patch.object(BaseEmailServiceFactory, "get_context_data", return_value={"my_var": "Pony"}),
+            mock.patch.object(Template, "render", autospec=True, return_value="<p>Pony</p>") as mocked_render,
+        ):
+            self.assertEqual(factory.process(), 2)
+
+        shared_context_data = factory._get_shared_context_data()
+        for call in mocked_render.call_args_list:
+            self.assertTrue(any(layer is shared_context_data for layer in call.args[1].dicts))
+
+    def test_process_reads_attachment_once(self):
+        class AttachmentMailService(self.TestMailService):
+            def get_attachments(self) -> list:
+                return [settings.BASE_PATH / "tests/files/testfile.txt"]
+
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(3)])
+        factory.service_class = AttachmentMailService
+
+        with mock.patch.object(
+            EmailMultiAlternatives, "attach_file", autospec=True, side_effect=EmailMultiAlternatives.attach_file
+        ) as mocked_attach_file:
+            self.assertEqual(factory.process(), 3)
+
+        mocked_attach_file.assert_called_once()
+        self.assertEqual(len({id(email.attachments[0][1]) for email in mail.outbox}), 1)
+
+    def test_process_attachment_cache_is_reset_per_run(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com"])
+        factory.service_class = self.TestMailService
+
+        factory.process()
+        attachment_cache = factory._attachment_cache
+        factory.process()
+
+        self.assertIsNotNone(factory._attachment_cache)
+        self.assertIsNot(factory._attachment_cache, attachment_cache)
+
+    def test_process_parallel_creates_attachment_cache_once(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(6)])
+        factory.service_class = self.TestMailService
+        factory.batch_size = 1
+
+        with mock.patch.object(
+            BaseEmailServiceFactory,
+            "get_attachment_cache",
+            autospec=True,
+            side_effect=BaseEmailServiceFactory.get_attachment_cache,
+        ) as mocked_get_attachment_cache:
+            self.assertEqual(factory.process(workers=3), 6)
+
+        mocked_get_attachment_cache.assert_called_once()
+
+    def test_process_attachment_cache_disabled(self):
+        class AttachmentMailService(self.TestMailService):
+            def get_attachments(self) -> list:
+                return [settings.BASE_PATH / "tests/files/testfile.txt"]
+
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(3)])
+        factory.service_class = AttachmentMailService
+        factory.attachment_cache_size = 0
+
+        with mock.patch.object(
+            EmailMultiAlternatives, "attach_file", autospec=True, side_effect=EmailMultiAlternatives.attach_file
+        ) as mocked_attach_file:
+            self.assertEqual(factory.process(), 3)
+
+        self.assertEqual(mocked_attach_file.call_count, 3)
+
+    def test_process_broadcast_renders_once(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(5)])
+        factory.service_class = self.TestMailService
+        factory.broadcast = True
+
+        with mock.patch.object(
+            self.TestMailService,
+            "_build_mail_object",
+            autospec=True,
+            side_effect=self.TestMailService._build_mail_object,
+        ) as mocked_build:
+            self.assertEqual(factory.process(), 5)
+
+        mocked_build.assert_called_once()
+        self.assertIsInstance(mail.outbox[0], BroadcastEmailMessage)
+        self.assertEqual([email.to for email in mail.outbox], [[f"rider.{i}@example.com"] for i in range(5)])
+        self.assertEqual(len({email.body for email in mail.outbox}), 1)
+
+    def test_process_recipient_context_data_called_per_chunk(self):
+        recipient_list = [f"rider.{i}@example.com" for i in range(5)]
+        factory = BaseEmailServiceFactory(recipient_email_list=recipient_list)
+        factory.service_class = self.TestMailService
+        factory.batch_size = 2
+
+        with mock.patch.object(factory, "get_recipient_context_data", return_value={}) as mocked_get:
+            self.assertEqual(factory.process(), 5)
+
+        self.assertEqual(
+            [call.args[0] for call in mocked_get.call_args_list],
+            [recipient_list[:2], recipient_list[2:4], recipient_list[4:]],
+        )
+
+    def test_process_recipient_context_data_merged(self):
+        class ContextFactory(BaseEmailServiceFactory):
+            def get_context_data(self) -> dict:
+                return {"my_var": "shared", "link_url": "https://example.com"}
+
+            def get_recipient_context_data(self, recipient_list: list) -> dict:
+                return {"rider.0@example.com": {"my_var": "Giddy up", "recipient": "overwritten"}}
+
+        factory = ContextFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = self.TestMailService
+
+        with mock.patch.object(
+            self.TestMailService, "_generate_html_content", return_value="<p>Pony</p>"
+        ) as mocked_generate:
+            factory.process()
+
+        context_list = [call.args[0] for call in mocked_generate.call_args_list]
+        self.assertEqual(context_list[0]["my_var"], "Giddy up")
+        self.assertEqual(context_list[0]["recipient"], "rider.0@example.com")
+        self.assertEqual(context_list[0]["link_url"], "https://example.com")
+        self.assertEqual(context_list[1]["my_var"], "shared")
+
+    def test_process_recipient_context_data_single_query_per_chunk(self):
+        class UserContextFactory(self.UserMailFactory):
+            def get_recipient_context_data(self, recipient_list: list) -> dict:
+                user_dict = User.objects.in_bulk([recipient.id for recipient in recipient_list])
+                return {recipient: {"username": user_dict[recipient.id].username} for recipient in recipient_list}
+
+        self._create_users(4)
+        factory = UserContextFactory(recipient_email_list=list(User.objects.order_by("id")))
+        factory.service_class = self.TestMailService
+        factory.batch_size = 2
+
+        with (
+            mock.patch.object(
+                self.TestMailService, "_generate_html_content", return_value="<p>Pony</p>"
+            ) as mocked_generate,
+            self.assertNumQueries(2),
+        ):
+            self.assertEqual(factory.process(), 4)
+
+        self.assertEqual(
+            [call.args[0]["username"] for call in mocked_generate.call_args_list], [f"rider.{i}" for i in range(4)]
+        )
+
+    def test_process_recipient_context_data_grouped_by_language(self):
+        class LanguageFactory(BaseEmailServiceFactory):
+            group_by_language = True
+
+            def get_language_from_recipient(self, recipient) -> str:
+                return "de" if recipient.endswith(".de") else "en"
+
+            def get_recipient_context_data(self, recipient_list: list) -> dict:
+                return {recipient: {"my_var": recipient.upper()} for recipient in recipient_list}
+
+        factory = LanguageFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.de"])
+        factory.service_class = self.TestMailService
+
+        with mock.patch.object(
+            self.TestMailService, "_generate_html_content", return_value="<p>Pony</p>"
+        ) as mocked_generate:
+            self.assertEqual(factory.process(), 2)
+
+        self.assertEqual(
+            sorted(call.args[0]["my_var"] for call in mocked_generate.call_args_list),
+            ["RIDER.0@EXAMPLE.COM", "RIDER.1@EXAMPLE.DE"],
+        )
+
+    def test_process_broadcast_skips_recipient_context_data(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = self.TestMailService
+        factory.broadcast = True
+
+        with mock.patch.object(factory, "get_recipient_context_data") as mocked_get:
+            factory.process()
+
+        mocked_get.assert_not_called()
+
+    def test_process_broadcast_context_without_recipient(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = self.TestMailService
+        factory.broadcast = True
+
+        with mock.patch.object(
+            self.TestMailService, "_generate_html_content", return_value="<p>Pony</p>"
+        ) as mocked_generate:
+            factory.process()
+
+        self.assertNotIn("recipient", mocked_generate.call_args.args[0])
+
+    def test_process_broadcast_service_extends_context_data(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = self.ContextMailService
+        factory.broadcast = True
+
+        with mock.patch.object(
+            self.ContextMailService, "_generate_html_content", return_value="<p>Pony</p>"
+        ) as mocked_generate:
+            self.assertEqual(factory.process(), 2)
+
+        self.assertEqual(mocked_generate.call_args.args[0]["greeting"], "Hello")
+        self.assertNotIn("greeting", factory._get_shared_context_data())
+
+    def test_process_broadcast_per_language(self):
+        class LanguageFactory(BaseEmailServiceFactory):
+            broadcast = True
+
+            def get_language_from_recipient(self, recipient) -> str:
+                return "de" if recipient.endswith(".de") else "en"
+
+        factory = LanguageFactory(
+            recipient_email_list=["rider.0@example.com", "rider.1@example.de", "rider.2@example.com"]
+        )
+        factory.service_class = self.TestMailService
+
+        self.assertEqual(factory.process(), 3)
+
+        self.assertEqual(set(factory._broadcast_body_dict), {"de", "en"})
+        self.assertIs(mail.outbox[0].broadcast_body, mail.outbox[2].broadcast_body)
+
+    def test_process_broadcast_is_reset_per_run(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com"])
+        factory.service_class = self.TestMailService
+        factory.broadcast = True
+
+        factory.process()
+        broadcast_body = factory._broadcast_body_dict[None]
+        factory.process()
+
+        self.assertIsNot(factory._broadcast_body_dict[None], broadcast_body)
+
+    def test_process_broadcast_invalid_service_raises(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["broken.pony@example.com", "rider.0@example.com"])
+        factory.service_class = self.FailingMailService
+        factory.broadcast = True
+
+        with self.assertRaises(EmailServiceConfigError):
+            factory.process()
+
+    def test_process_parallel_broadcast(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(10)])
+        factory.service_class = self.TestMailService
+        factory.broadcast = True
+        factory.batch_size = 2
+
+        self.assertEqual(factory.process(workers=3), 10)
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox), sorted(f"rider.{i}@example.com" for i in range(10))
+        )
+
+    async def test_aprocess_broadcast(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = self.TestMailService
+        factory.broadcast = True
+
+        self.assertEqual(await factory.aprocess(), 2)
+        self.assertEqual(len(factory._broadcast_body_dict), 1)
+
+    def test_process_bcc_batches(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(7)])
+        factory.service_class = self.TestMailService
+        factory.bcc_batch_size = 3
+
+        with mock.patch.object(
+            self.TestMailService,
+            "_build_mail_object",
+            autospec=True,
+            side_effect=self.TestMailService._build_mail_object,
+        ) as mocked_build:
+            self.assertEqual(factory.process(), 3)
+
+        mocked_build.assert_called_once()
+        self.assertEqual(
+            [email.bcc for email in mail.outbox],
+            [
+                ["rider.0@example.com", "rider.1@example.com", "rider.2@example.com"],
+                ["rider.3@example.com", "rider.4@example.com", "rider.5@example.com"],
+                ["rider.6@example.com"],
+            ],
+        )
+        self.assertEqual({tuple(email.to) for email in mail.outbox}, {(settings.DEFAULT_FROM_EMAIL,)})
+        self.assertNotIn(b"rider.0@example.com", mail.outbox[0].message().as_bytes())
+
+    def test_process_bcc_service_extends_context_data(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(3)])
+        factory.service_class = self.ContextMailService
+        factory.bcc_batch_size = 2
+
+        with mock.patch.object(
+            self.ContextMailService, "_generate_html_content", return_value="<p>Pony</p>"
+        ) as mocked_generate:
+            self.assertEqual(factory.process(), 2)
+
+        self.assertEqual(mocked_generate.call_args.args[0]["greeting"], "Hello")
+        self.assertEqual(
+            [email.bcc for email in mail.outbox],
+            [["rider.0@example.com", "rider.1@example.com"], ["rider.2@example.com"]],
+        )
+
+    def test_process_bcc_to_email(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["rider.0@example.com", "rider.1@example.com"])
+        factory.service_class = self.TestMailService
+        factory.bcc_batch_size = 10
+        factory.bcc_to_email = "announcements@example.com"
+
+        self.assertEqual(factory.process(), 1)
+        self.assertEqual(mail.outbox[0].to, ["announcements@example.com"])
+        self.assertEqual(
+            mail.outbox[0].recipients(), ["announcements@example.com", "rider.0@example.com", "rider.1@example.com"]
+        )
+
+    def test_process_bcc_sends_batch_size_emails_per_call(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(10)])
+        factory.service_class = self.TestMailService
+        factory.bcc_batch_size = 2
+        factory.batch_size = 3
+
+        with mock.patch.object(
+            EmailSender, "send", autospec=True, side_effect=lambda sender, msg_list, **kwargs: len(msg_list)
+        ) as mocked_send:
+            self.assertEqual(factory.process(), 5)
+
+        self.assertEqual([len(call.args[1]) for call in mocked_send.call_args_list], [3, 2])
+
+    def test_process_bcc_per_language(self):
+        class LanguageFactory(BaseEmailServiceFactory):
+            bcc_batch_size = 10
+
+            def get_language_from_recipient(self, recipient) -> str:
+                return "de" if recipient.endswith(".de") else "en"
+
+        factory = LanguageFactory(
+            recipient_email_list=["rider.0@example.com", "rider.1@example.de", "rider.2@example.com"]
+        )
+        factory.service_class = self.TestMailService
+
+        self.assertEqual(factory.process(), 2)
+        self.assertEqual(
+            [email.bcc for email in mail.outbox],
+            [["rider.0@example.com", "rider.2@example.com"], ["rider.1@example.de"]],
+        )
+
+    async def test_aprocess_bcc_batches(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(5)])
+        factory.service_class = self.TestMailService
+        factory.bcc_batch_size = 2
+
+        self.assertEqual(await factory.aprocess(), 3)
+        self.assertEqual(sum(len(email.bcc) for email in mail.outbox), 5)
+
+    def test_process_parallel_regular(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(10)])
+        factory.service_class = self.TestMailService
+        factory.batch_size = 2
+
+        with mock.patch.object(
+            BaseEmailServiceFactory, "get_connection", side_effect=mail.get_connection
+        ) as mocked_get_connection:
+            self.assertEqual(factory.process(workers=3), 10)
+
+        # Every worker gets its own connection
+        self.assertEqual(mocked_get_connection.call_count, 3)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), sorted(factory.recipient_email_list))
+
+    def test_process_parallel_max_workers_class_attribute(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["albertus.magnus@example.com"])
+        factory.service_class = self.TestMailService
+        factory.max_workers = 2
+
+        with mock.patch.object(BaseEmailServiceFactory, "_process_parallel", return_value=1) as mocked_parallel:
+            self.assertEqual(factory.process(), 1)
+
+        mocked_parallel.assert_called_once_with(workers=2)
+
+    def test_process_parallel_single_worker_runs_serial(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["albertus.magnus@example.com"])
+        factory.service_class = self.TestMailService
+
+        with mock.patch.object(BaseEmailServiceFactory, "_process_parallel") as mocked_parallel:
+            self.assertEqual(factory.process(workers=1), 1)
+
+        mocked_parallel.assert_not_called()
+
+    def test_process_parallel_exception_is_raised(self):
+        factory = BaseEmailServiceFactory(
+            recipient_email_list=[f"rider.{i}@example.com" for i in range(10)] + ["broken.pony@example.com"]
+        )
+        factory.service_class = self.FailingMailService
+        factory.batch_size = 1
+
+        with self.assertRaises(EmailServiceConfigError):
+            factory.process(workers=4)
+
+    @time_machine.travel(datetime.date(2020, 6, 26))
+    def test_process_parallel_translation_is_activated_per_worker(self):
+        class DutchMailService(self.TestMailService):
+            def get_translation(self) -> str:
+                return "nl"
+
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(4)])
+        factory.service_class = DutchMailService
+        factory.batch_size = 1
+
+        self.assertEqual(factory.process(workers=2), 4)
+
+        for email in mail.outbox:
+            self.assertIn("vrijdag", email.body)
+
+    def test_is_valid_streaming_uses_exists(self):
+        self._create_users(3)
+        recipients = User.objects.all()
+        factory = self.UserMailFactory(recipient_email_list=recipients)
+        factory.service_class = self.TestMailService
+        factory.streaming = True
+
+        with mock.patch.object(type(recipients), "exists", return_value=True) as mocked_exists:
+            self.assertTrue(factory.is_valid())
+
+        mocked_exists.assert_called_once()
+        self.assertIsNone(recipients._result_cache)
+
+    def test_is_valid_streaming_empty_queryset(self):
+        factory = self.UserMailFactory(recipient_email_list=User.objects.none())
+        factory.service_class = self.TestMailService
+        factory.streaming = True
+
+        with self.assertRaises(EmailServiceConfigError):
+            factory.is_valid()
+
+    def test_is_valid_streaming_ignored_for_lists(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["albertus.magnus@example.com"])
+        factory.service_class = self.TestMailService
+        factory.streaming = True
+
+        self.assertTrue(factory.is_valid())
+
+    def test_process_streaming_regular(self):
+        self._create_users(5)
+        recipients = User.objects.order_by("id")
+        factory = self.UserMailFactory(recipient_email_list=recipients)
+        factory.service_class = self.TestMailService
+        factory.streaming = True
+        factory.chunk_size = 2
+
+        with mock.patch.object(
+            type(recipients), "iterator", autospec=True, side_effect=type(recipients).iterator
+        ) as mocked_iterator:
+            self.assertEqual(factory.process(), 5)
+
+        mocked_iterator.assert_called_once_with(recipients, chunk_size=2)
+        self.assertIsNone(recipients._result_cache)
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in range(5)])
+
+    def test_process_without_streaming_evaluates_queryset(self):
+        self._create_users(2)
+        recipients = User.objects.all()
+        factory = self.UserMailFactory(recipient_email_list=recipients)
+        factory.service_class = self.TestMailService
+
+        self.assertEqual(factory.process(), 2)
+        self.assertIsNotNone(recipients._result_cache)
+
+    def test_get_shared_context_data_is_read_only(self):
+        factory = BaseEmailServiceFactory()
+        shared_context_data = factory._get_shared_context_data()
+
+        with self.assertRaises(TypeError):
+            shared_context_data["pony"] = "horse"
+
+    def test_get_shared_context_data_is_evaluated_once(self):
+        factory = BaseEmailServiceFactory()
+        with mock.patch.object(BaseEmailServiceFactory, "get_context_data", return_value={}) as mocked_context:
+            factory._get_shared_context_data()
+            factory._get_shared_context_data()
+
+        mocked_context.assert_called_once()
+
+    def test_build_service_layers_recipient_over_shared_context(self):
+        factory = BaseEmailServiceFactory()
+        factory.service_class = self.TestMailService
+
+        with mock.patch.object(BaseEmailServiceFactory, "get_context_data", return_value={"my_var": "Pony"}):
+            service_1 = factory._build_service("albertus.magnus@example.com")
+            service_2 = factory._build_service("thomas.von.aquin@example.com")
+
+        self.assertEqual(service_1.get_context_data()["recipient"], "albertus.magnus@example.com")
+        self.assertEqual(service_1.get_context_data()["my_var"], "Pony")
+        self.assertIs(service_1.context_data.maps[1], service_2.context_data.maps[1])
+
+    def test_process_evaluates_context_data_once_per_run(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(5)])
+        factory.service_class = self.TestMailService
+
+        with mock.patch.object(
+            BaseEmailServiceFactory, "get_context_data", return_value={"my_var": "Lorem ipsum dolor!"}
+        ) as mocked_context:
+            self.assertEqual(factory.process(), 5)
+            self.assertEqual(factory.process(), 5)
+
+        # Once per run
+        self.assertEqual(mocked_context.call_count, 2)
+        self.assertIn("Lorem ipsum dolor!", mail.outbox[0].body)
+
+    async def test_aprocess_regular(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(5)])
+        factory.service_class = self.TestMailService
+        factory.batch_size = 2
+
+        self.assertEqual(await factory.aprocess(), 5)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), sorted(factory.recipient_email_list))
+
+    async def test_aprocess_limits_connections_to_concurrency(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(10)])
+        factory.service_class = self.TestMailService
+        factory.batch_size = 1
+
+        with mock.patch.object(
+            BaseEmailServiceFactory, "get_async_connection", side_effect=SyncEmailBackendAdapter
+        ) as mocked_get_connection:
+            self.assertEqual(await factory.aprocess(concurrency=2), 10)
+
+        self.assertLessEqual(mocked_get_connection.call_count, 2)
+        self.assertEqual(len(mail.outbox), 10)
+
+    async def test_aprocess_exception_is_raised(self):
+        factory = BaseEmailServiceFactory(
+            recipient_email_list=[f"rider.{i}@example.com" for i in range(4)] + ["broken.pony@example.com"]
+        )
+        factory.service_class = self.FailingMailService
+        factory.batch_size = 1
+
+        with self.assertRaises(EmailServiceConfigError):
+            await factory.aprocess()
+
+    async def test_aprocess_invalid_factory(self):
+        factory = BaseEmailServiceFactory()
+        self.assertEqual(await factory.aprocess(raise_exception=False), 0)
+
+    async def test_aprocess_streaming_queryset(self):
+        await sync_to_async(self._create_users)(3)
+        recipients = User.objects.order_by("id")
+        factory = self.UserMailFactory(recipient_email_list=recipients)
+        factory.service_class = self.TestMailService
+        factory.streaming = True
+
+        self.assertEqual(await factory.aprocess(), 3)
+        self.assertIsNone(recipients._result_cache)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), [f"rider.{i}@example.com" for i in range(3)])
+
+    async def test_aprocess_queryset(self):
+        await sync_to_async(self._create_users)(2)
+        factory = self.UserMailFactory(recipient_email_list=User.objects.all())
+        factory.service_class = self.TestMailService
+
+        self.assertEqual(await factory.aprocess(), 2)
+
+    def test_process_multiprocess_regular(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=[f"rider.{i}@example.com" for i in range(7)])
+        factory.service_class = self.TestMailService
+        factory.batch_size = 2
+
+        with mock.patch.object(BaseEmailServiceFactory, "get_context_data", return_value={"my_var": "Shared pony"}):
+            self.assertEqual(factory.process(processes=2), 7)
+
+        self.assertEqual([email.to[0] for email in mail.outbox], factory.recipient_email_list)
+        self.assertIn("Shared pony", mail.outbox[0].body)
+
+    def test_process_multiprocess_max_processes_class_attribute(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["albertus.magnus@example.com"])
+        factory.service_class = self.TestMailService
+        factory.max_processes = 4
+
+        with mock.patch.object(BaseEmailServiceFactory, "_process_multiprocess", return_value=1) as mocked_multiprocess:
+            self.assertEqual(factory.process(workers=2), 1)
+
+        mocked_multiprocess.assert_called_once_with(processes=4)
+
+    def test_process_multiprocess_exception_is_raised(self):
+        factory = BaseEmailServiceFactory(
+            recipient_email_list=[f"rider.{i}@example.com" for i in range(3)] + ["broken.pony@example.com"]
+        )
+        factory.service_class = self.FailingMailService
+
+        with self.assertRaises(EmailServiceConfigError):
+            factory.process(processes=2)
+
+    def test_get_process_state(self):
+        factory = BaseEmailServiceFactory(recipient_email_list=["albertus.magnus@example.com"])
+        factory.service_class = self.TestMailService
+
+        with mock.patch.object(BaseEmailServiceFactory, "get_context_data", return_value={"my_var": "Pony"}):
+            state = factory._get_process_state()
+
+        self.assertEqual(state["recipient_email_list"], [])
+        self.assertEqual(state["_shared_context_data"], {"my_var": "Pony"})
+        self.assertIs(state["service_class"], self.TestMailService)
+        self.assertIsNone(state["_attachment_cache"])
+        self.assertEqual(state["_broadcast_body_dict"], {})
+        # The factory itself is untouched
+        self.assertEqual(factory.recipient_email_list, ["albertus.magnus@example.com"])
+
+    def test_render_chunk_in_process_uses_recipient_references(self):
+        class ReferenceMailFactory(BaseEmailServiceFactory):
+            def resolve_recipient_references(self, reference_list: list) -> list:
+                return [f"{reference}@example.com" for reference in reference_list]
+
+        factory = ReferenceMailFactory(recipient_email_list=["rider"])
+        factory.service_class = self.TestMailService
+
+        msg_list = _render_chunk_in_process(ReferenceMailFactory, factory._get_process_state(), ["rider"])
+
+        self.assertEqual(msg_list[0].to, ["rider@example.com"])
+
+    @time_machine.travel(datetime.date(2020, 6, 26))
+    def test_process_group_by_language_same_output(self):
+        class MultilingualMailFactory(BaseEmailServiceFactory):
+            def get_language_from_recipient(self, recipient) -> str:
+                return "nl" if recipient.startswith("nl.") else "de"
+
+        recipient_list = [f"{language}.{i}@example.com" for i in range(3) for language in ("nl", "de")]
+        factory = MultilingualMailFactory(recipient_email_list=recipient_list)
+        factory.service_class = self.TestMailService
+        factory.process()
+        expected_body_dict = {email.to[0]: email.body for email in mail.outbox}
+        mail.outbox = []
+
+        factory.group_by_language = True
+        with mock.patch.object(translation, "activate", side_effect=translation.activate) as mocked_activate:
+            self.assertEqual(factory.process(), 6)
+
+        # One activation per language instead of one per email
+        self.assertEqual([call.args[0] for call in mocked_activate.call_args_list], ["nl", "de"])
+        self.assertEqual({email.to[0]: email.body for email in mail.outbox}, expected_body_dict)
+        self.assertIn("vrijdag", expected_body_dict["nl.0@example.com"])
+        self.assertIn("Freitag", expected_body_dict["de.0@example.com"])
+
+    def test_build_messages_group_by_language_deactivates_translation(self):
+        factory = BaseEmailServiceFactory()
+        factory.service_class = self.TestMailService
+        factory.group_by_language = True
+
+        with mock.patch.object(translation, "deactivate") as mocked_deactivate:
+            factory._build_messages(["albertus.magnus@example.com"])
+
+        mocked_deactivate.assert_called_once_with()
+
+    def test_build_service_sets_language_from_recipient(self):
+        factory = BaseEmailServiceFactory()
+        factory.service_class = self.TestMailService
+
+        with mock.patch.object(BaseEmailServiceFactory, "get_language_from_recipient", return_value="nl"):
+            email_object = factory._build_service("albertus.magnus@example.com")
+
+        self.assertEqual(email_object.get_translation(), "nl")
+
+    def test_build_service_keeps_service_language_without_recipient_language(self):
+        factory = BaseEmailServiceFactory()
+        factory.service_class = self.TestMailService
+
+        self.assertIsNone(factory._build_service("albertus.magnus@example.com").language)
@@ -1,17 +1,32 @@
 import datetime
 import logging
+import re
+import smtplib
+from collections import ChainMap
 from os.path import basename
+from types import MappingProxyType
 from unittest import mock
 
 import time_machine
 from django.conf import settings
 from django.core import mail
 from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
 from django.test import TestCase, override_settings
 from django.utils import translation
-
+from django.utils.autoreload import file_changed
+
+from django_pony_express.attachments import StreamingAttachment
+from django_pony_express.backends import SyncEmailBackendAdapter
+from django_pony_express.converters import (
+    BeautifulSoupHtmlToTextConverter,
+    HtmlToTextCache,
+    StreamingHtmlToTextConverter,
+)
 from django_pony_express.errors import EmailServiceAttachmentError, EmailServiceConfigError
-from django_pony_express.services.base import BaseEmailService
+from django_pony_express.retry import RetryPolicy
+from django_pony_express.services import base
+from django_pony_express.services.base import BaseEmailService, clear_template_cache
 
 
 class BaseEmailServiceTest(TestCase):
@@ -19,6 +34,10 @@ class BaseEmailServiceTest(TestCase):
     def setUpTestData(cls):
         super().setUpTestData()
 
+    def setUp(self):
+        super().setUp()
+        clear_template_cache()
+
     def test_init_recipient_as_str_is_wrapped_to_list(self):
         email = "albertus.magnus@example.com"
         service = BaseEmailService(email)
@@ -197,6 +216,27 @@ class BaseEmailServiceTest(TestCase):
         self.assertEqual(len(msg_obj.attachments), 1)
         self.assertEqual(msg_obj.attachments[0][0], filename)
 
+    def test_add_attachments_streaming_attachment(self):
+        service = BaseEmailService()
+        service.template_name = "testapp/test_email.html"
+        msg_obj = service._build_mail_object()
+
+        attachment = StreamingAttachment(settings.BASE_PATH / "tests/files/testfile.txt")
+        service.attachment_list = [attachment]
+        msg_obj = service._add_attachments(msg_obj)
+
+        self.assertEqual(msg_obj.attachments, [attachment])
+
+    def test_get_attachments_size_streaming_attachment(self):
+        file_path = settings.BASE_PATH / "tests/files/testfile.txt"
+        msg_obj = EmailMultiAlternatives()
+        msg_obj.attach(StreamingAttachment(file_path))
+
+        with mock.patch.object(StreamingAttachment, "iter_encoded") as mocked_iter_encoded:
+            self.assertEqual(BaseEmailService._get_attachments_size(msg_obj), file_path.stat().st_size)
+
+        mocked_iter_encoded.assert_not_called()
+
     def test_add_attachments_path_wrong_dict_data(self):
         # Setup
         service = BaseEmailService()
@@ -209,6 +249,21 @@ class BaseEmailServiceTest(TestCase):
         with self.assertRaises(EmailServiceAttachmentError):
             service._add_attachments(msg_obj)
 
+    def test_build_mail_object_layered_context_data(self):
+        shared_context_data = MappingProxyType({"my_var": "Shared pony", "link_url": "https://example.com"})
+        service = BaseEmailService(
+            recipient_email_list=["albertus.magnus@example.com"],
+            context_data=ChainMap({"my_var": "Own pony"}, shared_context_data),
+        )
+        service.subject = "Test email"
+        service.template_name = "testapp/test_email.html"
+        service.template_txt_name = "testapp/test_email.txt"
+        msg_obj = service._build_mail_object()
+
+        self.assertIn("Variable test: Own pony", msg_obj.alternatives[0][0])
+        self.assertIn('href="https://example.com"', msg_obj.alternatives[0][0])
+        self.assertIn("And here is the variable: Own pony.", msg_obj.body)
+
     @time_machine.travel(datetime.date(2020, 6, 26))
     def test_build_mail_object_regular(self):
         from_email = "noreply@example.com"
@@ -315,6 +370,21 @@ class BaseEmailServiceTest(TestCase):
         service = BaseEmailService()
         self.assertIs(service._check_email_structure_validity(email="no-at-example.com"), False)
 
+    def test_is_valid_uses_check_email_structure_validity(self):
+        class StrictEmailService(BaseEmailService):
+            subject = "Test email"
+            template_name = "testapp/test_email.html"
+
+            def _check_email_structure_validity(self, email: str) -> bool:
+                return email.endswith("@example.com")
+
+        service = StrictEmailService(recipient_email_list=["albertus.magnus@example.org"])
+
+        self.assertFalse(service.is_valid(raise_exception=False))
+        self.assertEqual(
+            service.errors, ['Email service received ill-formatted email address "albertus.magnus@example.org"']
+        )
+
     @time_machine.travel(datetime.date(2020, 6, 26))
     @override_settings(LANGUAGE_CODE="de")
     @mock.patch.object(BaseEmailService, "get_translation", return_value="nl-BE")
@@ -377,6 +447,40 @@ class BaseEmailServiceTest(TestCase):
         self.assertEqual(len(service.errors), 1)
         self.assertIn('Email service received ill-formatted email address "test user@example.com"', service.errors)
 
+    def test_is_valid_invalid_cc_bcc_and_reply_to_addresses(self):
+        service = BaseEmailService(recipient_email_list=["albertus.magnus@example.com"])
+        service.subject = "My subject"
+        service.template_name = "testapp/test_email.html"
+        service.cc_email_list = ["cc-example.com"]
+        service.bcc_email_list = ["bcc@example.com"]
+        service.REPLY_TO_ADDRESS = "reply to@example.com"
+
+        service.is_valid(raise_exception=False)
+
+        self.assertEqual(
+            service.errors,
+            [
+                'Email service received ill-formatted email address "cc-example.com"',
+                'Email service received ill-formatted email address "reply to@example.com"',
+            ],
+        )
+
+    def test_is_valid_reply_to_with_display_name(self):
+        service = BaseEmailService(recipient_email_list=["albertus.magnus@example.com"])
+        service.subject = "My subject"
+        service.template_name = "testapp/test_email.html"
+        service.REPLY_TO_ADDRESS = "Pony Express <support@example.com>"
+
+        self.assertTrue(service.is_valid())
+
+    def test_get_email_validator_uses_service_pattern(self):
+        class ExampleMailService(BaseEmailService):
+            EMAIL_STRUCTURE_PATTERN = re.compile(r"^.+@example\.com$")
+
+        service = ExampleMailService()
+        self.assertIs(service.get_email_validator().pattern, ExampleMailService.EMAIL_STRUCTURE_PATTERN)
+        self.assertIs(service.get_email_validator(), service.get_email_validator())
+
     def test_has_errors_positive_case(self):
         service = BaseEmailService()
         service.is_valid(raise_exception=False)
@@ -401,7 +505,7 @@ class BaseEmailServiceTest(TestCase):
         self.assertEqual(result, True)
 
     @mock.patch("django_pony_express.services.base.BaseEmailService._logger")
-    @mock.patch("django_pony_express.services.base.PONY_LOG_RECIPIENTS", True)
+    @mock.patch("django_pony_express.services.sender.PONY_LOG_RECIPIENTS", True)
     def test_send_and_log_success_privacy_inactive(self, mock_logger):
         service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
         result = service._send_and_log_email(
@@ -411,7 +515,7 @@ class BaseEmailServiceTest(TestCase):
         mock_logger.info.assert_called_with('Email "The Pony Express" successfully sent to thomas.aquin@example.com.')
         self.assertEqual(result, True)
 
-    @mock.patch.object(EmailMultiAlternatives, "send", side_effect=Exception("Broken pony"))
+    @mock.patch.object(EmailBackend, "send_messages", side_effect=Exception("Broken pony"))
     @mock.patch("django_pony_express.services.base.BaseEmailService._logger")
     def test_send_and_log_email_failure_privacy_active(self, mock_logger, *args):
         service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
@@ -422,9 +526,9 @@ class BaseEmailServiceTest(TestCase):
         mock_logger.error('An error occurred sending email "%s": %s', "The Pony Express", "Broken pony")
         self.assertFalse(result)
 
-    @mock.patch.object(EmailMultiAlternatives, "send", side_effect=Exception("Broken pony"))
+    @mock.patch.object(EmailBackend, "send_messages", side_effect=Exception("Broken pony"))
     @mock.patch("django_pony_express.services.base.BaseEmailService._logger")
-    @mock.patch("django_pony_express.services.base.PONY_LOG_RECIPIENTS", True)
+    @mock.patch("django_pony_express.services.sender.PONY_LOG_RECIPIENTS", True)
     def test_send_and_log_failure_privacy_inactive(self, mock_logger, *args):
         service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
         result = service._send_and_log_email(
@@ -439,7 +543,60 @@ class BaseEmailServiceTest(TestCase):
         )
         self.assertFalse(result)
 
-    @mock.patch.object(EmailMultiAlternatives, "send", return_value=1)
+    @mock.patch("django_pony_express.services.sender.time.sleep")
+    def test_send_and_log_email_retries_transient_failure(self, mocked_sleep):
+        service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
+        service.retry_policy = RetryPolicy(backoff_base=2, jitter=False)
+        with mock.patch.object(
+            EmailBackend, "send_messages", side_effect=[smtplib.SMTPServerDisconnected("Gone"), 1]
+        ) as mocked_send:
+            result = service._send_and_log_email(
+                msg=EmailMultiAlternatives(subject="The Pony Express", to=["thomas.aquin@example.com"])
+            )
+
+        self.assertTrue(result)
+        self.assertEqual(mocked_send.call_count, 2)
+        mocked_sleep.assert_called_once_with(2)
+
+    @mock.patch("django_pony_express.services.sender.time.sleep")
+    def test_send_and_log_email_reconnects_explicit_connection(self, *args):
+        service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
+        connection = mail.get_connection()
+        with (
+            mock.patch.object(connection, "send_messages", side_effect=[TimeoutError(), 1]),
+            mock.patch.object(connection, "open") as mocked_open,
+        ):
+            result = service._send_and_log_email(
+                msg=EmailMultiAlternatives(
+                    subject="The Pony Express", to=["thomas.aquin@example.com"], connection=connection
+                )
+            )
+
+        self.assertTrue(result)
+        mocked_open.assert_called_once()
+
+    @mock.patch("django_pony_express.services.sender.time.sleep")
+    @mock.patch.object(EmailBackend, "send_messages", side_effect=smtplib.SMTPServerDisconnected("Gone"))
+    def test_send_and_log_email_gives_up_after_max_attempts(self, mocked_send, *args):
+        service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
+        service.retry_policy = RetryPolicy(max_attempts=4)
+        result = service._send_and_log_email(
+            msg=EmailMultiAlternatives(subject="The Pony Express", to=["thomas.aquin@example.com"])
+        )
+
+        self.assertFalse(result)
+        self.assertEqual(mocked_send.call_count, 4)
+
+    def test_get_retry_policy_default(self):
+        service = BaseEmailService()
+        self.assertEqual(service.get_retry_policy().max_attempts, RetryPolicy.max_attempts)
+
+    def test_get_retry_policy_from_attribute(self):
+        service = BaseEmailService()
+        service.retry_policy = RetryPolicy(max_attempts=1)
+        self.assertIs(service.get_retry_policy(), service.retry_policy)
+
+    @mock.patch.object(EmailBackend, "send_messages", return_value=1)
     def test_send_and_log_email_returns_true_when_msg_send_returns_one(self, mock_send):
         service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
         result = service._send_and_log_email(
@@ -449,7 +606,7 @@ class BaseEmailServiceTest(TestCase):
         mock_send.assert_called_once()
         self.assertEqual(result, True)
 
-    @mock.patch.object(EmailMultiAlternatives, "send", return_value=99)
+    @mock.patch.object(EmailBackend, "send_messages", return_value=99)
     def test_send_and_log_email_returns_false_when_msg_send_returns_any_other_number_than_one(self, mock_send):
         service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
         result = service._send_and_log_email(
@@ -480,6 +637,67 @@ class BaseEmailServiceTest(TestCase):
         factory = BaseEmailService()
         self.assertEqual(factory.process(), 0)
 
+    def test_get_translation_language_attribute(self):
+        service = BaseEmailService()
+        service.language = "nl"
+        self.assertEqual(service.get_translation(), "nl")
+
+    def test_build_mail_object_without_activating_translation(self):
+        service = BaseEmailService(recipient_email_list=["albertus.magnus@example.com"])
+        service.subject = "Test email"
+        service.template_name = "testapp/test_email.html"
+
+        with (
+            mock.patch.object(translation, "activate") as mocked_activate,
+            mock.patch.object(translation, "deactivate") as mocked_deactivate,
+        ):
+            service._build_mail_object(activate_translation=False)
+
+        mocked_activate.assert_not_called()
+        mocked_deactivate.assert_not_called()
+
+    async def test_aprocess_regular(self):
+        service = BaseEmailService(recipient_email_list=["albertus.magnus@example.com"])
+        service.subject = "Test email"
+        service.template_name = "testapp/test_email.html"
+
+        self.assertTrue(await service.aprocess())
+        self.assertEqual(len(mail.outbox), 1)
+
+    async def test_aprocess_with_error(self):
+        service = BaseEmailService()
+        service.subject = "Test email"
+        service.template_name = "testapp/test_email.html"
+
+        with self.assertRaises(EmailServiceConfigError):
+            await service.aprocess()
+
+    @mock.patch.object(BaseEmailService, "is_valid", return_value=False)
+    async def test_aprocess_is_valid_invalid(self, *args):
+        self.assertFalse(await BaseEmailService().aprocess())
+
+    async def test_asend_and_log_email_wraps_sync_connection(self):
+        connection = mail.get_connection()
+        service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"], connection=connection)
+
+        with mock.patch.object(connection, "send_messages", return_value=1) as mocked_send_messages:
+            result = await service._asend_and_log_email(
+                msg=EmailMultiAlternatives(subject="The Pony Express", to=["thomas.aquin@example.com"])
+            )
+
+        self.assertTrue(result)
+        mocked_send_messages.assert_called_once()
+
+    async def test_asend_and_log_email_failure_returns_false(self):
+        service = BaseEmailService(recipient_email_list=["thomas.aquin@example.com"])
+
+        with mock.patch.object(SyncEmailBackendAdapter, "send_messages", side_effect=Exception("Broken pony")):
+            result = await service._asend_and_log_email(
+                msg=EmailMultiAlternatives(subject="The Pony Express", to=["thomas.aquin@example.com"])
+            )
+
+        self.assertFalse(result)
+
     def test_html_templates_rendering(self):
         my_var = "Lorem ipsum dolor!"
         service = BaseEmailService()
@@ -523,3 +741,59 @@ class BaseEmailServiceTest(TestCase):
 
         # Check links are converted correctly
         self.assertIn("I am a link (https//example.com?pony=horse)", msg_txt)
+
+    def test_get_template_is_compiled_once(self):
+        with mock.patch.object(base, "get_template", wraps=base.get_template) as mocked_get_template:
+            template_1 = BaseEmailService._get_template("testapp/test_email.html")
+            template_2 = BaseEmailService._get_template("testapp/test_email.html")
+
+        mocked_get_template.assert_called_once_with("testapp/test_email.html")
+        self.assertIs(template_1, template_2)
+
+    def test_get_template_cache_per_service_class(self):
+        class MyMailService(BaseEmailService):
+            pass
+
+        self.assertIsNot(
+            BaseEmailService._get_template("testapp/test_email.html"),
+            MyMailService._get_template("testapp/test_email.html"),
+        )
+
+    def test_get_template_list_of_templates(self):
+        template = BaseEmailService._get_template(["testapp/does_not_exist.html", "testapp/test_email.txt"])
+        self.assertIn("I am a different content", template.render({}))
+        self.assertIs(
+            template, BaseEmailService._get_template(("testapp/does_not_exist.html", "testapp/test_email.txt"))
+        )
+
+    def test_clear_template_cache_on_file_change(self):
+        template = BaseEmailService._get_template("testapp/test_email.html")
+        file_changed.send(sender=None, file_path=settings.BASE_PATH / "testapp/templates/testapp/test_email.html")
+        self.assertIsNot(template, BaseEmailService._get_template("testapp/test_email.html"))
+
+    def test_clear_template_cache_on_setting_change(self):
+        template = BaseEmailService._get_template("testapp/test_email.html")
+        with override_settings(DEBUG=True):
+            self.assertIsNot(template, BaseEmailService._get_template("testapp/test_email.html"))
+
+    def test_generate_text_content_uses_text_converter_class(self):
+        service = BaseEmailService()
+        self.assertIs(service.text_converter_class, StreamingHtmlToTextConverter)
+
+        service.text_converter_class = BeautifulSoupHtmlToTextConverter
+        with mock.patch.object(BeautifulSoupHtmlToTextConverter, "convert", return_value="Pony") as mocked_convert:
+            msg_txt = service._generate_text_content(mail_attributes={}, html_content="<p>Horse</p>")
+
+        mocked_convert.assert_called_once_with("<p>Horse</p>")
+        self.assertEqual(msg_txt, "Pony")
+
+    def test_generate_text_content_uses_text_content_cache(self):
+        service = BaseEmailService()
+        service.text_content_cache = HtmlToTextCache()
+
+        service._generate_text_content(mail_attributes={}, html_content="<p>Pony</p>")
+        msg_txt = service._generate_text_content(mail_attributes={}, html_content="<p>Pony</p>")
+
+        self.assertEqual(msg_txt, "Pony")
+        self.assertEqual(service.text_content_cache.hits, 1)
+        self.assertEqual(service.text_content_cache.misses, 1)
@@ -0,0 +1,436 @@
+import smtplib
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+
+from django_pony_express.backends import SyncEmailBackendAdapter
+from django_pony_express.retry import RetryPolicy
+from django_pony_express.services.sender import AsyncEmailSender, EmailSender
+
+
+def _get_failing_send_messages(failing_recipient: str, exception: Exception, times: int = 1):
+    """
+    Returns a replacement of `EmailBackend.send_messages()` failing `times` times for the given recipient, like an
+    SMTP server refusing an address or dropping the session in the middle of a batch.
+    """
+    original_send_messages = EmailBackend.send_messages
+    failure_list = [exception] * times
+
+    def send_messages(backend, messages):
+        for message in messages:
+            if failing_recipient in message.to and failure_list:
+                raise failure_list.pop()
+        return original_send_messages(backend, messages)
+
+    return send_messages
+
+
+class DroppingEmailBackend(EmailBackend):
+    """
+    Locmem backend losing its session while sending to "rider.1@example.com". The session stays dead until it's
+    re-opened.
+    """
+
+    has_dropped = False
+    is_dropped = False
+
+    def open(self) -> None:
+        self.is_dropped = False
+
+    def send_messages(self, messages) -> int:
+        if not self.has_dropped and "rider.1@example.com" in messages[0].to:
+            self.has_dropped = self.is_dropped = True
+        if self.is_dropped:
+            raise smtplib.SMTPServerDisconnected("Gone")
+        return super().send_messages(messages)
+
+
+class EmailSenderTest(TestCase):
+    def _get_messages(self, number: int) -> list[EmailMultiAlternatives]:
+        return [
+            EmailMultiAlternatives(subject="The Pony Express", to=[f"rider.{i}@example.com"]) for i in range(number)
+        ]
+
+    def test_init_connection_default(self):
+        sender = EmailSender()
+        self.assertIsInstance(sender.connection, EmailBackend)
+
+    def test_init_connection_passed(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection)
+        self.assertIs(sender.connection, connection)
+
+    def test_context_manager_opens_and_closes_connection(self):
+        connection = mail.get_connection()
+        with (
+            mock.patch.object(connection, "open") as mocked_open,
+            mock.patch.object(connection, "close") as mocked_close,
+        ):
+            with EmailSender(connection=connection):
+                mocked_open.assert_called_once()
+                mocked_close.assert_not_called()
+            mocked_close.assert_called_once()
+
+    def test_context_manager_open_failure_is_logged(self):
+        connection = mail.get_connection()
+        with (
+            mock.patch.object(connection, "open", side_effect=ConnectionRefusedError("Nobody home")),
+            self.assertLogs("django_pony_express", level="WARNING") as logs,
+        ):
+            with EmailSender(connection=connection) as sender:
+                self.assertEqual(sender.send(self._get_messages(1)), 1)
+
+        self.assertIn("Opening the email connection failed.", logs.output[0])
+
+    def test_close_error_is_not_raised(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection)
+        with mock.patch.object(connection, "close", side_effect=smtplib.SMTPException("Bye")):
+            sender.close()
+
+    def test_send_regular(self):
+        sender = EmailSender()
+        self.assertEqual(sender.send(self._get_messages(3)), 3)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_send_empty_list(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection)
+        with mock.patch.object(connection, "send_messages") as mocked_send_messages:
+            self.assertEqual(sender.send([]), 0)
+        mocked_send_messages.assert_not_called()
+
+    def test_send_uses_one_backend_call_per_message(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection)
+        messages = self._get_messages(5)
+        with mock.patch.object(connection, "send_messages", return_value=1) as mocked_send_messages:
+            self.assertEqual(sender.send(messages), 5)
+
+        self.assertEqual([call.args[0] for call in mocked_send_messages.call_args_list], [[msg] for msg in messages])
+
+    def test_send_reconnects_when_connection_was_lost(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection)
+        with (
+            mock.patch.object(
+                connection, "send_messages", side_effect=[smtplib.SMTPServerDisconnected("Gone"), 1, 1]
+            ) as mocked_send_messages,
+            mock.patch.object(EmailSender, "reconnect") as mocked_reconnect,
+            mock.patch("django_pony_express.services.sender.time.sleep") as mocked_sleep,
+        ):
+            self.assertEqual(sender.send(self._get_messages(2)), 2)
+
+        mocked_sleep.assert_called_once()
+        mocked_reconnect.assert_called_once()
+        self.assertEqual(mocked_send_messages.call_count, 3)
+
+    def test_send_connection_lost_partway_does_not_send_twice(self):
+        sender = EmailSender()
+        with (
+            mock.patch.object(
+                EmailBackend,
+                "send_messages",
+                new=_get_failing_send_messages("rider.3@example.com", smtplib.SMTPServerDisconnected("Gone")),
+            ),
+            mock.patch("django_pony_express.services.sender.time.sleep"),
+        ):
+            self.assertEqual(sender.send(self._get_messages(6)), 6)
+
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in range(6)])
+
+    def test_send_reconnects_after_final_connection_failure(self):
+        sender = EmailSender(connection=DroppingEmailBackend(), retry_policy=RetryPolicy(max_attempts=1))
+
+        self.assertEqual(sender.send(self._get_messages(5)), 4)
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in (0, 2, 3, 4)])
+
+    def test_send_does_not_reconnect_after_smtp_reply(self):
+        sender = EmailSender(retry_policy=RetryPolicy(max_attempts=1))
+        with (
+            mock.patch.object(
+                EmailBackend,
+                "send_messages",
+                new=_get_failing_send_messages(
+                    "rider.1@example.com", smtplib.SMTPRecipientsRefused({"rider.1@example.com": (550, b"No user")})
+                ),
+            ),
+            mock.patch.object(EmailSender, "reconnect") as mocked_reconnect,
+        ):
+            self.assertEqual(sender.send(self._get_messages(3)), 2)
+
+        mocked_reconnect.assert_not_called()
+
+    def test_send_refused_recipient_partway_only_fails_its_message(self):
+        sender = EmailSender()
+        with (
+            mock.patch.object(
+                EmailBackend,
+                "send_messages",
+                new=_get_failing_send_messages(
+                    "rider.3@example.com",
+                    smtplib.SMTPRecipientsRefused({"rider.3@example.com": (550, b"No such user")}),
+                ),
+            ),
+            mock.patch.object(sender, "_logger") as mocked_logger,
+        ):
+            self.assertEqual(sender.send(self._get_messages(6)), 5)
+
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in (0, 1, 2, 4, 5)])
+        mocked_logger.exception.assert_called_once_with('An error occurred sending email "The Pony Express".')
+        self.assertEqual(mocked_logger.info.call_count, 5)
+
+    def test_send_retries_transient_smtp_reply_with_backoff(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection, retry_policy=RetryPolicy(backoff_base=1, jitter=False))
+        with (
+            mock.patch.object(
+                connection,
+                "send_messages",
+                side_effect=[smtplib.SMTPDataError(451, "Try again"), smtplib.SMTPDataError(421, "Busy"), 1],
+            ) as mocked_send_messages,
+            mock.patch("django_pony_express.services.sender.time.sleep") as mocked_sleep,
+        ):
+            self.assertEqual(sender.send(self._get_messages(1)), 1)
+
+        self.assertEqual(mocked_send_messages.call_count, 3)
+        self.assertEqual([call.args[0] for call in mocked_sleep.call_args_list], [1, 2])
+
+    def test_send_gives_up_after_max_attempts(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection, retry_policy=RetryPolicy(max_attempts=2))
+        with (
+            mock.patch.object(
+                connection, "send_messages", side_effect=smtplib.SMTPServerDisconnected("Gone")
+            ) as mocked_send_messages,
+            mock.patch("django_pony_express.services.sender.time.sleep"),
+            mock.patch.object(sender, "_logger") as mocked_logger,
+        ):
+            self.assertEqual(sender.send(self._get_messages(1)), 0)
+
+        self.assertEqual(mocked_send_messages.call_count, 2)
+        mocked_logger.warning.assert_called_once()
+        mocked_logger.exception.assert_called_once_with('An error occurred sending email "The Pony Express".')
+
+    def test_send_does_not_retry_permanent_failure(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection)
+        with mock.patch.object(
+            connection, "send_messages", side_effect=smtplib.SMTPDataError(550, "Mailbox unavailable")
+        ) as mocked_send_messages:
+            self.assertEqual(sender.send(self._get_messages(1)), 0)
+
+        mocked_send_messages.assert_called_once()
+
+    def test_send_hands_retry_to_callback(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection, retry_policy=RetryPolicy(backoff_base=3, jitter=False))
+        messages = self._get_messages(2)
+        retry_callback = mock.Mock()
+        with (
+            mock.patch.object(connection, "send_messages", side_effect=smtplib.SMTPServerDisconnected("Gone")),
+            mock.patch.object(EmailSender, "reconnect") as mocked_reconnect,
+            mock.patch("django_pony_express.services.sender.time.sleep") as mocked_sleep,
+        ):
+            self.assertEqual(sender.send(messages, attempt=2, retry_callback=retry_callback), 0)
+
+        mocked_sleep.assert_not_called()
+        self.assertEqual(mocked_reconnect.call_count, 2)
+        self.assertEqual(
+            retry_callback.call_args_list, [mock.call([messages[0]], 3, 6), mock.call([messages[1]], 3, 6)]
+        )
+
+    def test_send_hands_only_failed_message_to_callback(self):
+        sender = EmailSender(retry_policy=RetryPolicy(backoff_base=1, jitter=False))
+        messages = self._get_messages(6)
+        retry_callback = mock.Mock()
+        with mock.patch.object(
+            EmailBackend,
+            "send_messages",
+            new=_get_failing_send_messages("rider.3@example.com", smtplib.SMTPServerDisconnected("Gone")),
+        ):
+            self.assertEqual(sender.send(messages, retry_callback=retry_callback), 5)
+
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in (0, 1, 2, 4, 5)])
+        retry_callback.assert_called_once_with([messages[3]], 2, 1)
+
+    def test_send_retries_only_failed_message(self):
+        sender = EmailSender(retry_policy=RetryPolicy(max_attempts=2))
+        original_send_messages = EmailBackend.send_messages
+        failing_list = ["rider.1@example.com", "rider.3@example.com"]
+
+        def send_messages(backend, messages):
+            if messages[0].to[0] in failing_list:
+                failing_list.remove(messages[0].to[0])
+                raise smtplib.SMTPServerDisconnected("Gone")
+            return original_send_messages(backend, messages)
+
+        with (
+            mock.patch.object(EmailBackend, "send_messages", new=send_messages),
+            mock.patch("django_pony_express.services.sender.time.sleep") as mocked_sleep,
+        ):
+            # The retry of the second email doesn't use up the attempts of the following ones
+            self.assertEqual(sender.send(self._get_messages(4)), 4)
+
+        self.assertEqual(mocked_sleep.call_count, 2)
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in range(4)])
+
+    def test_send_failure_is_logged(self):
+        connection = mail.get_connection()
+        sender = EmailSender(connection=connection)
+        with (
+            mock.patch.object(connection, "send_messages", side_effect=Exception("Broken pony")),
+            mock.patch.object(sender, "_logger") as mocked_logger,
+        ):
+            self.assertEqual(sender.send(self._get_messages(2)), 0)
+
+        self.assertEqual(mocked_logger.exception.call_count, 2)
+        mocked_logger.exception.assert_called_with('An error occurred sending email "The Pony Express".')
+
+    def test_send_logs_success_privacy_active(self):
+        sender = EmailSender()
+        with mock.patch.object(sender, "_logger") as mocked_logger:
+            sender.send(self._get_messages(1))
+
+        mocked_logger.info.assert_called_with('Email "The Pony Express" successfully sent.')
+
+    @mock.patch("django_pony_express.services.sender.PONY_LOG_RECIPIENTS", True)
+    def test_send_logs_success_privacy_inactive(self):
+        sender = EmailSender()
+        with mock.patch.object(sender, "_logger") as mocked_logger:
+            sender.send(self._get_messages(1))
+
+        mocked_logger.info.assert_called_with('Email "The Pony Express" successfully sent to rider.0@example.com.')
+
+    @mock.patch("django_pony_express.services.sender.PONY_LOG_RECIPIENTS", True)
+    def test_send_logs_success_with_bcc_recipients(self):
+        sender = EmailSender()
+        message = EmailMultiAlternatives(
+            subject="The Pony Express", to=["stable@example.com"], bcc=["rider.0@example.com", "rider.1@example.com"]
+        )
+        with mock.patch.object(sender, "_logger") as mocked_logger:
+            sender.send([message])
+
+        mocked_logger.info.assert_called_with(
+            'Email "The Pony Express" successfully sent to stable@example.com rider.0@example.com rider.1@example.com.'
+        )
+
+
+class AsyncEmailSenderTest(TestCase):
+    def _get_messages(self, number: int) -> list[EmailMultiAlternatives]:
+        return [
+            EmailMultiAlternatives(subject="The Pony Express", to=[f"rider.{i}@example.com"]) for i in range(number)
+        ]
+
+    def test_init_connection_default(self):
+        sender = AsyncEmailSender()
+        self.assertIsInstance(sender.connection, SyncEmailBackendAdapter)
+
+    async def test_context_manager_opens_and_closes_connection(self):
+        connection = SyncEmailBackendAdapter()
+        with (
+            mock.patch.object(connection, "open") as mocked_open,
+            mock.patch.object(connection, "close") as mocked_close,
+        ):
+            async with AsyncEmailSender(connection=connection):
+                pass
+
+        mocked_open.assert_awaited_once()
+        mocked_close.assert_awaited_once()
+
+    def test_sync_context_manager_raises(self):
+        connection = SyncEmailBackendAdapter()
+        with mock.patch.object(connection, "open") as mocked_open:
+            with self.assertRaisesMessage(TypeError, "use 'async with' instead"):
+                with AsyncEmailSender(connection=connection):
+                    pass
+
+        mocked_open.assert_not_called()
+
+    async def test_context_manager_open_failure_is_logged(self):
+        connection = SyncEmailBackendAdapter()
+        sender = AsyncEmailSender(connection=connection)
+        with (
+            mock.patch.object(connection, "open", side_effect=ConnectionRefusedError("Nobody home")),
+            mock.patch.object(sender, "_logger") as mocked_logger,
+        ):
+            async with sender:
+                pass
+
+        mocked_logger.warning.assert_called_once()
+
+    async def test_close_failure_is_logged(self):
+        connection = SyncEmailBackendAdapter()
+        sender = AsyncEmailSender(connection=connection)
+        with (
+            mock.patch.object(connection, "close", side_effect=smtplib.SMTPException("Bye")),
+            mock.patch.object(sender, "_logger") as mocked_logger,
+        ):
+            await sender.close()
+
+        mocked_logger.warning.assert_called_once()
+
+    async def test_send_regular(self):
+        sender = AsyncEmailSender()
+        self.assertEqual(await sender.send(self._get_messages(3)), 3)
+        self.assertEqual(len(mail.outbox), 3)
+
+    async def test_send_empty_list(self):
+        connection = SyncEmailBackendAdapter()
+        sender = AsyncEmailSender(connection=connection)
+        with mock.patch.object(connection, "send_messages") as mocked_send_messages:
+            self.assertEqual(await sender.send([]), 0)
+
+        mocked_send_messages.assert_not_called()
+
+    async def test_send_reconnects_when_connection_was_lost(self):
+        connection = SyncEmailBackendAdapter()
+        sender = AsyncEmailSender(connection=connection)
+        with (
+            mock.patch.object(
+                connection, "send_messages", side_effect=[smtplib.SMTPServerDisconnected("Gone"), 1, 1]
+            ) as mocked_send_messages,
+            mock.patch.object(AsyncEmailSender, "reconnect") as mocked_reconnect,
+            mock.patch("django_pony_express.services.sender.asyncio.sleep") as mocked_sleep,
+        ):
+            self.assertEqual(await sender.send(self._get_messages(2)), 2)
+
+        mocked_sleep.assert_awaited_once()
+        mocked_reconnect.assert_awaited_once()
+        self.assertEqual(mocked_send_messages.call_count, 3)
+
+    async def test_send_reconnects_after_final_connection_failure(self):
+        sender = AsyncEmailSender(
+            connection=SyncEmailBackendAdapter(connection=DroppingEmailBackend()),
+            retry_policy=RetryPolicy(max_attempts=1),
+        )
+
+        self.assertEqual(await sender.send(self._get_messages(5)), 4)
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in (0, 2, 3, 4)])
+
+    async def test_send_refused_recipient_partway_only_fails_its_message(self):
+        sender = AsyncEmailSender()
+        with mock.patch.object(
+            EmailBackend,
+            "send_messages",
+            new=_get_failing_send_messages(
+                "rider.3@example.com", smtplib.SMTPRecipientsRefused({"rider.3@example.com": (550, b"No such user")})
+            ),
+        ):
+            self.assertEqual(await sender.send(self._get_messages(6)), 5)
+
+        self.assertEqual([email.to[0] for email in mail.outbox], [f"rider.{i}@example.com" for i in (0, 1, 2, 4, 5)])
+
+    async def test_send_failure_is_logged(self):
+        connection = SyncEmailBackendAdapter()
+        sender = AsyncEmailSender(connection=connection)
+        with (
+            mock.patch.object(connection, "send_messages", side_effect=Exception("Broken pony")),
+            mock.patch.object(sender, "_logger") as mocked_logger,
+        ):
+            self.assertEqual(await sender.send(self._get_messages(2)), 0)
+
+        self.assertEqual(mocked_logger.exception.call_count, 2)
@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.core.mail import EmailMessage, get_connection
+from django.test import TestCase
+
+from django_pony_express.services.tests import SMTPSinkServer
+
+
+class SMTPSinkServerTest(TestCase):
+    def test_start_picks_free_port(self):
+        with SMTPSinkServer() as server:
+            self.assertGreater(server.port, 0)
+
+    def test_start_raises_error_of_server(self):
+        with SMTPSinkServer() as server:
+            with self.assertRaises(OSError):
+                SMTPSinkServer(port=server.port).start()
+
+    @mock.patch.object(SMTPSinkServer, "START_TIMEOUT", 0.01)
+    @mock.patch.object(SMTPSinkServer, "_run")
+    def test_start_timeout(self, *args):
+        with self.assertRaises(TimeoutError):
+            SMTPSinkServer().start()
+
+    def test_receives_messages_from_django_smtp_backend(self):
+        with SMTPSinkServer() as server:
+            connection = get_connection(
+                "django.core.mail.backends.smtp.EmailBackend", host=server.host, port=server.port
+            )
+            EmailMessage(
+                "Pony", "Body", from_email="sender@example.com", to=["rider@example.com"], connection=connection
+            ).send()
+
+        self.assertEqual(len(server.messages), 1)
+        self.assertEqual(server.messages[0]["from"], "sender@example.com")
+        self.assertEqual(server.messages[0]["to"], ["rider@example.com"])
+        self.assertIn(b"Subject: Pony", server.messages[0]["data"])
+
+    def test_rejected_recipients(self):
+        with SMTPSinkServer() as server:
+            server.rejected_recipients.add("rider@example.com")
+            connection = get_connection(
+                "django.core.mail.backends.smtp.EmailBackend", host=server.host, port=server.port
+            )
+            EmailMessage(
+                "Pony", "Body", to=["rider@example.com", "other.rider@example.com"], connection=connection
+            ).send()
+
+        self.assertEqual(server.messages[0]["to"], ["other.rider@example.com"])
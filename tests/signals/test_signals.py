@@ -0,0 +1,140 @@
+import pickle
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase
+
+from django_pony_express.services.asynchronous.pool import EmailWorkerPool
+from django_pony_express.services.asynchronous.thread import ThreadEmailService
+from django_pony_express.services.base import BaseEmailService, BaseEmailServiceFactory
+from django_pony_express.signals import (
+    NULL_PHASE_TIMER,
+    PHASE_ATTACHMENTS,
+    PHASE_CONTEXT,
+    PHASE_HTML,
+    PHASE_SEND,
+    PHASE_TEXT,
+    NullPhaseTimer,
+    PhaseTimer,
+    email_phase_finished,
+    get_phase_timer,
+)
+
+
+class TimedEmailService(BaseEmailService):
+    subject = "The Pony Express"
+    template_name = "testapp/test_email.html"
+
+
+class TimedThreadEmailService(ThreadEmailService):
+    subject = "The Pony Express"
+    template_name = "testapp/test_email.html"
+
+
+class TimedEmailServiceFactory(BaseEmailServiceFactory):
+    service_class = TimedEmailService
+
+
+class EmailPhaseFinishedSignalTest(TestCase):
+    def _connect_receiver(self, sender: type = TimedEmailService) -> mock.Mock:
+        receiver = mock.Mock()
+        email_phase_finished.connect(receiver, sender=sender, weak=False)
+        self.addCleanup(email_phase_finished.disconnect, receiver, sender=sender)
+        return receiver
+
+    def _get_phase_dict(self, receiver: mock.Mock) -> dict:
+        return {call.kwargs["phase"]: call.kwargs for call in receiver.call_args_list}
+
+    def test_get_phase_timer_without_receivers(self):
+        timer = get_phase_timer(TimedEmailService())
+        self.assertIs(timer, NULL_PHASE_TIMER)
+        self.assertFalse(timer)
+
+    def test_get_phase_timer_with_receiver(self):
+        self._connect_receiver()
+        timer = get_phase_timer(TimedEmailService())
+        self.assertIsInstance(timer, PhaseTimer)
+        self.assertTrue(timer)
+
+    def test_get_phase_timer_ignores_receivers_of_other_services(self):
+        self._connect_receiver(sender=BaseEmailService)
+        self.assertIs(get_phase_timer(TimedEmailService()), NULL_PHASE_TIMER)
+
+    def test_process_sends_every_phase(self):
+        receiver = self._connect_receiver()
+        service = TimedEmailService(recipient_email_list=["thomas.aquin@example.com"])
+        service.process()
+
+        self.assertEqual(
+            [call.kwargs["phase"] for call in receiver.call_args_list],
+            [PHASE_CONTEXT, PHASE_HTML, PHASE_TEXT, PHASE_ATTACHMENTS, PHASE_SEND],
+        )
+        for call in receiver.call_args_list:
+            self.assertIs(call.kwargs["sender"], TimedEmailService)
+            self.assertIs(call.kwargs["service"], service)
+            self.assertEqual(call.kwargs["template_name"], "testapp/test_email.html")
+            self.assertGreaterEqual(call.kwargs["duration"], 0)
+
+    def test_process_reports_sizes(self):
+        receiver = self._connect_receiver()
+        service = TimedEmailService(
+            recipient_email_list=["thomas.aquin@example.com"],
+            attachment_list=[settings.BASE_PATH / "tests/files/testfile.txt"],
+        )
+        msg = service._build_mail_object()
+        phase_dict = self._get_phase_dict(receiver)
+
+        self.assertIsNone(phase_dict[PHASE_CONTEXT]["size"])
+        self.assertEqual(phase_dict[PHASE_HTML]["size"], len(msg.alternatives[0][0]))
+        self.assertEqual(phase_dict[PHASE_TEXT]["size"], len(msg.body))
+        self.assertEqual(
+            phase_dict[PHASE_ATTACHMENTS]["size"], (settings.BASE_PATH / "tests/files/testfile.txt").stat().st_size
+        )
+
+    def test_process_reports_message_size(self):
+        receiver = self._connect_receiver()
+        TimedEmailService(recipient_email_list=["thomas.aquin@example.com"]).process()
+
+        self.assertGreater(self._get_phase_dict(receiver)[PHASE_SEND]["size"], 0)
+
+    async def test_aprocess_sends_send_phase(self):
+        receiver = self._connect_receiver()
+        await TimedEmailService(recipient_email_list=["thomas.aquin@example.com"]).aprocess()
+
+        self.assertIn(PHASE_SEND, self._get_phase_dict(receiver))
+
+    def test_factory_process_sends_send_phase_per_email(self):
+        receiver = self._connect_receiver()
+        TimedEmailServiceFactory(recipient_email_list=["thomas.aquin@example.com", "bonaventura@example.com"]).process()
+
+        send_call_list = [call for call in receiver.call_args_list if call.kwargs["phase"] == PHASE_SEND]
+        self.assertEqual(len(send_call_list), 2)
+        for call in send_call_list:
+            self.assertGreater(call.kwargs["size"], 0)
+
+    def test_worker_pool_sends_send_phase(self):
+        receiver = self._connect_receiver(sender=TimedThreadEmailService)
+        pool = EmailWorkerPool(workers=1)
+        self.addCleanup(pool.shutdown)
+
+        with mock.patch.object(TimedThreadEmailService, "get_worker_pool", return_value=pool):
+            TimedThreadEmailService(recipient_email_list=["thomas.aquin@example.com"]).process()
+        pool.join()
+
+        self.assertGreater(self._get_phase_dict(receiver)[PHASE_SEND]["size"], 0)
+
+    def test_pickled_phase_timer_is_null_timer(self):
+        timer = pickle.loads(pickle.dumps(PhaseTimer(TimedEmailService())))
+
+        self.assertIsInstance(timer, NullPhaseTimer)
+        self.assertFalse(timer)
+
+    def test_process_without_receivers_skips_sizes(self):
+        with (
+            mock.patch("django_pony_express.services.sender.get_message_size") as mocked_get_message_size,
+            mock.patch.object(TimedEmailService, "_get_attachments_size") as mocked_get_attachments_size,
+        ):
+            TimedEmailService(recipient_email_list=["thomas.aquin@example.com"]).process()
+
+        mocked_get_message_size.assert_not_called()
+        mocked_get_attachments_size.assert_not_called()
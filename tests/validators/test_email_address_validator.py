@@ -0,0 +1,68 @@
+import re
+from unittest import mock
+
+from django.test import TestCase
+
+from django_pony_express.validators import EmailAddressValidator
+
+
+class EmailAddressValidatorTest(TestCase):
+    def test_normalize_strips_whitespace_and_lowercases_domain(self):
+        self.assertEqual(
+            EmailAddressValidator().normalize("  Albertus.Magnus@EXAMPLE.com\n"), "Albertus.Magnus@example.com"
+        )
+
+    def test_normalize_without_at(self):
+        self.assertEqual(EmailAddressValidator().normalize(" no-at-example.com "), "no-at-example.com")
+
+    def test_clean_valid(self):
+        self.assertEqual(EmailAddressValidator().clean(" thomas.aquin@Example.com"), "thomas.aquin@example.com")
+
+    def test_clean_invalid(self):
+        validator = EmailAddressValidator()
+        self.assertIsNone(validator.clean("no-at-example.com"))
+        self.assertIsNone(validator.clean("thomas aquin@example.com"))
+        self.assertIsNone(validator.clean(""))
+
+    def test_clean_no_string(self):
+        validator = EmailAddressValidator()
+        self.assertIsNone(validator.clean(None))
+        self.assertIsNone(validator.clean(["thomas.aquin@example.com"]))
+
+    def test_clean_display_name(self):
+        validator = EmailAddressValidator()
+        self.assertEqual(validator.clean("Pony Express <pony@example.com>"), "Pony Express <pony@example.com>")
+        self.assertIsNone(validator.clean("Pony Express <pony-example.com>"))
+
+    def test_clean_custom_pattern(self):
+        validator = EmailAddressValidator(pattern=re.compile(r"^.+@example\.com$"))
+        self.assertTrue(validator.is_valid("pony@example.com"))
+        self.assertFalse(validator.is_valid("pony@example.org"))
+
+    def test_clean_is_memoised(self):
+        validator = EmailAddressValidator()
+        with mock.patch.object(validator, "_clean", return_value="pony@example.com") as mocked_clean:
+            validator.clean("pony@example.com")
+            validator.clean("pony@example.com")
+
+        mocked_clean.assert_called_once()
+
+    def test_clean_empties_memo_at_max_entries(self):
+        validator = EmailAddressValidator(max_entries=2)
+        for number in range(3):
+            validator.clean(f"rider.{number}@example.com")
+
+        self.assertEqual(len(validator._cache), 1)
+
+    def test_validate(self):
+        valid_list, invalid_list = EmailAddressValidator().validate(
+            ["rider.0@EXAMPLE.com", "no-at-example.com", " rider.1@example.com", None]
+        )
+        self.assertEqual(valid_list, ["rider.0@example.com", "rider.1@example.com"])
+        self.assertEqual(invalid_list, ["no-at-example.com", None])
+
+    def test_clear(self):
+        validator = EmailAddressValidator()
+        validator.clean("pony@example.com")
+        validator.clear()
+        self.assertEqual(validator._cache, {})